@@ -1,5 +1,10 @@
 import re
+import mmap
 import typing
+import pathlib
+
+import numpy
+import pyvista
 
 from . import _file
 from . import types
@@ -11,16 +16,57 @@ class Meshtal(_file.File):
     """
     Represents MESTHAL files.
 
+    `to_arrays` reads results and relative errors into dense NumPy arrays
+    indexed by energy, time, x, y, and z bins, or by energy, time, r, z, and
+    theta bins for cylindrical meshes. Column and matrix (`out=ij`, `ik`, or
+    `jk`) formats are both read. Energy and time totals, which MCNP writes
+    for tallies with several energy or time bins, are kept as the last
+    energy and time bins.
+
+    `iter_arrays` streams the dense arrays as chunks of voxel records for
+    vectorized filters and processors.
+
+    Files holding several `fmesh` tallies are indexed with `tallies_index`,
+    and `get_tally` parses single tallies on demand. `to_pyvista` builds
+    VTK grids from the dense arrays for plotting and ParaView.
+
     Attributes:
         header: MESHTAL header.
         tallies: MESTHAL tallies.
     """
 
     _REGEX = re.compile(
-        r'\A([^\n]{7}version [^\n]{6}ld=[^\n]{10}probid =[^\n]{20}\n\s[^\n]+\n\sNumber of histories used for normalizing tallies =[^\n]{17}\n\n\sMesh Tally Number[^\n]{10}\n\s[^\n]{8} mesh tally[.]\n\n Tally bin boundaries:\n(?:    .+\n)+\n[^\n]+\n)([\n\s\S]+)\Z',
+        r'\A([^\n]{7}version [^\n]{6}ld=[^\n]{10}probid =[^\n]{20}\n\s[^\n]+\n\sNumber of histories used for normalizing tallies =[^\n]{17}\n\n\sMesh Tally Number[^\n]{10}\n\s[^\n]{8} mesh tally[.]\n\n Tally bin boundaries:\n(?:  .+\n)+\n[^\n]+\n)([\n\s\S]+)\Z',
         re.IGNORECASE,
     )
 
+    # Tally sections of MESHTAL files.
+    INDEX: typing.Final[numpy.dtype] = numpy.dtype(
+        [
+            ('number', numpy.int64),
+            ('particle', 'U16'),
+            ('shape', numpy.int64, (5,)),
+            ('offset', numpy.int64),
+            ('header', numpy.int64),
+            ('length', numpy.int64),
+        ]
+    )
+
+    # Voxels of dense arrays, with `nan` energies and times for totals and
+    # `inf` for missing bins.
+    VOXEL: typing.Final[numpy.dtype] = numpy.dtype(
+        [
+            ('index', numpy.int64),
+            ('energy', numpy.float64),
+            ('time', numpy.float64),
+            ('x', numpy.float64),
+            ('y', numpy.float64),
+            ('z', numpy.float64),
+            ('result', numpy.float64),
+            ('error', numpy.float64),
+        ]
+    )
+
     def __init__(self, header: meshtal.Header, tallies: types.Generator(meshtal.Tally)):
         """
         Initializes `Meshtal`.
@@ -45,6 +91,7 @@ class Meshtal(_file.File):
 
         self.header: typing.Final[meshtal.Header] = header
         self.tallies: typing.Final[typing.Generator[typing.Generator[meshtal.Tally, None, None]]] = tallies
+        self._source: str = None
 
     @staticmethod
     def from_mcnp(source: str):
@@ -66,7 +113,10 @@ class Meshtal(_file.File):
         header = meshtal.Header.from_mcnp(tokens[1])
         tallies = types.Generator(meshtal.Tally).from_mcnp(tokens[2])
 
-        return Meshtal(header, tallies)
+        file = Meshtal(header, tallies)
+        file._source = tokens[2]
+
+        return file
 
     def to_mcnp(self):
         """
@@ -77,3 +127,439 @@ class Meshtal(_file.File):
         """
 
         return self.header.to_mcnp() + '\n'.join(tally.to_mcnp() for tally in self.tallies)
+
+    @staticmethod
+    def _shape(header: meshtal.Header) -> tuple[int]:
+        """
+        Computes dense array shapes from MESHTAL headers.
+
+        Parameters:
+            header: MESHTAL header.
+
+        Returns:
+            Number of energy, time, and spatial bins, including totals.
+        """
+
+        energy, time, i, j, k = header.to_edges()
+        columns = str(header.columns).lower()
+
+        return (
+            len(energy) - 1 + ('energy' in columns) if energy is not None else 1,
+            len(time) - 1 + ('time' in columns) if time is not None else 1,
+            *(len(edges) - 1 if edges is not None else 1 for edges in (i, j, k)),
+        )
+
+    @staticmethod
+    def _parse_matrices(header: meshtal.Header, source: str, across: str, down: str) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Parses matrix-format MESHTAL tables into dense arrays.
+
+        Matrix tables hold one spatial plane each, with the across bins as
+        columns and the down bins as rows, and come in result and relative
+        error pairs for every energy bin, time bin, and bin of the remaining
+        spatial axis. Every table is captured with one regular expression, and
+        all of their values are converted at once.
+
+        Parameters:
+            header: MESHTAL header.
+            source: MESHTAL tables.
+            across: Name of the axis along table columns.
+            down: Name of the axis along table rows.
+
+        Returns:
+            Results and relative errors by energy, time, and spatial bin.
+
+        Raises:
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        names = {'r': 0, 'z': 1, 'theta': 2, 'th': 2, 't': 2} if header.bins_r else {'x': 0, 'y': 1, 'z': 2}
+        across, down = names.get(across.lower()), names.get(down.lower())
+
+        if across is None or down is None or across == down:
+            raise errors.MeshtalError(errors.MeshtalCode.SYNTAX_FILE, source[:1000])
+
+        sizes = [len(edges) - 1 if edges is not None else 1 for edges in header.to_edges()]
+        fixed = 3 - across - down
+        rows = rf'[^\n]*\n[^\n]*\n((?:[^\n]*\n){{{sizes[2 + down]}}})'
+        source = source.rstrip() + '\n'
+        tables = re.findall(r'Tally Results:' + rows, source) + re.findall(r'Relative Errors' + rows, source)
+
+        # Totals follow energy and time bins when there are several of them.
+        for energy, time in ((sizes[0] + (sizes[0] > 1), sizes[1] + (sizes[1] > 1)), (sizes[0], sizes[1])):
+            if len(tables) == 2 * energy * time * sizes[2 + fixed]:
+                break
+        else:
+            raise errors.MeshtalError(errors.MeshtalCode.SYNTAX_FILE, source[:1000])
+
+        try:
+            values = numpy.array(''.join(tables).split(), dtype=numpy.float64)
+            values = values.reshape(2, energy, time, sizes[2 + fixed], sizes[2 + down], sizes[2 + across] + 1)[..., 1:]
+        except ValueError:
+            raise errors.MeshtalError(errors.MeshtalCode.SYNTAX_FILE, source[:1000])
+
+        positions = {fixed: 3, down: 4, across: 5}
+        values = numpy.ascontiguousarray(values.transpose(0, 1, 2, positions[0], positions[1], positions[2]))
+
+        return values[0], values[1]
+
+    @staticmethod
+    def _parse_arrays(header: meshtal.Header, source: str) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Parses MESHTAL tally lines into dense arrays.
+
+        In column format, results and relative errors are the last two
+        12-character fields of every line, so both are sliced out of the raw
+        bytes at once instead of being tokenized line by line. Matrix formats
+        are read by `_parse_matrices`.
+
+        Parameters:
+            header: MESHTAL header.
+            source: MESHTAL tally lines.
+
+        Returns:
+            Results and relative errors by energy, time, and spatial bin.
+
+        Raises:
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        matrix = re.search(r'Tally Results:\s+(\w+) \(across\) by (\w+) \(down\)', source)
+
+        if matrix:
+            return Meshtal._parse_matrices(header, source, matrix[1], matrix[2])
+
+        shape = Meshtal._shape(header)
+        buffer = numpy.frombuffer(source.rstrip().encode() + b'\n', dtype=numpy.uint8)
+        ends = numpy.flatnonzero(buffer == ord('\n'))
+        ends = ends[numpy.diff(ends, prepend=-1) > 24]
+
+        if len(ends) != numpy.prod(shape):
+            raise errors.MeshtalError(errors.MeshtalCode.SYNTAX_FILE, source[:1000])
+
+        fields = buffer[ends[:, None] + numpy.arange(-24, 0)].view('S12')
+
+        try:
+            values = fields.astype(numpy.float64)
+        except ValueError:
+            raise errors.MeshtalError(errors.MeshtalCode.SYNTAX_FILE, source[:1000])
+
+        return values[:, 0].reshape(shape), values[:, 1].reshape(shape)
+
+    def to_arrays(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Generates dense arrays from `Meshtal`.
+
+        Returns:
+            Results and relative errors with shape (energy, time, x, y, z),
+            or (energy, time, r, z, theta) for cylindrical meshes.
+
+        Raises:
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        if self._source is not None:
+            return Meshtal._parse_arrays(self.header, self._source)
+
+        # Tallies built in Python need not keep MESHTAL column widths.
+        values = numpy.array([tally.to_mcnp().split()[-2:] for tally in self.tallies], dtype=numpy.float64).reshape(-1, 2)
+        shape = Meshtal._shape(self.header)
+
+        if len(values) != numpy.prod(shape):
+            raise errors.MeshtalError(errors.MeshtalCode.SYNTAX_FILE, self.header)
+
+        return values[:, 0].reshape(shape), values[:, 1].reshape(shape)
+
+    def iter_arrays(self, size: int = 100000) -> typing.Generator[numpy.ndarray, None, None]:
+        """
+        Generates NumPy structured arrays from `Meshtal` in chunks.
+
+        Voxels follow MESHTAL line order, with `index` giving their flat
+        position in the `to_arrays` arrays. Energies and times are upper bin
+        boundaries, as in MESHTAL columns, with `nan` for totals and `inf`
+        for missing bins, and x, y, and z are bin centers, holding r, z, and
+        theta for cylindrical meshes.
+
+        Parameters:
+            size: Maximum number of voxels per chunk.
+
+        Returns:
+            Generator of structured arrays with `VOXEL` fields.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        if size < 1:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, size)
+
+        result, error = self.to_arrays()
+        edges = self.header.to_edges()
+        shape = result.shape
+
+        axes = []
+        for axis, (count, values) in enumerate(zip(shape, edges)):
+            if values is None:
+                axes.append(numpy.full(count, numpy.inf if axis < 2 else 0.0))
+            else:
+                # Totals follow the last bin.
+                axes.append(numpy.full(count, numpy.nan))
+                axes[-1][: len(values) - 1] = values[1:] if axis < 2 else (values[1:] + values[:-1]) / 2
+
+        result, error = result.ravel(), error.ravel()
+
+        def chunks():
+            for start in range(0, len(result), size):
+                index = numpy.arange(start, min(start + size, len(result)))
+                chunk = numpy.empty(len(index), dtype=Meshtal.VOXEL)
+                chunk['index'] = index
+
+                for name, axis, values in zip(('energy', 'time', 'x', 'y', 'z'), numpy.unravel_index(index, shape), axes):
+                    chunk[name] = values[axis]
+
+                chunk['result'] = result[index]
+                chunk['error'] = error[index]
+
+                yield chunk
+
+        return chunks()
+
+    @staticmethod
+    def _to_tally(voxel: numpy.void) -> meshtal.Tally:
+        """
+        Generates `meshtal.Tally` from voxel records.
+
+        Parameters:
+            voxel: Record with `VOXEL` fields.
+
+        Returns:
+            `meshtal.Tally`.
+        """
+
+        def column(value: float, form: str) -> types.String:
+            if numpy.isinf(value):
+                return None
+
+            return types.String('Total' if numpy.isnan(value) else format(value, form))
+
+        return meshtal.Tally(
+            column(voxel['result'], '.5E'),
+            column(voxel['error'], '.5E'),
+            x=column(voxel['x'], '.3f'),
+            y=column(voxel['y'], '.3f'),
+            z=column(voxel['z'], '.3f'),
+            energy=column(voxel['energy'], '.3E'),
+            time=column(voxel['time'], '.3E'),
+        )
+
+    @staticmethod
+    def tallies_index(filename: str | pathlib.Path, cache: bool = False) -> numpy.ndarray:
+        """
+        Indexes the tallies of MESHTAL files.
+
+        Scans the file once for mesh tally sections. With `cache`, the index
+        is also written to a `.index.npz` sidecar next to the file, tagged
+        with the file size and modification time, and later cached calls
+        reuse matching sidecars. Directories that cannot be written to, such
+        as read-only archives, keep only the returned index.
+
+        Parameters:
+            filename: MESHTAL file path.
+            cache: Reads and writes `.index.npz` sidecars if true.
+
+        Returns:
+            Structured array with one row per tally and `INDEX` fields.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        filename = pathlib.Path(filename)
+
+        if not filename.is_file():
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
+
+        sidecar = filename.with_name(filename.name + '.index.npz')
+        stat = filename.stat()
+
+        if cache and sidecar.is_file():
+            try:
+                with numpy.load(sidecar) as file:
+                    if file['size'] == stat.st_size and file['mtime'] == stat.st_mtime_ns:
+                        return file['index']
+            except (OSError, ValueError, KeyError):
+                pass
+
+        if Meshtal._compression(filename) is not None:
+            with Meshtal._decompress(filename, 'rb') as file:
+                index = Meshtal._scan(file.read())
+        elif stat.st_size:
+            with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                index = Meshtal._scan(buffer)
+        else:
+            raise errors.MeshtalError(errors.MeshtalCode.SYNTAX_FILE, filename)
+
+        if cache:
+            Meshtal._write_sidecar(sidecar, index=index, size=stat.st_size, mtime=stat.st_mtime_ns)
+
+        return index
+
+    @staticmethod
+    def _scan(buffer: bytes | mmap.mmap) -> numpy.ndarray:
+        """
+        Finds mesh tally sections in MESHTAL bytes.
+
+        Sections run from their `Mesh Tally Number` line to the next one, and
+        their headers end with the column heading after the bin boundaries.
+        Only headers are parsed, so tally lines are never decoded.
+
+        Parameters:
+            buffer: MESHTAL bytes.
+
+        Returns:
+            Structured array with one row per tally and `INDEX` fields.
+
+        Raises:
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        starts = []
+        start = buffer.find(b' Mesh Tally Number')
+        while start >= 0:
+            starts.append(start)
+            start = buffer.find(b' Mesh Tally Number', start + 1)
+
+        if not starts:
+            raise errors.MeshtalError(errors.MeshtalCode.SYNTAX_FILE, bytes(buffer[:1000]).decode(errors='replace'))
+
+        preamble = bytes(buffer[: starts[0]]).decode()
+        rows = []
+
+        for start, end in zip(starts, [*starts[1:], len(buffer)]):
+            bins = buffer.find(b'Tally bin boundaries:', start, end)
+            blank = buffer.find(b'\n\n', bins, end) if bins >= 0 else -1
+            stop = buffer.find(b'\n', blank + 2, end) + 1 if blank >= 0 else 0
+
+            if not stop:
+                raise errors.MeshtalError(errors.MeshtalCode.SYNTAX_FILE, bytes(buffer[start : start + 1000]).decode(errors='replace'))
+
+            header = meshtal.Header.from_mcnp(preamble + bytes(buffer[start:stop]).decode())
+            rows.append((header.number.value, str(header.particle).strip(), Meshtal._shape(header), start, stop - start, end - start))
+
+        return numpy.array(rows, dtype=Meshtal.INDEX)
+
+    @staticmethod
+    def get_tally(filename: str | pathlib.Path, number: int):
+        """
+        Generates `Meshtal` for one tally of MESHTAL files.
+
+        Reads only the file preamble and the tally section, so `to_arrays`
+        on the result parses that tally alone.
+
+        Parameters:
+            filename: MESHTAL file path.
+            number: Mesh tally number.
+
+        Returns:
+            `Meshtal`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+            MeshtalError: SEMANTICS_FILE.
+        """
+
+        filename = pathlib.Path(filename)
+        index = Meshtal.tallies_index(filename)
+        rows = index[index['number'] == number]
+
+        if not len(rows):
+            raise errors.MeshtalError(errors.MeshtalCode.SEMANTICS_FILE, number)
+
+        with Meshtal._decompress(filename, 'rb') as file:
+            preamble = file.read(int(index['offset'][0]))
+            file.seek(int(rows['offset'][0]))
+            section = file.read(int(rows['length'][0]))
+
+        return Meshtal.from_mcnp((preamble + section).decode())
+
+    def to_pyvista(self, energy: int = -1, time: int = -1) -> pyvista.RectilinearGrid | pyvista.StructuredGrid:
+        """
+        Generates VTK grids from `Meshtal`.
+
+        Rectangular meshes become rectilinear grids over the bin boundaries,
+        and cylindrical meshes become structured grids placed at their origin
+        and along their axis, with theta measured from an arbitrary direction
+        normal to the axis. Cylindrical grids order cells by r, theta, and z
+        to keep them right-handed, and split theta bins into cells spanning
+        at most 10 degrees to follow their arcs. Results and relative errors
+        are cell data.
+
+        Parameters:
+            energy: Energy bin index, with the last bin holding totals if any.
+            time: Time bin index, with the last bin holding totals if any.
+
+        Returns:
+            `pyvista.RectilinearGrid` or `pyvista.StructuredGrid`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        result, error = self.to_arrays()
+
+        try:
+            result, error = result[energy, time], error[energy, time]
+        except IndexError:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, (energy, time))
+
+        _, _, i, j, k = (edges if edges is not None else numpy.array([0.0, 1.0]) for edges in self.header.to_edges())
+
+        if self.header.bins_r:
+            origin = numpy.array(str(self.header.origin).split(), dtype=numpy.float64)
+            axis = numpy.array(str(self.header.axis).split(), dtype=numpy.float64)
+            axis /= numpy.linalg.norm(axis)
+            normal = numpy.eye(3)[int(abs(axis[0]) > 0.9)]
+            normal -= normal.dot(axis) * axis
+            normal /= numpy.linalg.norm(normal)
+
+            counts = numpy.maximum(numpy.ceil(numpy.diff(k) * 36).astype(numpy.int64), 1)
+            steps = numpy.arange(counts.sum()) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+            k = numpy.append(numpy.repeat(k[:-1], counts) + steps * numpy.repeat(numpy.diff(k) / counts, counts), k[-1])
+            result = numpy.repeat(result, counts, axis=2).transpose(0, 2, 1)
+            error = numpy.repeat(error, counts, axis=2).transpose(0, 2, 1)
+
+            r, angle, z = numpy.meshgrid(i, 2 * numpy.pi * k, j, indexing='ij')
+            points = origin + (r * numpy.cos(angle))[..., None] * normal + (r * numpy.sin(angle))[..., None] * numpy.cross(axis, normal) + z[..., None] * axis
+            grid = pyvista.StructuredGrid(*numpy.moveaxis(points, -1, 0))
+        else:
+            grid = pyvista.RectilinearGrid(i, j, k)
+
+        # VTK orders cells with the first axis fastest.
+        grid.cell_data['result'] = result.ravel(order='F')
+        grid.cell_data['error'] = error.ravel(order='F')
+
+        return grid
+
+    def to_vtk(self, path: str | pathlib.Path, energy: int = -1, time: int = -1):
+        """
+        Saves VTK grids from `Meshtal` for ParaView.
+
+        Parameters:
+            path: Path to new `.vtr` file for rectangular meshes or `.vts` file for cylindrical meshes.
+            energy: Energy bin index, with the last bin holding totals if any.
+            time: Time bin index, with the last bin holding totals if any.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        path = pathlib.Path(path)
+
+        if path.suffix != ('.vts' if self.header.bins_r else '.vtr'):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, path)
+
+        self.to_pyvista(energy, time).save(path)
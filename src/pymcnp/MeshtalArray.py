@@ -0,0 +1,511 @@
+import typing
+import pathlib
+
+import numpy
+
+from . import errors
+from .Meshtal import Meshtal
+
+
+class MeshtalArray:
+    """
+    Represents dense mesh tally results with relative errors.
+
+    `MeshtalArray` wraps the arrays from `Meshtal.to_arrays` and propagates
+    relative errors through arithmetic as whole-array NumPy operations,
+    treating operands as independent: sums and differences combine absolute
+    errors in quadrature, and products and quotients combine relative errors
+    in quadrature. Scalars and NumPy arrays, such as response functions, are
+    exact. Results keep the histories and bin boundaries of the left operand.
+
+    `rebin`, `collapse`, and `integrate` coarsen meshes, collapse energy and
+    time bins, and integrate over regions. They read results in slabs along
+    the first spatial axis, so results and errors may be memory-mapped
+    arrays, such as `numpy.load(path, mmap_mode='r')` arrays, larger than
+    memory.
+
+    Attributes:
+        result: Results by energy, time, and spatial bin.
+        error: Relative errors by energy, time, and spatial bin.
+        histories: Number of histories.
+        edges: Energy, time, and spatial bin boundaries.
+        cylindrical: Bins are r, z, and theta bins if true, and x, y, and z bins otherwise.
+    """
+
+    # Makes NumPy arrays defer to `MeshtalArray` operators.
+    __array_ufunc__ = None
+
+    def __init__(self, result: numpy.ndarray, error: numpy.ndarray, histories: int = 0, edges: tuple[numpy.ndarray] = None, cylindrical: bool = False):
+        """
+        Initializes `MeshtalArray`.
+
+        Parameters:
+            result: Results by energy, time, and spatial bin.
+            error: Relative errors by energy, time, and spatial bin.
+            histories: Number of histories.
+            edges: Energy, time, and spatial bin boundaries.
+            cylindrical: Bins are r, z, and theta bins if true, and x, y, and z bins otherwise.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        result = numpy.asarray(result, dtype=numpy.float64)
+        error = numpy.asarray(error, dtype=numpy.float64)
+
+        if result.shape != error.shape:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, (result.shape, error.shape))
+
+        if histories < 0:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, histories)
+
+        self.result: typing.Final[numpy.ndarray] = result
+        self.error: typing.Final[numpy.ndarray] = error
+        self.histories: typing.Final[int] = int(histories)
+        self.edges: typing.Final[tuple[numpy.ndarray]] = edges
+        self.cylindrical: typing.Final[bool] = bool(cylindrical)
+
+    @staticmethod
+    def from_meshtal(file: Meshtal):
+        """
+        Generates `MeshtalArray` from `Meshtal`.
+
+        Parameters:
+            file: MESHTAL with one tally.
+
+        Returns:
+            `MeshtalArray`.
+
+        Raises:
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        return MeshtalArray(*file.to_arrays(), file.header.histories.value, file.header.to_edges(), bool(file.header.bins_r))
+
+    @staticmethod
+    def from_file(filename: str | pathlib.Path, number: int = None):
+        """
+        Generates `MeshtalArray` from MESHTAL files.
+
+        Parameters:
+            filename: MESHTAL file path.
+            number: Mesh tally number to read from multi-tally files.
+
+        Returns:
+            `MeshtalArray`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+            MeshtalError: SYNTAX_FILE, SEMANTICS_FILE.
+        """
+
+        file = Meshtal.get_tally(filename, number) if number is not None else Meshtal.from_file(filename)
+
+        return MeshtalArray.from_meshtal(file)
+
+    @staticmethod
+    def _relative(result: numpy.ndarray, absolute: numpy.ndarray) -> numpy.ndarray:
+        """
+        Converts absolute errors to relative errors, which are zero for zero results.
+
+        Parameters:
+            result: Results.
+            absolute: Absolute errors.
+
+        Returns:
+            Relative errors.
+        """
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return numpy.where(result != 0, absolute / numpy.abs(result), 0.0)
+
+    def _operand(self, other) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Unpacks operands into results and relative errors.
+
+        Parameters:
+            other: `MeshtalArray`, NumPy array, or scalar.
+
+        Returns:
+            Results and relative errors.
+
+        Raises:
+            MeshtalError: SEMANTICS_FILE.
+        """
+
+        if not isinstance(other, MeshtalArray):
+            return numpy.asarray(other, dtype=numpy.float64), numpy.zeros(())
+
+        edges = zip(self.edges, other.edges) if self.edges is not None and other.edges is not None else ()
+
+        if self.result.shape != other.result.shape or self.cylindrical != other.cylindrical or any((a is None) != (b is None) or (a is not None and not numpy.array_equal(a, b)) for a, b in edges):
+            raise errors.MeshtalError(errors.MeshtalCode.SEMANTICS_FILE, other)
+
+        return other.result, other.error
+
+    def _sum(self, result: numpy.ndarray, error: numpy.ndarray, sign: float):
+        """
+        Adds or subtracts operands.
+
+        Parameters:
+            result: Operand results.
+            error: Operand relative errors.
+            sign: `1` to add or `-1` to subtract.
+
+        Returns:
+            `MeshtalArray`.
+        """
+
+        total = self.result + sign * result
+        absolute = numpy.hypot(self.error * numpy.abs(self.result), error * numpy.abs(result))
+
+        return MeshtalArray(total, self._relative(total, absolute), self.histories, self.edges, self.cylindrical)
+
+    def __add__(self, other):
+        return self._sum(*self._operand(other), 1.0)
+
+    def __radd__(self, other):
+        return self._sum(*self._operand(other), 1.0)
+
+    def __sub__(self, other):
+        return self._sum(*self._operand(other), -1.0)
+
+    def __rsub__(self, other):
+        return -self._sum(*self._operand(other), -1.0)
+
+    def __neg__(self):
+        return MeshtalArray(-self.result, self.error, self.histories, self.edges, self.cylindrical)
+
+    def __mul__(self, other):
+        result, error = self._operand(other)
+
+        return MeshtalArray(self.result * result, numpy.hypot(self.error, error), self.histories, self.edges, self.cylindrical)
+
+    def __rmul__(self, other):
+        return self.__mul__(other)
+
+    def __truediv__(self, other):
+        result, error = self._operand(other)
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return MeshtalArray(self.result / result, numpy.hypot(self.error, error), self.histories, self.edges, self.cylindrical)
+
+    def __rtruediv__(self, other):
+        result, error = self._operand(other)
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            return MeshtalArray(result / self.result, numpy.hypot(self.error, error), self.histories, self.edges, self.cylindrical)
+
+    @staticmethod
+    def merge(arrays: typing.Iterable, weights: typing.Iterable[float] = None):
+        """
+        Merges independent replicas of one mesh tally.
+
+        Results are weighted means, and absolute errors combine in quadrature
+        with the same weights, as for the mean of independent runs. Arrays
+        are accumulated one at a time, so replicas can stream from files.
+
+        Parameters:
+            arrays: `MeshtalArray` or `Meshtal` replicas.
+            weights: Replica weights, or `None` for their histories.
+
+        Returns:
+            `MeshtalArray` with the summed histories.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+            MeshtalError: SEMANTICS_FILE.
+        """
+
+        weights = iter(weights) if weights is not None else None
+        first = None
+        histories = 0
+        total = 0.0
+
+        for array in arrays:
+            array = array if isinstance(array, MeshtalArray) else MeshtalArray.from_meshtal(array)
+            weight = float(next(weights, numpy.nan)) if weights is not None else float(array.histories)
+
+            if not weight >= 0:
+                raise errors.CliError(errors.CliCode.RUNTIME_DOER, weight)
+
+            if first is None:
+                first = array
+                result = numpy.zeros_like(array.result)
+                variance = numpy.zeros_like(array.result)
+
+            first._operand(array)
+            result += weight * array.result
+            variance += (weight * array.error * array.result) ** 2
+            histories += array.histories
+            total += weight
+
+        if first is None or not total > 0 or (weights is not None and next(weights, None) is not None):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, weights)
+
+        result /= total
+
+        return MeshtalArray(result, MeshtalArray._relative(result, numpy.sqrt(variance) / total), histories, first.edges, first.cylindrical)
+
+    @staticmethod
+    def _check_edges(edges: typing.Iterable[float]) -> numpy.ndarray:
+        """
+        Checks bin boundaries.
+
+        Parameters:
+            edges: Bin boundaries.
+
+        Returns:
+            Bin boundaries.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        edges = numpy.asarray(edges, dtype=numpy.float64)
+
+        if edges.ndim != 1 or len(edges) < 2 or (numpy.diff(edges) <= 0).any():
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, edges)
+
+        return edges
+
+    def _measures(self, axis: int, edges: numpy.ndarray) -> numpy.ndarray:
+        """
+        Computes bin widths, or areas over pi for cylindrical r bins.
+
+        Parameters:
+            axis: Array axis.
+            edges: Bin boundaries.
+
+        Returns:
+            Bin measures.
+        """
+
+        return numpy.diff(edges**2 if self.cylindrical and axis == 2 else edges)
+
+    def _overlap(self, axis: int, old: numpy.ndarray, new: numpy.ndarray) -> numpy.ndarray:
+        """
+        Computes overlap matrices between old and new bins.
+
+        Energy and time bins hold integrals, so old bins split between new
+        bins by overlap fraction. Spatial bins hold averages, so new bins
+        average old bins weighted by overlapping lengths, areas, or angles.
+
+        Parameters:
+            axis: Array axis.
+            old: Old bin boundaries.
+            new: New bin boundaries.
+
+        Returns:
+            Weights by old and new bin.
+        """
+
+        if self.cylindrical and axis == 2:
+            old, new = old**2, new**2
+
+        overlap = numpy.clip(numpy.minimum(old[1:, None], new[None, 1:]) - numpy.maximum(old[:-1, None], new[None, :-1]), 0, None)
+
+        return overlap / numpy.diff(old)[:, None] if axis < 2 else overlap / numpy.diff(new)[None, :]
+
+    @staticmethod
+    def _apply(array: numpy.ndarray, weights: numpy.ndarray, axis: int) -> numpy.ndarray:
+        """
+        Applies overlap matrices along axes.
+
+        Parameters:
+            array: Array to rebin.
+            weights: Weights by old and new bin.
+            axis: Array axis.
+
+        Returns:
+            Rebinned array.
+        """
+
+        return numpy.moveaxis(numpy.tensordot(array, weights, axes=([axis], [0])), -1, axis)
+
+    def _rows(self, size: int) -> int:
+        """
+        Computes slab lengths along the first spatial axis.
+
+        Parameters:
+            size: Maximum number of voxels per slab.
+
+        Returns:
+            Number of first spatial axis bins per slab.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        if size < 1:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, size)
+
+        return max(size // max(self.result[:, :, :1].size, 1), 1)
+
+    def rebin(
+        self,
+        energy: typing.Iterable[float] = None,
+        time: typing.Iterable[float] = None,
+        i: typing.Iterable[float] = None,
+        j: typing.Iterable[float] = None,
+        k: typing.Iterable[float] = None,
+        size: int = 10000000,
+    ):
+        """
+        Rebins `MeshtalArray` onto new bin boundaries.
+
+        Spatial results become volume-weighted averages of the overlapping
+        old voxels, and energy and time results split old bins by overlap
+        fraction, so sums over energy and time are kept. Overlaps come from
+        one matrix per axis, applied with `numpy.tensordot`, and absolute
+        errors combine in quadrature through the squared matrices. Energy
+        and time totals are dropped from rebinned axes.
+
+        Parameters:
+            energy: New energy bin boundaries, or `None` to keep them.
+            time: New time bin boundaries, or `None` to keep them.
+            i: New x, or r, bin boundaries, or `None` to keep them.
+            j: New y, or z, bin boundaries, or `None` to keep them.
+            k: New z, or theta, bin boundaries, or `None` to keep them.
+            size: Maximum number of voxels read at once.
+
+        Returns:
+            `MeshtalArray`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        if self.edges is None:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, self.edges)
+
+        news = [self._check_edges(values) if values is not None else None for values in (energy, time, i, j, k)]
+        weights = []
+        slices = []
+        for axis, (old, new) in enumerate(zip(self.edges, news)):
+            if new is None:
+                weights.append(None)
+                slices.append(slice(None))
+                continue
+
+            if old is None:
+                raise errors.CliError(errors.CliCode.RUNTIME_DOER, axis)
+
+            weights.append(self._overlap(axis, old, new))
+            slices.append(slice(0, len(old) - 1))
+
+        shape = tuple(len(new) - 1 if new is not None else length for new, length in zip(news, self.result.shape))
+        result = numpy.zeros(shape)
+        variance = numpy.zeros(shape)
+        rows = self._rows(size)
+
+        for start in range(0, self.result.shape[2], rows):
+            stop = min(start + rows, self.result.shape[2])
+            window = (slices[0], slices[1], slice(start, stop), slices[3], slices[4])
+            slab = numpy.asarray(self.result[window], dtype=numpy.float64)
+            squares = (numpy.asarray(self.error[window], dtype=numpy.float64) * slab) ** 2
+
+            for axis in (0, 1, 3, 4):
+                if weights[axis] is not None:
+                    slab = self._apply(slab, weights[axis], axis)
+                    squares = self._apply(squares, weights[axis] ** 2, axis)
+
+            if weights[2] is not None:
+                result += self._apply(slab, weights[2][start:stop], 2)
+                variance += self._apply(squares, weights[2][start:stop] ** 2, 2)
+            else:
+                result[:, :, start:stop] = slab
+                variance[:, :, start:stop] = squares
+
+        edges = tuple(new if new is not None else old for old, new in zip(self.edges, news))
+
+        return MeshtalArray(result, self._relative(result, numpy.sqrt(variance)), self.histories, edges, self.cylindrical)
+
+    def collapse(self, energy: bool = True, time: bool = False, size: int = 10000000):
+        """
+        Collapses energy or time bins into single bins.
+
+        Parameters:
+            energy: Collapses energy bins if true.
+            time: Collapses time bins if true.
+            size: Maximum number of voxels read at once.
+
+        Returns:
+            `MeshtalArray`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        if self.edges is None:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, self.edges)
+
+        energies, times = (self.edges[axis][[0, -1]] if flag and self.edges[axis] is not None else None for axis, flag in enumerate((energy, time)))
+
+        return self.rebin(energy=energies, time=times, size=size)
+
+    @property
+    def volumes(self) -> numpy.ndarray:
+        """
+        Voxel volumes, or ones without spatial bin boundaries.
+        """
+
+        shape = self.result.shape[2:]
+
+        if self.edges is None:
+            return numpy.ones(shape)
+
+        i, j, k = (self._measures(axis, edges) if edges is not None else numpy.ones(length) for axis, edges, length in zip((2, 3, 4), self.edges[2:], shape))
+
+        return (numpy.pi if self.cylindrical else 1.0) * i[:, None, None] * j[None, :, None] * k[None, None, :]
+
+    def integrate(self, mask: numpy.ndarray = None, average: bool = False, size: int = 10000000):
+        """
+        Integrates `MeshtalArray` over regions.
+
+        Sums results times voxel volumes over the voxels in `mask`, with
+        absolute errors combined in quadrature, for every energy and time
+        bin.
+
+        Parameters:
+            mask: Boolean array broadcasting to the result shape, or `None` for all voxels.
+            average: Divides integrals by region volumes if true.
+            size: Maximum number of voxels read at once.
+
+        Returns:
+            `MeshtalArray` by energy and time bin.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        if mask is None:
+            mask = numpy.ones(self.result.shape[2:], dtype=bool)
+
+        try:
+            mask = numpy.broadcast_to(mask, self.result.shape)
+        except ValueError:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, numpy.shape(mask))
+
+        volumes = self.volumes
+        result = numpy.zeros(self.result.shape[:2])
+        variance = numpy.zeros(self.result.shape[:2])
+        volume = numpy.zeros(self.result.shape[:2])
+        rows = self._rows(size)
+
+        for start in range(0, self.result.shape[2], rows):
+            window = (slice(None), slice(None), slice(start, start + rows))
+            weights = numpy.where(mask[window], volumes[start : start + rows], 0.0)
+            slab = numpy.asarray(self.result[window], dtype=numpy.float64) * weights
+
+            result += slab.sum(axis=(2, 3, 4))
+            variance += ((numpy.asarray(self.error[window], dtype=numpy.float64) * slab) ** 2).sum(axis=(2, 3, 4))
+            volume += weights.sum(axis=(2, 3, 4))
+
+        if average:
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                result, variance = result / volume, variance / volume**2
+
+        edges = self.edges[:2] if self.edges is not None else None
+
+        return MeshtalArray(result, self._relative(result, numpy.sqrt(variance)), self.histories, edges)
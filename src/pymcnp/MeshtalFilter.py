@@ -1,3 +1,8 @@
+import typing
+import pathlib
+
+import numpy
+
 from . import _doer
 from . import meshtal
 from .Meshtal import Meshtal
@@ -6,6 +11,11 @@ from .Meshtal import Meshtal
 class MeshtalFilter(_doer.Doer):
     """
     Filters `Meshtal`.
+
+    Calling `MeshtalFilter` runs `check` once per tally line. Batch mode runs
+    `check_batch` once per chunk of `Meshtal.VOXEL` structured arrays
+    instead, which by default runs `check` on every voxel of the chunk, so
+    subclasses overriding only `check` keep working.
     """
 
     def check(self, tally: meshtal.Tally) -> bool:
@@ -21,6 +31,45 @@ class MeshtalFilter(_doer.Doer):
 
         return True
 
+    def check_batch(self, arrays: numpy.ndarray) -> numpy.ndarray:
+        """
+        Runs when filtering chunks of voxels.
+
+        Parameters:
+            arrays: Structured array with `Meshtal.VOXEL` fields.
+
+        Returns:
+            Mask of voxels to keep.
+        """
+
+        if type(self).check is MeshtalFilter.check:
+            return numpy.ones(len(arrays), dtype=bool)
+
+        return numpy.fromiter((self.check(Meshtal._to_tally(voxel)) for voxel in arrays), dtype=bool, count=len(arrays))
+
+    def filter_arrays(self, source: str | pathlib.Path | Meshtal | typing.Iterable[numpy.ndarray], size: int = 100000) -> typing.Generator[numpy.ndarray, None, None]:
+        """
+        Filters `Meshtal` in batch mode.
+
+        Parameters:
+            source: MESHTAL file path, file, or stream of structured arrays.
+            size: Maximum number of voxels per chunk read from files.
+
+        Returns:
+            Generator of structured arrays holding accepted voxels.
+
+        Raises:
+            CliError: RUNTIME_PATH, RUNTIME_DOER.
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        if isinstance(source, (str, pathlib.Path)):
+            source = Meshtal.from_file(source)
+
+        chunks = source.iter_arrays(size) if isinstance(source, Meshtal) else source
+
+        return (chunk[self.check_batch(chunk)] for chunk in chunks)
+
     def __call__(self, file: Meshtal):
         """
         Filters given `Meshtal`.
@@ -1,3 +1,8 @@
+import typing
+import pathlib
+
+import numpy
+
 from . import _doer
 from . import meshtal
 from .Meshtal import Meshtal
@@ -6,6 +11,11 @@ from .Meshtal import Meshtal
 class MeshtalProcessor(_doer.Doer):
     """
     Processes `Meshtal`.
+
+    Calling `MeshtalProcessor` runs `process` once per tally line. Batch mode
+    runs `process_batch` once per chunk of `Meshtal.VOXEL` structured arrays
+    instead, which by default runs `process` on every voxel of the chunk, so
+    subclasses overriding only `process` keep working.
     """
 
     def prehook(self):
@@ -32,6 +42,45 @@ class MeshtalProcessor(_doer.Doer):
 
         pass
 
+    def process_batch(self, arrays: numpy.ndarray):
+        """
+        Processes chunks of voxels.
+
+        Parameters:
+            arrays: Structured array with `Meshtal.VOXEL` fields.
+        """
+
+        if type(self).process is MeshtalProcessor.process:
+            return
+
+        for voxel in arrays:
+            self.process(Meshtal._to_tally(voxel))
+
+    def process_arrays(self, source: str | pathlib.Path | Meshtal | typing.Iterable[numpy.ndarray], size: int = 100000):
+        """
+        Processes `Meshtal` in batch mode.
+
+        Parameters:
+            source: MESHTAL file path, file, or stream of structured arrays.
+            size: Maximum number of voxels per chunk read from files.
+
+        Raises:
+            CliError: RUNTIME_PATH, RUNTIME_DOER.
+            MeshtalError: SYNTAX_FILE.
+        """
+
+        if isinstance(source, (str, pathlib.Path)):
+            source = Meshtal.from_file(source)
+
+        chunks = source.iter_arrays(size) if isinstance(source, Meshtal) else source
+
+        self.prehook()
+
+        for chunk in chunks:
+            self.process_batch(chunk)
+
+        self.posthook()
+
     def __call__(self, file: Meshtal):
         """
         Processes `Meshtal`.
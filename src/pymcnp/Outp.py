@@ -11,6 +11,11 @@ class Outp(_file.File):
     """
     Represents OUTP files.
 
+    Blocks are dispatched on their leading words, and tally blocks on their
+    tally type and statistical checks, so every block is matched against one
+    parser. Blocks without parsers, or not matching theirs, are kept as
+    `outp.Raw` text.
+
     Attributes:
         header: OUPT header.
         blocks: OUTP tables.
@@ -19,6 +24,29 @@ class Outp(_file.File):
 
     _REGEX = re.compile(rf'\A({outp.Header._REGEX.pattern[2:-2]})([\s\S]*)\Z', re.IGNORECASE)
 
+    # Block parsers by leading words.
+    _BLOCKS: typing.Final[dict[str, type]] = {
+        '1mcnp': outp.Mcnp,
+        '1starting mcrun.': outp.StartingMcrun,
+        '1problem summary': outp.ProblemSummary,
+        '1neutron activity': outp.NeutronActivity,
+        '1photon activity': outp.PhotonActivity,
+        '1analysis of': outp.AnalysisTallyFluctuation,
+        '1unnormed tally': outp.UnnormedTallyDensity,
+    }
+
+    # Tally block parsers by tally type and whether the tally passes the statistical checks.
+    _TALLIES: typing.Final[dict[tuple[str, bool], type]] = {
+        ('1', True): outp.Tally_1A,
+        ('1', False): outp.Tally_1B,
+        ('2', True): outp.Tally_2,
+        ('4', True): outp.Tally_4,
+        ('8', True): outp.Tally_8A,
+        ('8', False): outp.Tally_8B,
+    }
+
+    _TALLY_TYPE = re.compile(r'\n +tally type (\d+)')
+
     def __init__(
         self,
         header: outp.Header,
@@ -74,16 +102,7 @@ class Outp(_file.File):
             else:
                 subsource = '1' + subsource
 
-            for subclass in outp.Block.__subclasses__():
-                try:
-                    if block := subclass.from_mcnp(subsource):
-                        break
-                except Exception:
-                    continue
-            else:
-                continue
-
-            blocks.append(block)
+            blocks.append(Outp._parse_block(subsource))
 
         blocks = types.Tuple(outp.Block)(blocks)
 
@@ -92,6 +111,45 @@ class Outp(_file.File):
             blocks,
         )
 
+    @staticmethod
+    def _dispatch(source: str) -> type:
+        """
+        Finds parsers for OUTP blocks.
+
+        Parameters:
+            source: OUTP block.
+
+        Returns:
+            `outp.Block` subclass, or `outp.Raw` for blocks without parsers.
+        """
+
+        words = source[:80].split(maxsplit=2)
+
+        if words[0] == '1tally' and len(words) > 1 and words[1].isdigit():
+            tally_type = Outp._TALLY_TYPE.match(source, source.find('\n'))
+            passed = 'did not pass' not in source[-200:]
+
+            return Outp._TALLIES.get((tally_type[1], passed), outp.Raw) if tally_type else outp.Raw
+
+        return Outp._BLOCKS.get(' '.join(words[:2]), Outp._BLOCKS.get(words[0], outp.Raw))
+
+    @staticmethod
+    def _parse_block(source: str) -> outp.Block:
+        """
+        Generates `outp.Block` from OUTP blocks.
+
+        Parameters:
+            source: OUTP block.
+
+        Returns:
+            `outp.Block`, or `outp.Raw` for blocks without parsers or not matching theirs.
+        """
+
+        try:
+            return Outp._dispatch(source).from_mcnp(source)
+        except errors.Error:
+            return outp.Raw.from_mcnp(source)
+
     def to_mcnp(self):
         """
         Generates OUTP from `Outp`.
@@ -1,7 +1,16 @@
-import re
+import io
+import mmap
 import typing
+import pathlib
+import collections
+import concurrent.futures
+
+import numpy
+import pandas
+import fastparquet
 
 from . import _file
+from . import _expression
 from . import ptrac
 from . import types
 from . import errors
@@ -16,11 +25,6 @@ class Ptrac(_file.File):
         histories: PTRAC histories.
     """
 
-    _REGEX = re.compile(
-        r'\A(   -1\n.{60}\n[^\n]{80}\n(?:\s[^\n]{120}\n)+\s[^\n]{100}\n(?:\s(?:[^\n]{4})+\n)+?)((?:[^\n]+\n(?:(?:(?:(?:\s[^\n]{50})|(?:\s[^\n]{60})|(?:\s[^\n]{60})|(?:\s[^\n]{70})|(?:\s[^\n]{60})|(?:\s[^\n]{70})|(?:\s[^\n]{70})|(?:\s[^\n]{80}))\n(?:\s[^\n]{39})|(?:\s[^\n]{117}))\n)+)+)\Z',
-        re.IGNORECASE,
-    )
-
     def __init__(self, header: ptrac.Header, histories: typing.Generator[ptrac.History, None, None]):
         """
         Initializes `Ptrac`.
@@ -60,15 +64,1015 @@ class Ptrac(_file.File):
             PtracError: SYNTAX_FILE.
         """
 
-        tokens = Ptrac._REGEX.match(source)
+        file = io.StringIO(source)
+        header = Ptrac._read_header(file)
+        decoder = ptrac.Decoder(header)
+        histories = [ptrac.History.from_mcnp(block, decoder) for block in Ptrac._read_blocks(file)]
 
-        if not tokens:
+        if not histories:
             raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, source)
 
-        header = ptrac.Header.from_mcnp(tokens[1])
-        histories = types.Tuple(ptrac.History)([ptrac.History.from_mcnp(match[0]) for match in re.finditer(ptrac.History._REGEX.pattern[2:-2], tokens[2])])
+        return Ptrac(header, types.Tuple(ptrac.History)(histories))
+
+    @classmethod
+    def from_file(cls, filename: str | pathlib.Path, workers: int = None):
+        """
+        Generates `Ptrac` from PTRAC files.
+
+        Reads ASCII files and binary `file=bin` files alike. With `workers`,
+        ASCII files are split into byte ranges at history boundaries and
+        parsed in a process pool.
+
+        Parameters:
+            filename: PTRAC file path.
+            workers: Number of worker processes.
+
+        Returns:
+            `Ptrac`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+            PtracError: SYNTAX_FILE.
+        """
+
+        if workers and Ptrac._splittable(filename):
+            histories = list(Ptrac.iter_histories(filename, workers=workers))
+
+            if not histories:
+                raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, filename)
+
+            with Ptrac._decompress(filename) as file:
+                header = Ptrac._read_header(file)
+
+            return Ptrac(header, types.Tuple(ptrac.History)(histories))
+
+        if not ptrac.Binary.is_binary(filename):
+            return super().from_file(filename)
+
+        with ptrac.Binary(filename) as binary:
+            histories = list(binary.iter_histories())
+
+        if not histories:
+            raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, filename)
+
+        return Ptrac(binary.header, types.Tuple(ptrac.History)(histories))
+
+    @staticmethod
+    def open(filename: str | pathlib.Path):
+        """
+        Generates `Ptrac` from PTRAC files lazily.
+
+        Reads the header eagerly and the histories one at a time while
+        iterating, so memory stays bounded by one history. Binary files are
+        memory-mapped instead of read line by line.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            `Ptrac` with generator histories.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        filename = pathlib.Path(filename)
+
+        if not filename.is_file():
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
+
+        if ptrac.Binary.is_binary(filename):
+            binary = ptrac.Binary(filename)
+            return Ptrac(binary.header, Ptrac._closing(binary, binary.iter_histories()))
+
+        stream = Ptrac._stream(filename)
+        header = next(stream)
+
+        return Ptrac(header, stream)
+
+    @staticmethod
+    def iter_histories(filename: str | pathlib.Path, workers: int = None) -> typing.Generator[ptrac.History, None, None]:
+        """
+        Generates `ptrac.History` from PTRAC files one at a time.
+
+        With `workers`, ASCII files are split into byte ranges at history
+        boundaries and parsed in a process pool, yielding histories in file
+        order.
+
+        Parameters:
+            filename: PTRAC file path.
+            workers: Number of worker processes.
+
+        Returns:
+            Generator of `ptrac.History`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        if workers and Ptrac._splittable(filename):
+            index = Ptrac._load_ranges(filename)
+            ranges = Ptrac._ranges(index, max(1, index['length'].sum() // (4 * workers)))
+
+            return (history for histories in Ptrac._map_ranges(filename, ranges, False, workers) for history in histories)
+
+        return Ptrac.open(filename).histories
+
+    @staticmethod
+    def iter_arrays(filename: str | pathlib.Path, size: int = 100000, workers: int = None) -> typing.Generator[numpy.ndarray, None, None]:
+        """
+        Generates NumPy structured arrays from PTRAC files in chunks.
+
+        Chunks hold whole histories and at least `size` events, except the
+        last one. Events are decoded straight from their fixed-width columns,
+        or gathered straight from the records of binary files, without
+        building `ptrac.History` objects. With `workers`, ASCII chunks are
+        decoded in a process pool and hold roughly `size` events each.
+
+        Parameters:
+            filename: PTRAC file path.
+            size: Minimum number of events per chunk.
+            workers: Number of worker processes.
+
+        Returns:
+            Generator of structured arrays with `ptrac.Decoder.DTYPE` fields.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        filename = pathlib.Path(filename)
+
+        if not filename.is_file():
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
+
+        if ptrac.Binary.is_binary(filename):
+            binary = ptrac.Binary(filename)
+            return Ptrac._closing(binary, binary.iter_arrays(size))
+
+        if workers and Ptrac._splittable(filename):
+            index = Ptrac._load_ranges(filename)
+            return Ptrac._map_ranges(filename, Ptrac._ranges(index, size * Ptrac._event_length(filename)), True, workers)
+
+        return Ptrac._stream_arrays(filename, size)
+
+    @staticmethod
+    def build_index(filename: str | pathlib.Path) -> numpy.ndarray:
+        """
+        Builds byte-offset history indexes for PTRAC files.
+
+        Scans the file once for history boundaries and writes the index to a
+        `.index.npz` sidecar next to it, tagged with the file size and
+        modification time. Directories that cannot be written to, such as
+        read-only archives, keep only the returned index.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            Structured array with one row per history and `ptrac.Decoder.INDEX` fields.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        filename = pathlib.Path(filename)
+
+        if not filename.is_file():
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
+
+        if ptrac.Binary.is_binary(filename):
+            with ptrac.Binary(filename) as binary:
+                index = binary.to_index()
+        else:
+            index = Ptrac._scan(filename)
+
+        stat = filename.stat()
+        Ptrac._write_sidecar(Ptrac._sidecar(filename), index=index, size=stat.st_size, mtime=stat.st_mtime_ns)
+
+        return index
+
+    @staticmethod
+    def get_history(filename: str | pathlib.Path, nps: int) -> ptrac.History:
+        """
+        Generates `ptrac.History` for one NPS from PTRAC files.
+
+        Reuses the sidecar index when it matches the file size and
+        modification time, and builds it otherwise.
+
+        Parameters:
+            filename: PTRAC file path.
+            nps: History NPS.
+
+        Returns:
+            `ptrac.History`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+            PtracError: SEMANTICS_FILE.
+        """
+
+        filename = pathlib.Path(filename)
+        index = Ptrac._load_index(filename)
+        rows = index[index['nps'] == nps]
+
+        if not len(rows):
+            raise errors.PtracError(errors.PtracCode.SEMANTICS_FILE, nps)
+
+        return next(Ptrac._read_indexed(filename, rows[:1]))
+
+    @staticmethod
+    def histories_between(filename: str | pathlib.Path, a: int, b: int) -> typing.Generator[ptrac.History, None, None]:
+        """
+        Generates `ptrac.History` for an NPS range from PTRAC files.
+
+        Parameters:
+            filename: PTRAC file path.
+            a: First NPS, inclusive.
+            b: Last NPS, inclusive.
+
+        Returns:
+            Generator of `ptrac.History`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        filename = pathlib.Path(filename)
+        index = Ptrac._load_index(filename)
+
+        return Ptrac._read_indexed(filename, index[(index['nps'] >= a) & (index['nps'] <= b)])
+
+    @staticmethod
+    def build_spatial_index(filename: str | pathlib.Path, where: str = None, size: int = 100000) -> ptrac.Spatial:
+        """
+        Builds KD-tree indexes over PTRAC event positions.
+
+        Reads the file once in columnar chunks and writes the indexed
+        positions to a `.spatial.npz` sidecar next to it, tagged with the
+        file size, modification time, and predicate. Directories that cannot
+        be written to keep only the returned index.
+
+        Parameters:
+            filename: PTRAC file path.
+            where: Predicate selecting the events to index, for example
+                `event_type >= 4000 & event_type < 5000` for collisions.
+            size: Minimum number of events per chunk.
+
+        Returns:
+            `ptrac.Spatial`.
+
+        Raises:
+            CliError: RUNTIME_PATH, RUNTIME_DOER.
+        """
+
+        filename = pathlib.Path(filename)
+
+        if not filename.is_file():
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
+
+        expression = _expression.Expression(where, ptrac.Decoder.DTYPE.names) if where is not None else None
+        spatial = ptrac.Spatial.from_arrays(Ptrac.iter_arrays(filename, size), expression)
+
+        stat = filename.stat()
+        Ptrac._write_sidecar(
+            Ptrac._spatial_sidecar(filename),
+            nps=spatial.nps,
+            event=spatial.event,
+            points=spatial.tree.data,
+            where=numpy.array([] if where is None else [where], dtype=str),
+            size=stat.st_size,
+            mtime=stat.st_mtime_ns,
+        )
+
+        return spatial
+
+    @staticmethod
+    def load_spatial_index(filename: str | pathlib.Path, where: str = None) -> ptrac.Spatial:
+        """
+        Loads KD-tree indexes over PTRAC event positions.
+
+        Rebuilds the KD-tree from the sidecar positions when they match the
+        file size, modification time, and predicate, and reads the file
+        otherwise.
+
+        Parameters:
+            filename: PTRAC file path.
+            where: Predicate selecting the events to index.
+
+        Returns:
+            `ptrac.Spatial`.
+
+        Raises:
+            CliError: RUNTIME_PATH, RUNTIME_DOER.
+        """
+
+        filename = pathlib.Path(filename)
+
+        if not filename.is_file():
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
+
+        sidecar = Ptrac._spatial_sidecar(filename)
+
+        if sidecar.is_file():
+            stat = filename.stat()
+
+            try:
+                with numpy.load(sidecar) as file:
+                    if (file['size'], file['mtime'], file['where'].tolist()) == (stat.st_size, stat.st_mtime_ns, [] if where is None else [where]):
+                        return ptrac.Spatial(file['nps'], file['event'], file['points'])
+            except (OSError, ValueError, KeyError):
+                pass
+
+        return Ptrac.build_spatial_index(filename, where)
+
+    @staticmethod
+    def merge(paths: typing.Iterable[str | pathlib.Path], out: str | pathlib.Path, renumber: str = None, parquet: bool = False, row_group_size: int = 100000):
+        """
+        Merges PTRAC files from replica runs.
+
+        Streams histories from every file into one output one at a time, so
+        memory stays bounded by one history, or by one row group for PARQUET
+        outputs. Headers must agree on code, version, n-line, and l-line, and
+        the output keeps the header of the first file. `renumber` keeps NPS
+        unique: `'offset'` shifts every file past the largest NPS of the files
+        before it, and `'sequential'` numbers histories from one.
+
+        Parameters:
+            paths: PTRAC file paths.
+            out: Path to new PTRAC or PARQUET file.
+            renumber: NPS renumbering, `'offset'` or `'sequential'`.
+            parquet: Writes PARQUET instead of PTRAC if true.
+            row_group_size: Minimum number of events per PARQUET row group.
+
+        Raises:
+            CliError: RUNTIME_PATH, RUNTIME_DOER.
+            PtracError: SEMANTICS_FILE.
+        """
+
+        paths = [pathlib.Path(path) for path in paths]
+
+        if not paths:
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, paths)
+
+        for path in paths:
+            if not path.is_file():
+                raise errors.CliError(errors.CliCode.RUNTIME_PATH, path)
+
+        if renumber not in {None, 'offset', 'sequential'}:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, renumber)
+
+        decoder = None
+        for path in paths:
+            stream = Ptrac._stream_blocks(path)
+            other = next(stream)
+            stream.close()
+
+            if decoder is None:
+                decoder = other
+            elif Ptrac._layout(other.header) != Ptrac._layout(decoder.header):
+                raise errors.PtracError(errors.PtracCode.SEMANTICS_FILE, path)
+
+        if renumber is not None and 1 not in decoder.i_layout:
+            raise errors.PtracError(errors.PtracCode.SEMANTICS_FILE, renumber)
+
+        blocks = Ptrac._merge_blocks(paths, renumber)
+
+        if parquet:
+            Ptrac.write_parquet(Ptrac._chunk_blocks(decoder, blocks, row_group_size), out)
+            return
+
+        with Ptrac._compress(out) as file:
+            file.write(decoder.header.to_mcnp())
+            file.writelines(blocks)
+
+    @staticmethod
+    def _layout(header: ptrac.Header) -> tuple[str]:
+        """
+        Summarizes the parts of `ptrac.Header` merged files must share.
+
+        Parameters:
+            header: PTRAC header.
+
+        Returns:
+            Code, version, n-line, and l-line.
+        """
+
+        return str(header.code).strip(), str(header.version).strip(), header.n_line.to_mcnp(), header.l_line.to_mcnp()
+
+    @staticmethod
+    def _merge_blocks(paths: list[pathlib.Path], renumber: str):
+        """
+        Yields history blocks from PTRAC files one after another.
+
+        Parameters:
+            paths: PTRAC file paths.
+            renumber: NPS renumbering, `'offset'` or `'sequential'`.
+
+        Raises:
+            PtracError: SEMANTICS_FILE.
+        """
+
+        count = 0
+        offset = 0
+
+        for path in paths:
+            stream = Ptrac._stream_blocks(path)
+            decoder = next(stream)
+            start, stop = decoder._columns(decoder.i_layout, {6: 13}, 10).get(1, (0, 0))
+            largest = 0
+
+            for block in stream:
+                count += 1
+
+                if renumber is not None:
+                    nps = int(block[start:stop])
+                    largest = max(largest, nps)
+                    field = f'{count if renumber == "sequential" else nps + offset:>{stop - start}}'
+
+                    if len(field) != stop - start:
+                        raise errors.PtracError(errors.PtracCode.SEMANTICS_FILE, field)
+
+                    block = block[:start] + field + block[stop:]
+
+                yield block
+
+            offset += largest
+
+    @staticmethod
+    def _stream(filename: pathlib.Path):
+        """
+        Yields `ptrac.Header` and then every `ptrac.History` from PTRAC files.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Raises:
+            PtracError: SYNTAX_FILE.
+        """
+
+        with Ptrac._decompress(filename) as file:
+            header = Ptrac._read_header(file)
+            decoder = ptrac.Decoder(header)
+
+            yield header
+
+            for block in Ptrac._read_blocks(file):
+                yield ptrac.History.from_mcnp(block, decoder)
+
+    @staticmethod
+    def _closing(binary: ptrac.Binary, items: typing.Iterator):
+        """
+        Yields from iterators over binary PTRAC files, closing them at the end.
+
+        Parameters:
+            binary: Binary PTRAC file.
+            items: Iterator over the file.
+        """
+
+        with binary:
+            yield from items
+
+    @staticmethod
+    def _stream_blocks(filename: pathlib.Path):
+        """
+        Yields `ptrac.Decoder` and then every history block from PTRAC files.
+
+        Binary histories are formatted as ASCII history blocks.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Raises:
+            PtracError: SYNTAX_FILE.
+        """
+
+        if ptrac.Binary.is_binary(filename):
+            with ptrac.Binary(filename) as binary:
+                yield binary.decoder
+                yield from binary.iter_blocks()
+
+            return
+
+        with Ptrac._decompress(filename) as file:
+            yield ptrac.Decoder(Ptrac._read_header(file))
+            yield from Ptrac._read_blocks(file)
+
+    @staticmethod
+    def _stream_arrays(filename: pathlib.Path, size: int):
+        """
+        Yields NumPy structured arrays from PTRAC files in chunks.
+
+        Parameters:
+            filename: PTRAC file path.
+            size: Minimum number of events per chunk.
+
+        Raises:
+            PtracError: SYNTAX_FILE.
+        """
+
+        with Ptrac._decompress(filename) as file:
+            decoder = ptrac.Decoder(Ptrac._read_header(file))
+
+            yield from Ptrac._chunk_blocks(decoder, Ptrac._read_blocks(file), size)
+
+    @staticmethod
+    def _chunk_blocks(decoder: ptrac.Decoder, blocks: typing.Iterable[str], size: int):
+        """
+        Yields NumPy structured arrays from PTRAC history blocks in chunks.
+
+        Parameters:
+            decoder: PTRAC decoder for the header layouts.
+            blocks: PTRAC for `ptrac.History`.
+            size: Minimum number of events per chunk.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        chunk = []
+        count = 0
+        for block in blocks:
+            chunk.append(block)
+            count += block.count('\n') // 2
+
+            if count >= size:
+                yield decoder.to_arrays(''.join(chunk))
+                chunk = []
+                count = 0
+
+        if chunk:
+            yield decoder.to_arrays(''.join(chunk))
+
+    @staticmethod
+    def _read_header(file: typing.TextIO) -> ptrac.Header:
+        """
+        Reads `ptrac.Header` from the first lines of PTRAC files.
+
+        Parameters:
+            file: PTRAC file handle positioned at the start.
+
+        Returns:
+            `ptrac.Header`.
+
+        Raises:
+            PtracError: SYNTAX_FILE.
+        """
+
+        lines = [file.readline(), file.readline(), file.readline()]
+
+        # V lines are fixed at 120 columns, the n-line is fixed at 100 columns.
+        line = file.readline()
+        while len(line.rstrip('\n')) == 121:
+            lines.append(line)
+            line = file.readline()
+
+        if len(line.rstrip('\n')) != 101:
+            raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, ''.join(lines) + line)
+
+        lines.append(line)
+        n_line = ptrac.header.N.from_mcnp(line)
+        count = sum(n.value for n in (n_line.n1, n_line.n2, n_line.n3, n_line.n4, n_line.n5, n_line.n6, n_line.n7, n_line.n8, n_line.n9, n_line.n10, n_line.n11))
+
+        # L lines hold 30 variable identifiers each.
+        for _ in range(-(-count // 30)):
+            lines.append(file.readline())
+
+        return ptrac.Header.from_mcnp(''.join(lines))
+
+    @staticmethod
+    def _read_blocks(file: typing.TextIO) -> typing.Generator[str, None, None]:
+        """
+        Reads PTRAC history blocks one at a time.
+
+        Histories end with the event whose j-line next event type is the
+        end-of-history flag.
+
+        Parameters:
+            file: PTRAC file handle positioned after the header.
+
+        Yields:
+            PTRAC for `ptrac.History`.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        flag = ptrac.history.event.j.EventType.FLAG.value
+        block = []
+
+        for line in file:
+            if not block and not line.strip():
+                continue
+
+            block.append(line if line.endswith('\n') else line + '\n')
+
+            if len(block) % 2 == 1 and len(block) > 1 and block[-2][1:11].strip() == flag:
+                yield ''.join(block)
+                block = []
+
+        if block:
+            raise errors.PtracError(errors.PtracCode.SYNTAX_BLOCK, ''.join(block))
+
+    @staticmethod
+    def _splittable(filename: str | pathlib.Path) -> bool:
+        """
+        Checks whether PTRAC files split into byte ranges for worker processes.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            `True` for uncompressed ASCII files.
+        """
+
+        filename = pathlib.Path(filename)
+
+        return filename.is_file() and not ptrac.Binary.is_binary(filename) and Ptrac._compression(filename) is None
+
+    @staticmethod
+    def _sidecar(filename: pathlib.Path) -> pathlib.Path:
+        """
+        Locates the history index sidecar of PTRAC files.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            Sidecar file path.
+        """
+
+        return filename.with_name(filename.name + '.index.npz')
+
+    @staticmethod
+    def _spatial_sidecar(filename: pathlib.Path) -> pathlib.Path:
+        """
+        Locates the spatial index sidecar of PTRAC files.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            Sidecar file path.
+        """
+
+        return filename.with_name(filename.name + '.spatial.npz')
+
+    @staticmethod
+    def _read_sidecar(filename: pathlib.Path) -> numpy.ndarray:
+        """
+        Reads history indexes from sidecars matching PTRAC files.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            Structured array with `ptrac.Decoder.INDEX` fields, or `None` if
+            the sidecar is missing, stale, or unreadable.
+        """
+
+        sidecar = Ptrac._sidecar(filename)
+
+        if not sidecar.is_file():
+            return None
+
+        stat = filename.stat()
+
+        try:
+            with numpy.load(sidecar) as file:
+                if file['size'] == stat.st_size and file['mtime'] == stat.st_mtime_ns:
+                    return file['index']
+        except (OSError, ValueError, KeyError):
+            pass
+
+        return None
+
+    @staticmethod
+    def _load_index(filename: pathlib.Path) -> numpy.ndarray:
+        """
+        Loads history indexes from sidecars, rebuilding stale ones.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            Structured array with `ptrac.Decoder.INDEX` fields.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        if not filename.is_file():
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
+
+        index = Ptrac._read_sidecar(filename)
+
+        if index is None:
+            index = Ptrac.build_index(filename)
+
+        return index
+
+    @staticmethod
+    def _read_indexed(filename: pathlib.Path, rows: numpy.ndarray) -> typing.Generator[ptrac.History, None, None]:
+        """
+        Yields `ptrac.History` at indexed byte offsets of PTRAC files.
+
+        Parameters:
+            filename: PTRAC file path.
+            rows: History index rows.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        if ptrac.Binary.is_binary(filename):
+            with ptrac.Binary(filename) as binary:
+                for row in rows:
+                    yield next(binary.iter_histories(int(row['offset'])))
+
+            return
+
+        with Ptrac._decompress(filename) as file:
+            decoder = ptrac.Decoder(Ptrac._read_header(file))
+
+        if Ptrac._compression(filename) is not None:
+            # Compressed streams only seek forward cheaply, so rows are read in file order.
+            with Ptrac._decompress(filename, 'rb') as file:
+                for row in numpy.sort(rows, order='offset'):
+                    file.seek(int(row['offset']))
+                    yield ptrac.History.from_mcnp(file.read(int(row['length'])).decode(), decoder)
+
+            return
+
+        with open(filename, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            for row in rows:
+                start = int(row['offset'])
+                yield ptrac.History.from_mcnp(buffer[start : start + int(row['length'])].decode(), decoder)
+
+    @staticmethod
+    def _scan(filename: pathlib.Path, size: int = 1 << 26) -> numpy.ndarray:
+        """
+        Scans PTRAC files for history boundaries.
+
+        Reads the file in chunks of whole lines and finds the end-of-history
+        j-lines with NumPy, so only one Python step runs per history.
+
+        Parameters:
+            filename: PTRAC file path.
+            size: Chunk size in bytes.
+
+        Returns:
+            Structured array with `ptrac.Decoder.INDEX` fields.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        with Ptrac._decompress(filename) as file:
+            header = Ptrac._read_header(file)
+
+        decoder = ptrac.Decoder(header)
+        columns = decoder._columns(decoder.i_layout, {6: 13}, 10)
+        nps_span, type_span = slice(*columns[1]), slice(*columns[2])
+        flag = numpy.frombuffer(f'{decoder.FLAG:>10}'.encode(), dtype=numpy.uint8)
+
+        rows = []
+
+        with Ptrac._decompress(filename, 'rb') as file:
+            for _ in range(header.to_mcnp().count('\n')):
+                file.readline()
+
+            base = file.tell()
+            data = b''
+
+            while True:
+                chunk = file.read(size)
+                data += chunk
+                end = data.rfind(b'\n') + 1 if chunk else len(data)
+
+                raw = numpy.frombuffer(data, dtype=numpy.uint8, count=end)
+                ends = numpy.flatnonzero(raw == ord('\n'))
+                if not chunk and end and raw[-1] != ord('\n'):
+                    ends = numpy.append(ends, end)
+                starts = numpy.concatenate(([0], ends[:-1] + 1))
+
+                lines = ends > starts
+                starts, ends = starts[lines], ends[lines]
+
+                # Histories end with the j-line whose next event type is the
+                # flag, an odd number of lines after their I line.
+                heads = raw[numpy.minimum(starts[:, None] + numpy.arange(1, 11), max(end - 1, 0))] if end else numpy.empty((0, 10), numpy.uint8)
+                flags = numpy.flatnonzero(((ends - starts) >= 11) & (heads == flag).all(axis=1))
+                parities = (flags[flags % 2 == 1], flags[flags % 2 == 0])
+
+                line = 0
+                consumed = 0
+                while line < len(starts):
+                    candidates = parities[line % 2]
+                    k = numpy.searchsorted(candidates, line)
+
+                    if k == len(candidates) or candidates[k] + 1 >= len(starts):
+                        break
+
+                    last = candidates[k] + 1
+                    i_line = data[starts[line] : ends[line]]
+                    consumed = min(ends[last] + 1, len(data))
+
+                    try:
+                        rows.append((int(i_line[nps_span]), base + starts[line], consumed - starts[line], int(i_line[type_span])))
+                    except ValueError:
+                        raise errors.PtracError(errors.PtracCode.SYNTAX_BLOCK, i_line.decode())
+
+                    line = last + 1
+
+                if not chunk:
+                    if line < len(starts):
+                        raise errors.PtracError(errors.PtracCode.SYNTAX_BLOCK, data[starts[line] : starts[line] + 400].decode())
+
+                    break
+
+                base += consumed
+                data = data[consumed:]
+
+        return numpy.array(rows, dtype=ptrac.Decoder.INDEX)
+
+    @staticmethod
+    def _load_ranges(filename: str | pathlib.Path) -> numpy.ndarray:
+        """
+        Loads history indexes for splitting PTRAC files into ranges.
+
+        Reuses a matching sidecar index but never writes one.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            Structured array with `ptrac.Decoder.INDEX` fields.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        filename = pathlib.Path(filename)
+
+        if not filename.is_file():
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
+
+        index = Ptrac._read_sidecar(filename)
+
+        if index is None:
+            index = Ptrac._scan(filename)
+
+        return index
+
+    @staticmethod
+    def _event_length(filename: pathlib.Path) -> int:
+        """
+        Estimates the bytes per event of PTRAC files from the header layouts.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            Mean j-line and p-line length in bytes.
+        """
+
+        with Ptrac._decompress(filename) as file:
+            decoder = ptrac.Decoder(Ptrac._read_header(file))
+
+        lengths = [10 * len(j_layout) + 13 * len(p_layout) + 4 for j_layout, p_layout in decoder.layouts.values()]
+
+        return sum(lengths) // len(lengths)
+
+    @staticmethod
+    def _ranges(index: numpy.ndarray, length: int) -> list[tuple[int, int]]:
+        """
+        Groups consecutive histories into byte ranges.
+
+        Parameters:
+            index: History index rows.
+            length: Target range length in bytes.
+
+        Returns:
+            Byte offset and length of every range.
+        """
+
+        if not len(index):
+            return []
+
+        ends = index['offset'] + index['length']
+        cuts = numpy.unique(numpy.searchsorted(numpy.cumsum(index['length']), numpy.arange(length, index['length'].sum(), length)))
+        cuts = cuts[cuts < len(index) - 1]
+        firsts = numpy.concatenate(([0], cuts + 1))
+        lasts = numpy.concatenate((cuts, [len(index) - 1]))
+
+        return [(int(index['offset'][first]), int(ends[last] - index['offset'][first])) for first, last in zip(firsts, lasts)]
+
+    @staticmethod
+    def _parse_range(filename: pathlib.Path, offset: int, length: int, arrays: bool):
+        """
+        Parses one byte range of PTRAC files in a worker process.
+
+        Parameters:
+            filename: PTRAC file path.
+            offset: Byte offset of the first history.
+            length: Range length in bytes.
+            arrays: Whether to decode structured arrays instead of histories.
+
+        Returns:
+            Structured array or list of `ptrac.History`.
+        """
+
+        with Ptrac._decompress(filename) as file:
+            decoder = ptrac.Decoder(Ptrac._read_header(file))
+
+        with Ptrac._decompress(filename, 'rb') as file:
+            file.seek(offset)
+            source = file.read(length).decode()
+
+        if arrays:
+            return decoder.to_arrays(source)
+
+        return [ptrac.History.from_mcnp(block, decoder) for block in Ptrac._read_blocks(io.StringIO(source))]
+
+    @staticmethod
+    def _map_ranges(filename: pathlib.Path, ranges: list[tuple[int, int]], arrays: bool, workers: int):
+        """
+        Yields parsed byte ranges of PTRAC files in order from a process pool.
+
+        Keeps at most two ranges per worker in flight, so memory stays
+        bounded while the consumer lags behind.
+
+        Parameters:
+            filename: PTRAC file path.
+            ranges: Byte offset and length of every range.
+            arrays: Whether to decode structured arrays instead of histories.
+            workers: Number of worker processes.
+        """
+
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+
+            for offset, length in ranges:
+                pending.append(executor.submit(Ptrac._parse_range, filename, offset, length, arrays))
+
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+    def to_arrays(self) -> numpy.ndarray:
+        """
+        Generates NumPy structured arrays from `Ptrac`.
+
+        Returns:
+            Structured array with one row per event and `ptrac.Decoder.DTYPE` fields.
+        """
+
+        return ptrac.Decoder(self.header).from_histories(self.histories)
+
+    @staticmethod
+    def write_parquet(chunks: typing.Iterable[numpy.ndarray], path: str | pathlib.Path):
+        """
+        Writes NumPy structured arrays to PARQUET files.
+
+        Writes every chunk as its own row group while iterating, so memory
+        stays bounded by one chunk.
+
+        Parameters:
+            chunks: Structured arrays with `ptrac.Decoder.DTYPE` fields.
+            path: Path to new parquet file.
+        """
+
+        path = str(path)
+        empty = True
+
+        for chunk in chunks:
+            fastparquet.write(path, pandas.DataFrame(chunk), append=not empty)
+            empty = False
+
+        if empty:
+            fastparquet.write(path, pandas.DataFrame(numpy.zeros(0, dtype=ptrac.Decoder.DTYPE)))
+
+    def to_parquet(self, path: str | pathlib.Path, row_group_size: int = 100000):
+        """
+        Generates PARQUET files from `Ptrac`.
+
+        Streams histories into row groups of whole histories holding at least
+        `row_group_size` events, with one row per event and
+        `ptrac.Decoder.DTYPE` columns.
+
+        Parameters:
+            path: Path to new parquet file.
+            row_group_size: Minimum number of events per row group.
+        """
+
+        decoder = ptrac.Decoder(self.header)
+        blocks = (history.to_mcnp() for history in self.histories)
 
-        return Ptrac(header, histories)
+        Ptrac.write_parquet(Ptrac._chunk_blocks(decoder, blocks, row_group_size), path)
 
     def to_mcnp(self):
         """
@@ -0,0 +1,242 @@
+import typing
+import pathlib
+import concurrent.futures
+
+import numpy
+
+from . import _doer
+from . import _expression
+from . import ptrac
+from . import errors
+from .Ptrac import Ptrac
+
+
+class PtracCoincidence(_doer.Doer):
+    """
+    Counts time-correlated PTRAC events in detector cells.
+
+    `PtracCoincidence` selects events in detector cells, sorts them by time
+    within every history, and opens one gate after every event, counting the
+    later events of the same history between `predelay` and `predelay +
+    gate`. Gates are found for whole chunks at once with `numpy.searchsorted`,
+    so chunks must hold whole histories, as `Ptrac.iter_arrays` chunks do.
+    Events without times are skipped.
+
+    Attributes:
+        cells: Detector cell numbers.
+        gate: Gate width in shakes.
+        predelay: Gate delay in shakes.
+        edges: Rossi-alpha time difference bin edges in shakes.
+        where: Predicate selecting detector events.
+        multiplicity: Number of gates by number of events in the gate.
+        histories: Number of histories by number of detector events.
+        rossi: Number of event pairs by time difference bin.
+    """
+
+    # Rossi-alpha pairs are histogrammed in blocks of at most this many pairs.
+    PAIRS: typing.Final[int] = 1 << 22
+
+    def __init__(self, cells: typing.Iterable[int], gate: float, predelay: float = 0.0, edges: typing.Iterable[float] = None, where: str = None):
+        """
+        Initializes `PtracCoincidence`.
+
+        Parameters:
+            cells: Detector cell numbers.
+            gate: Gate width in shakes.
+            predelay: Gate delay in shakes.
+            edges: Rossi-alpha time difference bin edges in shakes.
+            where: Predicate selecting detector events, for example
+                `event_type >= 4000 & event_type < 5000`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        cells = numpy.unique(numpy.asarray(list(cells), dtype=numpy.int32))
+
+        if not len(cells):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, cells)
+
+        if not gate > 0 or not predelay >= 0:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, (gate, predelay))
+
+        if edges is not None:
+            edges = numpy.asarray(edges, dtype=numpy.float64)
+
+            if edges.ndim != 1 or len(edges) < 2 or edges[0] < 0 or (numpy.diff(edges) <= 0).any():
+                raise errors.CliError(errors.CliCode.RUNTIME_DOER, edges)
+
+        self.cells: typing.Final[numpy.ndarray] = cells
+        self.gate: typing.Final[float] = float(gate)
+        self.predelay: typing.Final[float] = float(predelay)
+        self.edges: typing.Final[numpy.ndarray] = edges
+        self.where: typing.Final[_expression.Expression] = _expression.Expression(where, ptrac.Decoder.DTYPE.names) if where is not None else None
+        self.multiplicity: numpy.ndarray = numpy.zeros(1, dtype=numpy.int64)
+        self.histories: numpy.ndarray = numpy.zeros(1, dtype=numpy.int64)
+        self.rossi: numpy.ndarray = numpy.zeros(len(edges) - 1 if edges is not None else 0, dtype=numpy.int64)
+
+    def empty(self):
+        """
+        Generates `PtracCoincidence` with the same settings and no events.
+
+        Returns:
+            `PtracCoincidence`.
+        """
+
+        return PtracCoincidence(self.cells, self.gate, self.predelay, self.edges, str(self.where) if self.where is not None else None)
+
+    @staticmethod
+    def _add(a: numpy.ndarray, b: numpy.ndarray) -> numpy.ndarray:
+        """
+        Adds histograms of different lengths.
+
+        Parameters:
+            a: Histogram.
+            b: Histogram.
+
+        Returns:
+            Sum padded to the longer length.
+        """
+
+        if len(a) < len(b):
+            a, b = b, a
+
+        a = a.copy()
+        a[: len(b)] += b
+
+        return a
+
+    def update(self, events: numpy.ndarray):
+        """
+        Accumulates chunks of events.
+
+        Parameters:
+            events: Structured array with `ptrac.Decoder.DTYPE` fields holding whole histories.
+
+        Returns:
+            `PtracCoincidence`.
+        """
+
+        nps = numpy.unique(events['nps'])
+        mask = numpy.isin(events['cell'], self.cells) & ~numpy.isnan(events['tme'])
+
+        if self.where is not None:
+            mask &= self.where(events)
+
+        events = events[mask]
+        order = numpy.lexsort((events['tme'], events['nps']))
+        histories = events['nps'][order].astype(numpy.float64)
+        times = events['tme'][order]
+
+        # Complex numbers sort by real then imaginary part, so one search
+        # finds gates by history and then by time.
+        keys = histories + 1j * times
+        starts = numpy.arange(len(keys)) + 1
+        lo = numpy.maximum(starts, numpy.searchsorted(keys, histories + 1j * (times + self.predelay), side='left'))
+        hi = numpy.maximum(lo, numpy.searchsorted(keys, histories + 1j * (times + self.predelay + self.gate), side='left'))
+
+        per_history = numpy.unique(events['nps'], return_counts=True)[1]
+        per_history = numpy.concatenate([per_history, numpy.zeros(len(nps) - len(per_history), dtype=numpy.int64)])
+
+        self.multiplicity = self._add(self.multiplicity, numpy.bincount(hi - lo))
+        self.histories = self._add(self.histories, numpy.bincount(per_history))
+
+        if self.edges is not None and len(keys):
+            ends = numpy.searchsorted(keys, histories + 1j * (times + self.edges[-1]), side='right')
+            counts = ends - starts
+            totals = numpy.cumsum(counts)
+
+            # Every event pairs with the later events of its history up to the
+            # last edge, and blocks of whole rows bound the pairs in memory.
+            cuts = numpy.searchsorted(totals, numpy.arange(self.PAIRS, totals[-1], self.PAIRS), side='right')
+            for first, last in zip(numpy.concatenate(([0], cuts)), numpy.concatenate((cuts, [len(keys)]))):
+                block = counts[first:last]
+                rows = numpy.repeat(numpy.arange(first, last), block)
+                offsets = numpy.arange(len(rows)) - numpy.repeat(numpy.cumsum(block) - block, block)
+                self.rossi += numpy.histogram(times[rows + 1 + offsets] - times[rows], bins=self.edges)[0]
+
+        return self
+
+    def merge(self, other):
+        """
+        Merges partial counts with the same settings.
+
+        Parameters:
+            other: Partial `PtracCoincidence`.
+
+        Returns:
+            `PtracCoincidence`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        if (
+            not numpy.array_equal(self.cells, other.cells)
+            or (self.gate, self.predelay) != (other.gate, other.predelay)
+            or (self.edges is None) != (other.edges is None)
+            or (self.edges is not None and not numpy.array_equal(self.edges, other.edges))
+        ):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, other)
+
+        self.multiplicity = self._add(self.multiplicity, other.multiplicity)
+        self.histories = self._add(self.histories, other.histories)
+        self.rossi = self.rossi + other.rossi
+
+        return self
+
+    @staticmethod
+    def _update_range(coincidence, filename: pathlib.Path, offset: int, length: int):
+        """
+        Accumulates counts over one byte range of PTRAC files in a worker process.
+
+        Parameters:
+            coincidence: Empty `PtracCoincidence` to accumulate.
+            filename: PTRAC file path.
+            offset: Byte offset of the first history.
+            length: Range length in bytes.
+
+        Returns:
+            Partial `PtracCoincidence`.
+        """
+
+        return coincidence.update(Ptrac._parse_range(filename, offset, length, True))
+
+    def __call__(self, source: str | pathlib.Path | typing.Iterable[numpy.ndarray], size: int = 100000, workers: int = None):
+        """
+        Accumulates PTRAC events.
+
+        With `workers`, ASCII files are split into byte ranges at history
+        boundaries, every range is counted in a process pool, and the partial
+        counts are merged.
+
+        Parameters:
+            source: PTRAC file path or stream of structured arrays holding whole histories.
+            size: Minimum number of events per chunk read from files.
+            workers: Number of worker processes.
+
+        Returns:
+            `PtracCoincidence`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        if isinstance(source, (str, pathlib.Path)) and workers and Ptrac._splittable(source):
+            filename = pathlib.Path(source)
+            ranges = Ptrac._ranges(Ptrac._load_ranges(filename), size * Ptrac._event_length(filename))
+
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(PtracCoincidence._update_range, self.empty(), filename, offset, length) for offset, length in ranges]
+
+                for future in concurrent.futures.as_completed(futures):
+                    self.merge(future.result())
+
+            return self
+
+        chunks = Ptrac.iter_arrays(source, size) if isinstance(source, (str, pathlib.Path)) else source
+
+        for chunk in chunks:
+            self.update(chunk)
+
+        return self
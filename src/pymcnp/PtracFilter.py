@@ -1,13 +1,44 @@
+import typing
+import pathlib
+
+import numpy
+
 from . import _doer
+from . import _expression
 from . import ptrac
+from . import errors
 from .Ptrac import Ptrac
 
 
 class PtracFilter(_doer.Doer):
     """
     Filters PTRAC files.
+
+    Calling `PtracFilter` runs the `check_*` hooks once per event. Batch mode
+    runs the `check_*_batch` hooks and the optional predicate expression once
+    per chunk of `ptrac.Decoder.DTYPE` structured arrays instead.
+
+    Attributes:
+        expression: Predicate over event columns for batch mode.
     """
 
+    expression: _expression.Expression = None
+
+    def __init__(self, expression: str = None):
+        """
+        Initializes `PtracFilter`.
+
+        Parameters:
+            expression: Predicate over `ptrac.Decoder.DTYPE` columns for batch
+                mode, for example `erg > 1.0 & cell in {10, 11}`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        if expression is not None:
+            self.expression = _expression.Expression(expression, ptrac.Decoder.DTYPE.names)
+
     @staticmethod
     def check_source(event: ptrac.history.event.j.EventType) -> bool:
         """
@@ -78,19 +109,202 @@ class PtracFilter(_doer.Doer):
 
         return True
 
-    def __call__(self, file: Ptrac):
+    @staticmethod
+    def check_source_batch(events: numpy.ndarray) -> numpy.ndarray:
+        """
+        Runs when filtering chunks of source events.
+
+        Parameters:
+            events: Structured array of source events.
+
+        Returns:
+            Mask of events to keep.
+        """
+
+        return numpy.ones(len(events), dtype=bool)
+
+    @staticmethod
+    def check_bank_batch(events: numpy.ndarray) -> numpy.ndarray:
+        """
+        Runs when filtering chunks of bank events.
+
+        Parameters:
+            events: Structured array of bank events.
+
+        Returns:
+            Mask of events to keep.
+        """
+
+        return numpy.ones(len(events), dtype=bool)
+
+    @staticmethod
+    def check_surface_batch(events: numpy.ndarray) -> numpy.ndarray:
+        """
+        Runs when filtering chunks of surface events.
+
+        Parameters:
+            events: Structured array of surface events.
+
+        Returns:
+            Mask of events to keep.
         """
-        Filters `Ptrac`.
+
+        return numpy.ones(len(events), dtype=bool)
+
+    @staticmethod
+    def check_collision_batch(events: numpy.ndarray) -> numpy.ndarray:
+        """
+        Runs when filtering chunks of collision events.
 
         Parameters:
-            file: File to filter.
+            events: Structured array of collision events.
+
+        Returns:
+            Mask of events to keep.
+        """
+
+        return numpy.ones(len(events), dtype=bool)
+
+    @staticmethod
+    def check_terminal_batch(events: numpy.ndarray) -> numpy.ndarray:
+        """
+        Runs when filtering chunks of terminal events.
+
+        Parameters:
+            events: Structured array of terminal events.
+
+        Returns:
+            Mask of events to keep.
+        """
+
+        return numpy.ones(len(events), dtype=bool)
+
+    def check_batch(self, events: numpy.ndarray) -> numpy.ndarray:
+        """
+        Filters chunks of events.
+
+        Groups the chunk by event type once, runs the matching
+        `check_*_batch` hook on every group, and combines the result with
+        `expression`.
+
+        Parameters:
+            events: Structured array with `ptrac.Decoder.DTYPE` fields.
+
+        Returns:
+            Mask of events to keep.
+        """
+
+        kinds = numpy.abs(events['event_type']) // 1000
+        mask = numpy.ones(len(events), dtype=bool)
+
+        for rows, check in [
+            (kinds == ptrac.Decoder.SOURCE, self.check_source_batch),
+            (kinds == ptrac.Decoder.SURFACE, self.check_surface_batch),
+            (kinds == ptrac.Decoder.COLLISION, self.check_collision_batch),
+            (kinds == ptrac.Decoder.TERMINAL, self.check_terminal_batch),
+            (~numpy.isin(kinds, [ptrac.Decoder.SOURCE, ptrac.Decoder.SURFACE, ptrac.Decoder.COLLISION, ptrac.Decoder.TERMINAL]), self.check_bank_batch),
+        ]:
+            if rows.any():
+                mask[rows] = check(events[rows])
+
+        if self.expression is not None:
+            mask &= self.expression(events)
+
+        return mask
+
+    def filter_arrays(self, source: str | pathlib.Path | typing.Iterable[numpy.ndarray], size: int = 100000) -> typing.Generator[numpy.ndarray, None, None]:
+        """
+        Filters PTRAC events in batch mode.
+
+        Parameters:
+            source: PTRAC file path or stream of structured arrays.
+            size: Minimum number of events per chunk read from files.
+
+        Returns:
+            Generator of structured arrays holding accepted events.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        chunks = Ptrac.iter_arrays(source, size) if isinstance(source, (str, pathlib.Path)) else source
+
+        return (chunk[self.check_batch(chunk)] for chunk in chunks)
+
+    def filter_histories(self, filename: str | pathlib.Path, size: int = 100000) -> typing.Generator[ptrac.History, None, None]:
+        """
+        Filters PTRAC histories in batch mode.
+
+        Decodes chunks of history blocks into structured arrays, and parses
+        only the blocks holding at least one accepted event.
+
+        Parameters:
+            filename: PTRAC file path.
+            size: Minimum number of events per chunk.
+
+        Returns:
+            Generator of `ptrac.History` holding accepted events.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        filename = pathlib.Path(filename)
+
+        if not filename.is_file():
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
+
+        def histories():
+            stream = Ptrac._stream_blocks(filename)
+            decoder = next(stream)
+
+            chunk = []
+            counts = []
+            for block in stream:
+                chunk.append(block)
+                counts.append(block.count('\n') // 2)
+
+                if sum(counts) >= size:
+                    yield from self._filter_blocks(decoder, chunk, counts)
+                    chunk = []
+                    counts = []
+
+            if chunk:
+                yield from self._filter_blocks(decoder, chunk, counts)
+
+        return histories()
+
+    def _filter_blocks(self, decoder: ptrac.Decoder, blocks: list[str], counts: list[int]) -> typing.Generator[ptrac.History, None, None]:
+        """
+        Yields `ptrac.History` for history blocks holding accepted events.
+
+        Parameters:
+            decoder: PTRAC decoder for the header layouts.
+            blocks: PTRAC for `ptrac.History`.
+            counts: Number of events in every block.
+        """
+
+        mask = self.check_batch(decoder.to_arrays(''.join(blocks)))
+        accepted = numpy.unique(numpy.repeat(numpy.arange(len(blocks)), counts)[mask])
+
+        for index in accepted:
+            yield ptrac.History.from_mcnp(blocks[index], decoder)
+
+    def __call__(self, file: Ptrac | typing.Iterable[ptrac.History]):
+        """
+        Filters `Ptrac` one event at a time.
+
+        Parameters:
+            file: File or stream of histories to filter.
 
         Yields:
             Accepted events.
         """
 
-        def histories():
-            for history in file.histories:
+        histories = file.histories if isinstance(file, Ptrac) else file
+
+        def events():
+            for history in histories:
                 kind = history.i_line.event_type
                 for event in history.events:
                     match kind:
@@ -112,4 +326,4 @@ class PtracFilter(_doer.Doer):
                     else:
                         continue
 
-        return histories()
+        return events()
@@ -0,0 +1,254 @@
+import typing
+import pathlib
+import concurrent.futures
+
+import numpy
+import numpy.lib.recfunctions
+
+from . import _doer
+from . import _expression
+from . import ptrac
+from . import errors
+from .Ptrac import Ptrac
+
+
+class PtracHistogram(_doer.Doer):
+    """
+    Histograms PTRAC events out of core.
+
+    `PtracHistogram` bins events by the columns of `ptrac.Decoder.DTYPE`,
+    keeping one histogram per combination of grouping columns, for example
+    energy spectra per cell or collision sites per event type. Chunks are
+    accumulated one at a time, so files larger than memory take one pass,
+    and partial histograms from worker processes merge by addition. Bins
+    follow `numpy.histogramdd`, so the last bin includes its right edge.
+    Events without weights, such as those of PTRAC files that do not record
+    `wgt`, are counted but left out of the weight sums.
+
+    Attributes:
+        edges: Bin edges by column name.
+        keys: Grouping column names.
+        weight: Weight column name.
+        where: Predicate selecting the events to histogram.
+        counts: Event counts per bin by group.
+        weights: Weight sums per bin by group.
+    """
+
+    def __init__(self, edges: dict[str, typing.Iterable[float]], keys: typing.Iterable[str] = (), weight: str = 'wgt', where: str = None):
+        """
+        Initializes `PtracHistogram`.
+
+        Parameters:
+            edges: Bin edges by column name.
+            keys: Grouping column names.
+            weight: Weight column name.
+            where: Predicate selecting the events to histogram, for example
+                `erg > 1.0 & cell in {10, 11}`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        names = ptrac.Decoder.DTYPE.names
+
+        if not edges or any(name not in names for name in edges):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, edges)
+
+        edges = {name: numpy.asarray(values, dtype=numpy.float64) for name, values in edges.items()}
+
+        for values in edges.values():
+            if values.ndim != 1 or len(values) < 2 or (numpy.diff(values) <= 0).any():
+                raise errors.CliError(errors.CliCode.RUNTIME_DOER, values)
+
+        keys = tuple(keys)
+
+        if any(key not in names for key in keys):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, keys)
+
+        if weight not in names:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, weight)
+
+        self.edges: typing.Final[dict[str, numpy.ndarray]] = edges
+        self.keys: typing.Final[tuple[str]] = keys
+        self.weight: typing.Final[str] = weight
+        self.where: typing.Final[_expression.Expression] = _expression.Expression(where, names) if where is not None else None
+        self.counts: typing.Final[dict[tuple, numpy.ndarray]] = {}
+        self.weights: typing.Final[dict[tuple, numpy.ndarray]] = {}
+
+    @property
+    def shape(self) -> tuple[int]:
+        """
+        Number of bins along every column.
+        """
+
+        return tuple(len(values) - 1 for values in self.edges.values())
+
+    def empty(self):
+        """
+        Generates `PtracHistogram` with the same bins and no events.
+
+        Returns:
+            `PtracHistogram`.
+        """
+
+        return PtracHistogram(self.edges, self.keys, self.weight, str(self.where) if self.where is not None else None)
+
+    def update(self, events: numpy.ndarray):
+        """
+        Accumulates chunks of events.
+
+        Parameters:
+            events: Structured array with `ptrac.Decoder.DTYPE` fields.
+
+        Returns:
+            `PtracHistogram`.
+        """
+
+        if self.where is not None:
+            events = events[self.where(events)]
+
+        shape = self.shape
+        size = int(numpy.prod(shape))
+        valid = numpy.ones(len(events), dtype=bool)
+        indices = []
+
+        for (name, values), bins in zip(self.edges.items(), shape):
+            column = events[name]
+            index = numpy.searchsorted(values, column, side='right') - 1
+            index[column == values[-1]] = bins - 1
+            valid &= (index >= 0) & (index < bins)
+            indices.append(index)
+
+        if not valid.any():
+            return self
+
+        flat = numpy.ravel_multi_index([index[valid] for index in indices], shape)
+        weights = events[self.weight][valid].astype(numpy.float64)
+        weights[numpy.isnan(weights)] = 0
+
+        if self.keys:
+            keys = numpy.lib.recfunctions.repack_fields(events[list(self.keys)][valid])
+            groups, inverse = numpy.unique(keys, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        else:
+            groups, inverse = [()], numpy.zeros(len(flat), dtype=numpy.int64)
+
+        combined = inverse * size + flat
+        counts = numpy.bincount(combined, minlength=len(groups) * size).reshape(len(groups), *shape)
+        sums = numpy.bincount(combined, weights=weights, minlength=len(groups) * size).reshape(len(groups), *shape)
+
+        for group, count, total in zip(groups, counts, sums):
+            if not count.any():
+                continue
+
+            key = group.item() if self.keys else group
+            self.counts[key] = self.counts.get(key, 0) + count
+            self.weights[key] = self.weights.get(key, 0) + total
+
+        return self
+
+    def merge(self, other):
+        """
+        Merges partial histograms with the same bins.
+
+        Parameters:
+            other: Partial `PtracHistogram`.
+
+        Returns:
+            `PtracHistogram`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        if other.keys != self.keys or other.edges.keys() != self.edges.keys() or any(not numpy.array_equal(self.edges[name], other.edges[name]) for name in self.edges):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, other)
+
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+            self.weights[key] = self.weights.get(key, 0) + other.weights[key]
+
+        return self
+
+    @staticmethod
+    def fill(histograms: list, source: str | pathlib.Path | typing.Iterable[numpy.ndarray], size: int = 100000, workers: int = None) -> list:
+        """
+        Accumulates several histograms in one pass over PTRAC events.
+
+        With `workers`, ASCII files are split into byte ranges at history
+        boundaries, every range is histogrammed in a process pool, and the
+        partial histograms are merged.
+
+        Parameters:
+            histograms: `PtracHistogram` to accumulate.
+            source: PTRAC file path or stream of structured arrays.
+            size: Minimum number of events per chunk read from files.
+            workers: Number of worker processes.
+
+        Returns:
+            Accumulated `PtracHistogram`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        if isinstance(source, (str, pathlib.Path)) and workers and Ptrac._splittable(source):
+            filename = pathlib.Path(source)
+            ranges = Ptrac._ranges(Ptrac._load_ranges(filename), size * Ptrac._event_length(filename))
+
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(PtracHistogram._fill_range, [histogram.empty() for histogram in histograms], filename, offset, length) for offset, length in ranges]
+
+                for future in concurrent.futures.as_completed(futures):
+                    for histogram, partial in zip(histograms, future.result()):
+                        histogram.merge(partial)
+
+            return histograms
+
+        chunks = Ptrac.iter_arrays(source, size) if isinstance(source, (str, pathlib.Path)) else source
+
+        for chunk in chunks:
+            for histogram in histograms:
+                histogram.update(chunk)
+
+        return histograms
+
+    @staticmethod
+    def _fill_range(histograms: list, filename: pathlib.Path, offset: int, length: int) -> list:
+        """
+        Accumulates histograms over one byte range of PTRAC files in a worker process.
+
+        Parameters:
+            histograms: Empty `PtracHistogram` to accumulate.
+            filename: PTRAC file path.
+            offset: Byte offset of the first history.
+            length: Range length in bytes.
+
+        Returns:
+            Partial `PtracHistogram`.
+        """
+
+        chunk = Ptrac._parse_range(filename, offset, length, True)
+
+        for histogram in histograms:
+            histogram.update(chunk)
+
+        return histograms
+
+    def __call__(self, source: str | pathlib.Path | typing.Iterable[numpy.ndarray], size: int = 100000, workers: int = None):
+        """
+        Accumulates PTRAC events.
+
+        Parameters:
+            source: PTRAC file path or stream of structured arrays.
+            size: Minimum number of events per chunk read from files.
+            workers: Number of worker processes.
+
+        Returns:
+            `PtracHistogram`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        return PtracHistogram.fill([self], source, size, workers)[0]
@@ -0,0 +1,342 @@
+import typing
+import pathlib
+import concurrent.futures
+
+import numpy
+
+from . import _doer
+from . import _expression
+from . import ptrac
+from . import errors
+from .Ptrac import Ptrac
+
+
+class PtracMeshTally(_doer.Doer):
+    """
+    Tallies PTRAC track lengths on rectilinear meshes.
+
+    `PtracMeshTally` joins consecutive events of every history into track
+    segments and scores their weighted track lengths in the voxels they
+    cross, giving a track-length flux estimate like FMESH tallies after the
+    fact. Segments are traversed in batches: every mesh plane crossing of
+    every segment is computed at once, as in Amanatides-Woo voxel walks, and
+    the pieces between crossings are binned by their midpoints. Chunks must
+    hold whole histories, as `Ptrac.iter_arrays` chunks do. Weighted tallies
+    skip segments without weights.
+
+    Attributes:
+        edges: X, y, and z mesh edges.
+        energies: Energy bin edges.
+        weighted: Scores particle weights times track lengths if true, and track lengths otherwise.
+        where: Predicate selecting the events that start segments.
+        tally: Weighted track length sums by energy and voxel.
+        squares: Sums of squared per-history scores by energy and voxel.
+        histories: Number of histories.
+    """
+
+    # Track segments join consecutive events of one particle.
+    SEGMENT: typing.Final[numpy.dtype] = numpy.dtype(
+        [
+            ('nps', numpy.int64),
+            ('cell', numpy.int32),
+            ('start', numpy.float64, (3,)),
+            ('end', numpy.float64, (3,)),
+            ('erg', numpy.float64),
+            ('wgt', numpy.float64),
+        ]
+    )
+
+    def __init__(
+        self,
+        x: typing.Iterable[float],
+        y: typing.Iterable[float],
+        z: typing.Iterable[float],
+        energies: typing.Iterable[float] = None,
+        weighted: bool = True,
+        where: str = None,
+    ):
+        """
+        Initializes `PtracMeshTally`.
+
+        Parameters:
+            x: X mesh edges.
+            y: Y mesh edges.
+            z: Z mesh edges.
+            energies: Energy bin edges.
+            weighted: Scores particle weights times track lengths if true, and track lengths otherwise.
+            where: Predicate selecting the events that start segments, for
+                example `cell in {10, 11}`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        edges = tuple(numpy.asarray(values, dtype=numpy.float64) for values in (x, y, z))
+
+        if energies is not None:
+            energies = numpy.asarray(energies, dtype=numpy.float64)
+
+        for values in (*edges, *([energies] if energies is not None else [])):
+            if values.ndim != 1 or len(values) < 2 or (numpy.diff(values) <= 0).any():
+                raise errors.CliError(errors.CliCode.RUNTIME_DOER, values)
+
+        shape = (len(energies) - 1 if energies is not None else 1, *(len(values) - 1 for values in edges))
+
+        self.edges: typing.Final[tuple[numpy.ndarray]] = edges
+        self.energies: typing.Final[numpy.ndarray] = energies
+        self.weighted: typing.Final[bool] = weighted
+        self.where: typing.Final[_expression.Expression] = _expression.Expression(where, ptrac.Decoder.DTYPE.names) if where is not None else None
+        self.tally: numpy.ndarray = numpy.zeros(shape)
+        self.squares: numpy.ndarray = numpy.zeros(shape)
+        self.histories: int = 0
+
+    def empty(self):
+        """
+        Generates `PtracMeshTally` with the same mesh and no events.
+
+        Returns:
+            `PtracMeshTally`.
+        """
+
+        return PtracMeshTally(*self.edges, self.energies, self.weighted, str(self.where) if self.where is not None else None)
+
+    @staticmethod
+    def to_segments(events: numpy.ndarray, where: typing.Callable = None) -> numpy.ndarray:
+        """
+        Generates track segments from PTRAC events.
+
+        Segments join consecutive events of one history, except after
+        terminal events, where the next event starts another particle from
+        the bank. Segments take their cell, energy, and weight from the event
+        starting them, and segments without positions are left out.
+
+        Parameters:
+            events: Structured array with `ptrac.Decoder.DTYPE` fields holding whole histories.
+            where: Function returning boolean masks of the events that start segments.
+
+        Returns:
+            Structured array with `SEGMENT` fields.
+        """
+
+        start, end = events[:-1], events[1:]
+        xyz = numpy.column_stack([events['x'], events['y'], events['z']])
+        mask = (start['nps'] == end['nps']) & (numpy.abs(start['event_type']) // 1000 != ptrac.Decoder.TERMINAL)
+        mask &= numpy.isfinite(xyz[:-1]).all(axis=1) & numpy.isfinite(xyz[1:]).all(axis=1)
+
+        if where is not None:
+            mask &= where(start)
+
+        rows = numpy.flatnonzero(mask)
+        segments = numpy.zeros(len(rows), dtype=PtracMeshTally.SEGMENT)
+        segments['nps'] = start['nps'][rows]
+        segments['cell'] = start['cell'][rows]
+        segments['start'] = xyz[rows]
+        segments['end'] = xyz[rows + 1]
+        segments['erg'] = start['erg'][rows]
+        segments['wgt'] = start['wgt'][rows]
+
+        return segments
+
+    def _traverse(self, start: numpy.ndarray, end: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+        """
+        Splits segments at mesh planes.
+
+        Parameters:
+            start: Segment start positions.
+            end: Segment end positions.
+
+        Returns:
+            Segment row, flat voxel index, and track length of every piece inside the mesh.
+        """
+
+        count = len(start)
+        delta = end - start
+        rows = [numpy.arange(count), numpy.arange(count)]
+        times = [numpy.zeros(count), numpy.ones(count)]
+
+        # Segments cross the planes between the planes bounding their ends.
+        for axis, edges in enumerate(self.edges):
+            a = numpy.searchsorted(edges, start[:, axis], side='right')
+            b = numpy.searchsorted(edges, end[:, axis], side='right')
+            crossings = numpy.abs(b - a)
+            row = numpy.repeat(numpy.arange(count), crossings)
+            plane = numpy.arange(crossings.sum()) - numpy.repeat(numpy.cumsum(crossings) - crossings, crossings) + numpy.repeat(numpy.minimum(a, b), crossings)
+
+            rows.append(row)
+            times.append((edges[plane] - start[row, axis]) / delta[row, axis])
+
+        rows = numpy.concatenate(rows)
+        times = numpy.concatenate(times)
+        order = numpy.lexsort((times, rows))
+        rows, times = rows[order], times[order]
+
+        same = rows[1:] == rows[:-1]
+        row = rows[:-1][same]
+        first = times[:-1][same]
+        last = times[1:][same]
+        middle = start[row] + ((first + last) / 2)[:, None] * delta[row]
+
+        valid = last > first
+        indices = []
+        for axis, edges in enumerate(self.edges):
+            index = numpy.searchsorted(edges, middle[:, axis], side='right') - 1
+            valid &= (index >= 0) & (index < len(edges) - 1)
+            indices.append(index)
+
+        flat = numpy.ravel_multi_index([index[valid] for index in indices], self.tally.shape[1:])
+        lengths = (last - first)[valid] * numpy.linalg.norm(delta[row[valid]], axis=1)
+
+        return row[valid], flat, lengths
+
+    def update(self, events: numpy.ndarray):
+        """
+        Accumulates chunks of events.
+
+        Parameters:
+            events: Structured array with `ptrac.Decoder.DTYPE` fields holding whole histories.
+
+        Returns:
+            `PtracMeshTally`.
+        """
+
+        self.histories += len(numpy.unique(events['nps']))
+        segments = self.to_segments(events, self.where)
+
+        if self.weighted:
+            segments = segments[~numpy.isnan(segments['wgt'])]
+
+        if self.energies is not None:
+            energy = numpy.searchsorted(self.energies, segments['erg'], side='right') - 1
+            energy[segments['erg'] == self.energies[-1]] = len(self.energies) - 2
+            inside = (energy >= 0) & (energy < len(self.energies) - 1)
+            segments, energy = segments[inside], energy[inside]
+        else:
+            energy = numpy.zeros(len(segments), dtype=numpy.int64)
+
+        row, flat, lengths = self._traverse(segments['start'], segments['end'])
+
+        if not len(row):
+            return self
+
+        flat = energy[row] * self.tally[0].size + flat
+        scores = segments['wgt'][row] * lengths if self.weighted else lengths
+
+        self.tally += numpy.bincount(flat, weights=scores, minlength=self.tally.size).reshape(self.tally.shape)
+
+        # Relative errors need the score of every history in every voxel.
+        _, history = numpy.unique(segments['nps'][row], return_inverse=True)
+        keys, inverse = numpy.unique(history.reshape(-1).astype(numpy.int64) * self.tally.size + flat, return_inverse=True)
+        sums = numpy.bincount(inverse.reshape(-1), weights=scores)
+        self.squares += numpy.bincount(keys % self.tally.size, weights=sums**2, minlength=self.tally.size).reshape(self.tally.shape)
+
+        return self
+
+    def merge(self, other):
+        """
+        Merges partial tallies on the same mesh.
+
+        Parameters:
+            other: Partial `PtracMeshTally`.
+
+        Returns:
+            `PtracMeshTally`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        if (
+            any(not numpy.array_equal(a, b) for a, b in zip(self.edges, other.edges))
+            or (self.energies is None) != (other.energies is None)
+            or (self.energies is not None and not numpy.array_equal(self.energies, other.energies))
+            or self.weighted != other.weighted
+        ):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, other)
+
+        self.tally += other.tally
+        self.squares += other.squares
+        self.histories += other.histories
+
+        return self
+
+    @property
+    def volumes(self) -> numpy.ndarray:
+        """
+        Voxel volumes.
+        """
+
+        x, y, z = (numpy.diff(values) for values in self.edges)
+
+        return x[:, None, None] * y[None, :, None] * z[None, None, :]
+
+    def result(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Computes track-length flux estimates.
+
+        Returns:
+            Flux per source particle and its relative error by energy and voxel.
+        """
+
+        histories = max(self.histories, 1)
+        flux = self.tally / (self.volumes * histories)
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            error = numpy.sqrt(numpy.clip(self.squares / self.tally**2 - 1 / histories, 0, None))
+
+        return flux, numpy.where(self.tally > 0, error, 0.0)
+
+    @staticmethod
+    def _update_range(tally, filename: pathlib.Path, offset: int, length: int):
+        """
+        Accumulates track lengths over one byte range of PTRAC files in a worker process.
+
+        Parameters:
+            tally: Empty `PtracMeshTally` to accumulate.
+            filename: PTRAC file path.
+            offset: Byte offset of the first history.
+            length: Range length in bytes.
+
+        Returns:
+            Partial `PtracMeshTally`.
+        """
+
+        return tally.update(Ptrac._parse_range(filename, offset, length, True))
+
+    def __call__(self, source: str | pathlib.Path | typing.Iterable[numpy.ndarray], size: int = 100000, workers: int = None):
+        """
+        Accumulates PTRAC events.
+
+        With `workers`, ASCII files are split into byte ranges at history
+        boundaries, every range is tallied in a process pool, and the partial
+        tallies are merged.
+
+        Parameters:
+            source: PTRAC file path or stream of structured arrays holding whole histories.
+            size: Minimum number of events per chunk read from files.
+            workers: Number of worker processes.
+
+        Returns:
+            `PtracMeshTally`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        if isinstance(source, (str, pathlib.Path)) and workers and Ptrac._splittable(source):
+            filename = pathlib.Path(source)
+            ranges = Ptrac._ranges(Ptrac._load_ranges(filename), size * Ptrac._event_length(filename))
+
+            with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(PtracMeshTally._update_range, self.empty(), filename, offset, length) for offset, length in ranges]
+
+                for future in concurrent.futures.as_completed(futures):
+                    self.merge(future.result())
+
+            return self
+
+        chunks = Ptrac.iter_arrays(source, size) if isinstance(source, (str, pathlib.Path)) else source
+
+        for chunk in chunks:
+            self.update(chunk)
+
+        return self
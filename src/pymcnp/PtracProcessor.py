@@ -1,3 +1,8 @@
+import typing
+import pathlib
+
+import numpy
+
 from . import _doer
 from . import ptrac
 from .Ptrac import Ptrac
@@ -6,6 +11,10 @@ from .Ptrac import Ptrac
 class PtracProcessor(_doer.Doer):
     """
     Processes `Ptrac`.
+
+    Calling `PtracProcessor` runs the `process_*` hooks once per event. Batch
+    mode runs the `process_*_batch` hooks once per event type and chunk of
+    `ptrac.Decoder.DTYPE` structured arrays instead.
     """
 
     def prehook(self):
@@ -72,17 +81,115 @@ class PtracProcessor(_doer.Doer):
 
         pass
 
-    def __call__(self, file: Ptrac):
+    def process_source_batch(self, events: numpy.ndarray):
+        """
+        Runs when processing chunks of source events.
+
+        Parameters:
+            events: Structured array of source events.
+        """
+
+        pass
+
+    def process_bank_batch(self, events: numpy.ndarray):
+        """
+        Runs when processing chunks of bank events.
+
+        Parameters:
+            events: Structured array of bank events.
+        """
+
+        pass
+
+    def process_surface_batch(self, events: numpy.ndarray):
+        """
+        Runs when processing chunks of surface events.
+
+        Parameters:
+            events: Structured array of surface events.
+        """
+
+        pass
+
+    def process_collision_batch(self, events: numpy.ndarray):
+        """
+        Runs when processing chunks of collision events.
+
+        Parameters:
+            events: Structured array of collision events.
+        """
+
+        pass
+
+    def process_terminal_batch(self, events: numpy.ndarray):
+        """
+        Runs when processing chunks of terminal events.
+
+        Parameters:
+            events: Structured array of terminal events.
+        """
+
+        pass
+
+    def process_batch(self, events: numpy.ndarray):
+        """
+        Processes chunks of events.
+
+        Sorts the chunk by event kind once and runs the matching
+        `process_*_batch` hook on every group.
+
+        Parameters:
+            events: Structured array with `ptrac.Decoder.DTYPE` fields.
+        """
+
+        hooks = {
+            ptrac.Decoder.SOURCE: self.process_source_batch,
+            ptrac.Decoder.SURFACE: self.process_surface_batch,
+            ptrac.Decoder.COLLISION: self.process_collision_batch,
+            ptrac.Decoder.TERMINAL: self.process_terminal_batch,
+        }
+
+        kinds = numpy.abs(events['event_type']) // 1000
+        order = numpy.argsort(kinds, kind='stable')
+        groups, starts = numpy.unique(kinds[order], return_index=True)
+
+        for kind, start, stop in zip(groups, starts, [*starts[1:], len(order)]):
+            hooks.get(kind, self.process_bank_batch)(events[order[start:stop]])
+
+    def process_arrays(self, source: str | pathlib.Path | typing.Iterable[numpy.ndarray], size: int = 100000):
         """
-        Processes `Ptrac`.
+        Processes PTRAC events in batch mode.
 
         Parameters:
-            file: File to process.
+            source: PTRAC file path or stream of structured arrays.
+            size: Minimum number of events per chunk read from files.
+
+        Raises:
+            CliError: RUNTIME_PATH.
         """
 
+        chunks = Ptrac.iter_arrays(source, size) if isinstance(source, (str, pathlib.Path)) else source
+
+        self.prehook()
+
+        for chunk in chunks:
+            self.process_batch(chunk)
+
+        self.posthook()
+
+    def __call__(self, file: Ptrac | typing.Iterable[ptrac.History]):
+        """
+        Processes `Ptrac` one event at a time.
+
+        Parameters:
+            file: File or stream of histories to process.
+        """
+
+        histories = file.histories if isinstance(file, Ptrac) else file
+
         self.prehook()
 
-        for history in file.histories:
+        for history in histories:
             kind = history.i_line.event_type
             for event in history.events:
                 match kind:
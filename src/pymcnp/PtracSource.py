@@ -0,0 +1,335 @@
+import typing
+import pathlib
+
+import numpy
+
+from . import _doer
+from . import _expression
+from . import inp
+from . import ptrac
+from . import errors
+from .Ptrac import Ptrac
+
+
+class PtracSource(_doer.Doer):
+    """
+    Converts PTRAC surface crossings into INP sources.
+
+    `PtracSource` streams surface events from first-stage PTRAC files and
+    reduces them to weighted crossing sites, an energy histogram, and a
+    direction cosine histogram, which `to_cards` writes as `sdef`, `si`,
+    and `sp` cards for second-stage runs. Sites are kept as a list of unique
+    positions, or binned to voxel centers on a mesh to keep sources compact.
+    Listed sites are made unique within every chunk and across chunks only
+    once, when `points` or `weights` are first read, while mesh sites are
+    summed into one array per voxel, so memory stays bounded by the mesh.
+    Energies and directions are sampled independently of sites, and events
+    without weights count once.
+
+    Attributes:
+        surfaces: Surface numbers to keep crossings of.
+        mesh: X, y, and z edges binning crossing sites.
+        energies: Energy bin edges.
+        cosines: Direction cosine bin edges.
+        axis: Unit vector direction cosines are measured from.
+        where: Predicate selecting crossings.
+        points: Crossing sites.
+        weights: Crossing weight sums by site.
+        spectrum: Crossing weight sums by energy bin.
+        angles: Crossing weight sums by direction cosine bin.
+        histories: Number of histories.
+    """
+
+    def __init__(
+        self,
+        surfaces: typing.Iterable[int] = None,
+        mesh: tuple[typing.Iterable[float]] = None,
+        energies: typing.Iterable[float] = None,
+        cosines: typing.Iterable[float] = None,
+        axis: typing.Iterable[float] = (0.0, 0.0, 1.0),
+        where: str = None,
+    ):
+        """
+        Initializes `PtracSource`.
+
+        Parameters:
+            surfaces: Surface numbers to keep crossings of, or `None` for all surfaces.
+            mesh: X, y, and z edges binning crossing sites, or `None` to list sites.
+            energies: Energy bin edges.
+            cosines: Direction cosine bin edges between -1 and 1.
+            axis: Vector direction cosines are measured from.
+            where: Predicate selecting crossings, for example `erg > 0.1`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        if mesh is not None:
+            mesh = tuple(numpy.asarray(values, dtype=numpy.float64) for values in mesh)
+
+            if len(mesh) != 3:
+                raise errors.CliError(errors.CliCode.RUNTIME_DOER, mesh)
+
+        if energies is not None:
+            energies = numpy.asarray(energies, dtype=numpy.float64)
+
+        if cosines is not None:
+            cosines = numpy.asarray(cosines, dtype=numpy.float64)
+
+            if len(cosines) and (cosines[0] < -1 or cosines[-1] > 1):
+                raise errors.CliError(errors.CliCode.RUNTIME_DOER, cosines)
+
+        for values in (*(mesh or ()), *(values for values in (energies, cosines) if values is not None)):
+            if values.ndim != 1 or len(values) < 2 or (numpy.diff(values) <= 0).any():
+                raise errors.CliError(errors.CliCode.RUNTIME_DOER, values)
+
+        axis = numpy.asarray(axis, dtype=numpy.float64)
+
+        if axis.shape != (3,) or not numpy.linalg.norm(axis) > 0:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, axis)
+
+        self.surfaces: typing.Final[numpy.ndarray] = numpy.asarray(list(surfaces), dtype=numpy.float64) if surfaces is not None else None
+        self.mesh: typing.Final[tuple[numpy.ndarray]] = mesh
+        self.energies: typing.Final[numpy.ndarray] = energies
+        self.cosines: typing.Final[numpy.ndarray] = cosines
+        self.axis: typing.Final[numpy.ndarray] = axis / numpy.linalg.norm(axis)
+        self.where: typing.Final[_expression.Expression] = _expression.Expression(where, ptrac.Decoder.DTYPE.names) if where is not None else None
+        self._sites: list[tuple[numpy.ndarray, numpy.ndarray]] = []
+        self._voxels: numpy.ndarray = numpy.zeros((2, *(len(edges) - 1 for edges in mesh))) if mesh is not None else None
+        self.spectrum: numpy.ndarray = numpy.zeros(len(energies) - 1) if energies is not None else None
+        self.angles: numpy.ndarray = numpy.zeros(len(cosines) - 1) if cosines is not None else None
+        self.histories: int = 0
+
+    @staticmethod
+    def _bin(edges: numpy.ndarray, values: numpy.ndarray, weights: numpy.ndarray) -> numpy.ndarray:
+        """
+        Sums weights by bin, including the last edge in the last bin.
+
+        Parameters:
+            edges: Bin edges.
+            values: Values to bin.
+            weights: Weights to sum.
+
+        Returns:
+            Weight sums by bin.
+        """
+
+        index = numpy.searchsorted(edges, values, side='right') - 1
+        index[values == edges[-1]] = len(edges) - 2
+        inside = (index >= 0) & (index < len(edges) - 1)
+
+        return numpy.bincount(index[inside], weights=weights[inside], minlength=len(edges) - 1)
+
+    @staticmethod
+    def _unique(points: numpy.ndarray, weights: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Sums weights by unique site.
+
+        Parameters:
+            points: Crossing sites.
+            weights: Crossing weights.
+
+        Returns:
+            Unique sites and their weight sums.
+        """
+
+        points, inverse = numpy.unique(points.reshape(-1, 3), axis=0, return_inverse=True)
+
+        return points, numpy.bincount(inverse.reshape(-1), weights=weights, minlength=len(points))
+
+    def _reduce(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """
+        Reduces partial sites to unique sites.
+
+        Returns:
+            Unique sites and their weight sums.
+        """
+
+        if self.mesh is not None:
+            weights, counts = self._voxels
+            indices = numpy.nonzero(counts)
+            centers = [((edges[:-1] + edges[1:]) / 2)[index] for index, edges in zip(indices, self.mesh)]
+
+            return numpy.column_stack(centers).reshape(-1, 3), weights[indices]
+
+        if len(self._sites) != 1:
+            points = numpy.concatenate([numpy.zeros((0, 3)), *(points for points, _ in self._sites)])
+            weights = numpy.concatenate([numpy.zeros(0), *(weights for _, weights in self._sites)])
+            self._sites = [self._unique(points, weights)]
+
+        return self._sites[0]
+
+    @property
+    def points(self) -> numpy.ndarray:
+        return self._reduce()[0]
+
+    @property
+    def weights(self) -> numpy.ndarray:
+        return self._reduce()[1]
+
+    def update(self, events: numpy.ndarray):
+        """
+        Accumulates chunks of events.
+
+        Parameters:
+            events: Structured array with `ptrac.Decoder.DTYPE` fields.
+
+        Returns:
+            `PtracSource`.
+        """
+
+        self.histories += len(numpy.unique(events['nps']))
+
+        mask = numpy.abs(events['event_type']) // 1000 == ptrac.Decoder.SURFACE
+
+        if self.surfaces is not None:
+            mask &= numpy.isin(numpy.abs(events['surface']), self.surfaces)
+
+        if self.where is not None:
+            mask &= self.where(events)
+
+        events = events[mask]
+        points = numpy.column_stack([events['x'], events['y'], events['z']])
+        weights = numpy.where(numpy.isnan(events['wgt']), 1.0, events['wgt'])
+
+        if self.mesh is not None:
+            indices = [numpy.searchsorted(edges, points[:, axis], side='right') - 1 for axis, edges in enumerate(self.mesh)]
+            inside = numpy.logical_and.reduce([(index >= 0) & (index < len(edges) - 1) for index, edges in zip(indices, self.mesh)])
+            shape = self._voxels.shape[1:]
+            flat = numpy.ravel_multi_index([index[inside] for index in indices], shape)
+            self._voxels[0] += numpy.bincount(flat, weights=weights[inside], minlength=self._voxels[0].size).reshape(shape)
+            self._voxels[1] += numpy.bincount(flat, minlength=self._voxels[1].size).reshape(shape)
+        else:
+            inside = numpy.isfinite(points).all(axis=1)
+            self._sites.append(self._unique(points[inside], weights[inside]))
+
+        if self.energies is not None:
+            self.spectrum += self._bin(self.energies, events['erg'], weights)
+
+        if self.cosines is not None:
+            cosine = events['u'] * self.axis[0] + events['v'] * self.axis[1] + events['w'] * self.axis[2]
+            self.angles += self._bin(self.cosines, numpy.clip(cosine, -1, 1), weights)
+
+        return self
+
+    def merge(self, other):
+        """
+        Merges partial sources with the same bins.
+
+        Parameters:
+            other: Partial `PtracSource`.
+
+        Returns:
+            `PtracSource`.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        for a, b in ((self.mesh, other.mesh), (self.energies, other.energies), (self.cosines, other.cosines)):
+            if (a is None) != (b is None) or (a is not None and (len(a) != len(b) or not all(numpy.array_equal(x, y) for x, y in zip(a, b)))):
+                raise errors.CliError(errors.CliCode.RUNTIME_DOER, other)
+
+        if self.mesh is not None:
+            self._voxels += other._voxels
+        else:
+            self._sites += other._sites
+
+        self.histories += other.histories
+
+        if self.spectrum is not None:
+            self.spectrum += other.spectrum
+
+        if self.angles is not None:
+            self.angles += other.angles
+
+        return self
+
+    def to_cards(self, start: int = 1, particle: str = None) -> list[inp.Sdef | inp.Si_1 | inp.Sp_0]:
+        """
+        Generates INP source cards.
+
+        Sites become an `l` distribution, and energies and direction cosines
+        become `h` histograms. Source weights are total crossing weights per
+        first-stage history, so second-stage tallies stay normalized to
+        first-stage source particles.
+
+        Parameters:
+            start: First distribution number.
+            particle: Source particle designator.
+
+        Returns:
+            `sdef` card followed by its `si` and `sp` cards.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        total = self.weights.sum()
+
+        if not len(self.points) or not total > 0:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, self.points)
+
+        def real(values):
+            return [f'{value:.6E}' for value in values]
+
+        number = start
+        options = [inp.sdef.Pos_1(f'd{number}')]
+        cards = [inp.Si_1(number, real(self.points.reshape(-1)), 'l'), inp.Sp_0(number, real(self.weights / total), 'd')]
+
+        for keyword, edges, histogram in ((inp.sdef.Erg_1, self.energies, self.spectrum), (inp.sdef.Dir_1, self.cosines, self.angles)):
+            if edges is None or not histogram.sum() > 0:
+                continue
+
+            number += 1
+            options.append(keyword(f'd{number}'))
+            cards += [inp.Si_1(number, real(edges), 'h'), inp.Sp_0(number, real([0, *(histogram / histogram.sum())]), 'd')]
+
+            if keyword is inp.sdef.Dir_1:
+                options.append(inp.sdef.Vec_0(*real(self.axis)))
+
+        options.append(inp.sdef.Wgt_0(real([total / max(self.histories, 1)])[0]))
+
+        if particle is not None:
+            options.append(inp.sdef.Par_0(particle))
+
+        return [inp.Sdef(options), *cards]
+
+    def to_mcnp(self, start: int = 1, particle: str = None) -> str:
+        """
+        Generates INP for source cards.
+
+        Parameters:
+            start: First distribution number.
+            particle: Source particle designator.
+
+        Returns:
+            INP for `sdef`, `si`, and `sp` cards.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        return ''.join(f'{card.to_mcnp()}\n' for card in self.to_cards(start, particle))
+
+    def __call__(self, source: str | pathlib.Path | typing.Iterable[numpy.ndarray], size: int = 100000):
+        """
+        Accumulates PTRAC events.
+
+        Parameters:
+            source: PTRAC file path or stream of structured arrays.
+            size: Minimum number of events per chunk read from files.
+
+        Returns:
+            `PtracSource`.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+        """
+
+        chunks = Ptrac.iter_arrays(source, size) if isinstance(source, (str, pathlib.Path)) else source
+
+        for chunk in chunks:
+            self.update(chunk)
+
+        return self
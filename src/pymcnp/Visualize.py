@@ -1,14 +1,18 @@
 import os
+import typing
 import pathlib
 
 import numpy
 import pyvista
 
 from . import inp
+from . import ptrac
 from . import _show
 from . import _doer
 from . import errors
 from .Inp import Inp
+from .Ptrac import Ptrac
+from .Meshtal import Meshtal
 
 
 class Visualize(_doer.Doer):
@@ -151,6 +155,214 @@ class Visualize(_doer.Doer):
 
         return plot
 
+    @staticmethod
+    def _links(events: numpy.ndarray) -> numpy.ndarray:
+        """
+        Finds consecutive events on the same track.
+
+        Parameters:
+            events: Structured array with `ptrac.Decoder.DTYPE` fields.
+
+        Returns:
+            Boolean mask with one entry per pair of consecutive events.
+        """
+
+        finite = numpy.isfinite(events['x']) & numpy.isfinite(events['y']) & numpy.isfinite(events['z'])
+        same = events['nps'][1:] == events['nps'][:-1]
+
+        return same & (numpy.abs(events['event_type'][:-1]) // 1000 != ptrac.Decoder.TERMINAL) & finite[:-1] & finite[1:]
+
+    @staticmethod
+    def to_tracks(source: str | pathlib.Path | Ptrac | list[numpy.ndarray], max_segments: int = 100000, seed: int = 0, size: int = 100000) -> pyvista.PolyData:
+        """
+        Generates polylines of PTRAC particle tracks.
+
+        Reads events twice in columnar chunks: once to count the segments of
+        every history and stratify histories by their last event type, and
+        once to gather the sampled histories. Strata share `max_segments`
+        evenly, so rare outcomes stay visible, and histories are sampled at
+        random within strata. Tracks still over budget are decimated by
+        keeping every few points along them, and connectivity is built with
+        NumPy.
+
+        Parameters:
+            source: PTRAC file path, `Ptrac`, or list of structured arrays.
+            max_segments: Maximum number of line segments.
+            seed: Sampling random seed.
+            size: Minimum number of events per chunk read from files.
+
+        Returns:
+            `pyvista.PolyData` with `nps`, `event_type`, `erg`, and `wgt` point data.
+
+        Raises:
+            CliError: RUNTIME_PATH, RUNTIME_DOER.
+        """
+
+        if max_segments is None or max_segments < 1:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, max_segments)
+
+        if isinstance(source, Ptrac):
+            source = [source.to_arrays()]
+
+        def chunks():
+            return Ptrac.iter_arrays(source, size) if isinstance(source, (str, pathlib.Path)) else iter(source)
+
+        nps, counts, strata = [], [], []
+        for chunk in chunks():
+            if not len(chunk):
+                continue
+
+            ends = numpy.flatnonzero(numpy.r_[chunk['nps'][1:] != chunk['nps'][:-1], True])
+            starts = numpy.r_[0, ends[:-1] + 1]
+
+            nps.append(chunk['nps'][starts])
+            counts.append(numpy.add.reduceat(numpy.r_[Visualize._links(chunk), False].astype(numpy.int64), starts))
+            strata.append(chunk['event_type'][ends])
+
+        nps = numpy.concatenate(nps) if nps else numpy.zeros(0, dtype=numpy.int64)
+        counts = numpy.concatenate(counts) if counts else numpy.zeros(0, dtype=numpy.int64)
+        strata = numpy.concatenate(strata) if strata else numpy.zeros(0, dtype=numpy.int32)
+
+        # Strata under their share of the budget pass the rest on to larger strata.
+        order = numpy.lexsort((numpy.random.default_rng(seed).random(len(nps)), strata))
+        groups, first = numpy.unique(strata[order], return_index=True)
+        bounds = numpy.r_[first, len(order)]
+        totals = numpy.add.reduceat(counts[order], first) if len(first) else numpy.zeros(0, dtype=numpy.int64)
+        remaining = max_segments
+        chosen = []
+
+        for rank, group in enumerate(numpy.argsort(totals, kind='stable')):
+            share = remaining // (len(groups) - rank)
+            rows = order[bounds[group] : bounds[group + 1]]
+            total = numpy.cumsum(counts[rows])
+            taken = max(int(numpy.searchsorted(total, share, side='right')), 1)
+
+            chosen.append(rows[:taken])
+            remaining -= int(total[taken - 1])
+
+        chosen = numpy.concatenate(chosen) if chosen else numpy.zeros(0, dtype=numpy.int64)
+        selected = numpy.sort(nps[chosen])
+
+        events = [chunk[numpy.isin(chunk['nps'], selected)] for chunk in chunks()]
+        events = numpy.concatenate(events) if events else numpy.zeros(0, dtype=ptrac.Decoder.DTYPE)
+        links = Visualize._links(events) if len(events) else numpy.zeros(0, dtype=bool)
+
+        starts = numpy.r_[True, ~links][: len(events)]
+        track = numpy.cumsum(starts) - 1
+        place = numpy.arange(len(events)) - numpy.flatnonzero(starts)[track]
+        last = numpy.r_[starts[1:], True][: len(events)]
+        keep = numpy.r_[links, False][: len(events)] | numpy.r_[False, links][: len(events)]
+
+        # Every track keeps at least one segment, so tracks over budget are
+        # sampled, and the rest are decimated by keeping every stride-th point.
+        tracks = numpy.unique(track[keep])
+        if len(tracks) > max_segments:
+            tracks = numpy.random.default_rng(seed).choice(tracks, max_segments, replace=False)
+            keep &= numpy.isin(track, tracks)
+
+        segments = int(numpy.r_[links, False][keep].sum())
+        stride = 1 if segments <= max_segments else -(-segments // max(max_segments - len(tracks), 1))
+        keep &= (place % stride == 0) | last | ~numpy.r_[links, False]
+        events, track = events[keep], track[keep]
+
+        _, track, lengths = numpy.unique(track, return_inverse=True, return_counts=True)
+        heads = numpy.r_[0, numpy.cumsum(lengths)[:-1]] + numpy.arange(len(lengths))
+        lines = numpy.zeros(len(events) + len(lengths), dtype=numpy.int64)
+        body = numpy.ones(len(lines), dtype=bool)
+        body[heads] = False
+        lines[heads] = lengths
+        lines[body] = numpy.arange(len(events))
+
+        tracks = pyvista.PolyData(numpy.column_stack([events['x'], events['y'], events['z']]).astype(numpy.float64), lines=lines if len(lines) else None)
+
+        for name in ('nps', 'event_type', 'erg', 'wgt'):
+            tracks.point_data[name] = events[name]
+
+        return tracks
+
+    def add_tracks(
+        self,
+        source: str | pathlib.Path | Ptrac | list[numpy.ndarray],
+        plot: pyvista.Plotter = None,
+        max_segments: int = 100000,
+        scalars: typing.Literal['event_type', 'erg', 'wgt', 'nps'] = 'event_type',
+        seed: int = 0,
+    ) -> pyvista.Plotter:
+        """
+        Visualizes PTRAC particle tracks over INP surfaces.
+
+        Parameters:
+            source: PTRAC file path, `Ptrac`, or list of structured arrays.
+            plot: Plot to add tracks to, or `None` for INP surfaces.
+            max_segments: Maximum number of line segments.
+            scalars: Point data coloring the tracks.
+            seed: Sampling random seed.
+
+        Returns:
+            Plot with tracks.
+
+        Raises:
+            CliError: RUNTIME_PATH, RUNTIME_DOER.
+        """
+
+        if scalars not in {'event_type', 'erg', 'wgt', 'nps'}:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, scalars)
+
+        tracks = self.to_tracks(source, max_segments, seed)
+
+        if plot is None:
+            plot = self.to_show_surfaces()
+
+        if tracks.n_lines:
+            plot.add_mesh(tracks, scalars=scalars, line_width=1, nan_opacity=0.5)
+
+        return plot
+
+    def add_meshtal(
+        self,
+        source: str | pathlib.Path | Meshtal,
+        plot: pyvista.Plotter = None,
+        number: int = None,
+        scalars: typing.Literal['result', 'error'] = 'result',
+        energy: int = -1,
+        time: int = -1,
+        opacity: float = 0.5,
+    ) -> pyvista.Plotter:
+        """
+        Visualizes MESHTAL mesh tallies over INP surfaces.
+
+        Parameters:
+            source: MESHTAL file path or `Meshtal`.
+            plot: Plot to add mesh tallies to, or `None` for INP surfaces.
+            number: Mesh tally number to read from multi-tally files.
+            scalars: Cell data coloring the mesh.
+            energy: Energy bin index.
+            time: Time bin index.
+            opacity: Mesh opacity.
+
+        Returns:
+            Plot with mesh tallies.
+
+        Raises:
+            CliError: RUNTIME_PATH, RUNTIME_DOER.
+            MeshtalError: SYNTAX_FILE, SEMANTICS_FILE.
+        """
+
+        if scalars not in {'result', 'error'}:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, scalars)
+
+        if not isinstance(source, Meshtal):
+            source = Meshtal.get_tally(source, number) if number is not None else Meshtal.from_file(source)
+
+        grid = source.to_pyvista(energy, time)
+
+        if plot is None:
+            plot = self.to_show_surfaces()
+
+        plot.add_mesh(grid, scalars=scalars, opacity=opacity)
+
+        return plot
+
     def to_pdf_cells(self, path: str | pathlib.Path):
         """
         Saves render of cells as PDF.
@@ -8,13 +8,18 @@ from .Check import Check
 from .Convert import Convert
 from .Inp import Inp
 from .Meshtal import Meshtal
+from .MeshtalArray import MeshtalArray
 from .MeshtalFilter import MeshtalFilter
 from .MeshtalProcessor import MeshtalProcessor
 from .Outp import Outp
 from .Plot import Plot
 from .Ptrac import Ptrac
+from .PtracCoincidence import PtracCoincidence
 from .PtracFilter import PtracFilter
+from .PtracHistogram import PtracHistogram
+from .PtracMeshTally import PtracMeshTally
 from .PtracProcessor import PtracProcessor
+from .PtracSource import PtracSource
 from .Run import Run
 from .Visualize import Visualize
 
@@ -30,13 +35,18 @@ __all__ = [
     'Convert',
     'Inp',
     'Meshtal',
+    'MeshtalArray',
     'MeshtalFilter',
     'MeshtalProcessor',
     'Outp',
     'Plot',
     'Ptrac',
+    'PtracCoincidence',
     'PtracFilter',
+    'PtracHistogram',
+    'PtracMeshTally',
     'PtracProcessor',
+    'PtracSource',
     'Run',
     'Visualize',
 ]
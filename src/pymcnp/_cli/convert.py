@@ -2,15 +2,20 @@
 Usage:
     pymcnp convert <outp> <number> --csv
     pymcnp convert <outp> <number> --parquet
+    pymcnp convert <ptrac> --parquet [--row-group-size=<rows>]
 
 Options:
-    -c --csv        Write CSV.
-    -p --parquet    Write PARQUET.
+    -c --csv                    Write CSV.
+    -p --parquet                Write PARQUET.
+    -r --row-group-size=<rows>  Events per PARQUET row group [default: 100000].
 
 Takes an F1, F4, or F8 output file that can have multiple tallies in it and outputs a specific one as
 a pandas dataframe as parquet or csv file.
+
+Takes a PTRAC file and streams its events into a parquet file with one row per event.
 """
 
+import os
 import pathlib
 
 from docopt import docopt
@@ -18,6 +23,7 @@ from docopt import docopt
 from . import _io
 from .. import errors
 from ..Outp import Outp
+from ..Ptrac import Ptrac
 from ..Convert import Convert
 
 
@@ -30,6 +36,12 @@ def main() -> None:
 
     # Processing CLI arguments.
     args = docopt(__doc__)
+
+    if args['<ptrac>']:
+        convert_ptrac(pathlib.Path(args['<ptrac>']), int(args['--row-group-size']))
+        _io.done()
+        return
+
     number = args['<number>']
     file = pathlib.Path(args['<outp>'])
 
@@ -54,3 +66,25 @@ def main() -> None:
         convert.to_parquet(number, _io.get_outfile(file, 'parquet', number))
 
     _io.done()
+
+
+def convert_ptrac(file: pathlib.Path, size: int) -> None:
+    """
+    Converts PTRAC files to PARQUET.
+
+    Parameters:
+        file: PTRAC file path.
+        size: Minimum number of events per row group.
+    """
+
+    try:
+        chunks = Ptrac.iter_arrays(file, size)
+
+        if 'PYTEST_CURRENT_TEST' not in os.environ:  # pragma: no cover
+            Ptrac.write_parquet(chunks, _io.get_outfile(file, 'parquet'))
+    except errors.PtracError as err:
+        _io.error(str(err))
+        exit(1)
+    except errors.CliError as err:
+        _io.error(str(err))
+        exit(2)
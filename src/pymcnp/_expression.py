@@ -0,0 +1,265 @@
+import re
+import typing
+
+import numpy
+
+from . import errors
+
+
+class Expression:
+    """
+    Represents column predicates.
+
+    `Expression` compiles predicates over the columns of NumPy structured
+    arrays into functions returning boolean masks. Predicates compare columns
+    with numbers using `<`, `<=`, `>`, `>=`, `==`, and `!=`, test membership
+    with `in {...}` and `not in {...}`, and combine with `&`, `|`, `~`, and
+    parentheses, for example `erg > 1.0 & cell in {10, 11}`.
+
+    Attributes:
+        source: Predicate source.
+        names: Column names available to the predicate.
+    """
+
+    _TOKENS = re.compile(r'\s*(?:(<=|>=|==|!=|<|>|&|\||~|\(|\)|\{|\}|,)|([-+]?(?:\d+[.]?\d*|[.]\d+)(?:[eE][-+]?\d+)?)|([A-Za-z_]\w*))')
+
+    _COMPARISONS = {
+        '<': numpy.less,
+        '<=': numpy.less_equal,
+        '>': numpy.greater,
+        '>=': numpy.greater_equal,
+        '==': numpy.equal,
+        '!=': numpy.not_equal,
+    }
+
+    def __init__(self, source: str, names: typing.Iterable[str]):
+        """
+        Initializes `Expression`.
+
+        Parameters:
+            source: Predicate source.
+            names: Column names available to the predicate.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        if source is None or names is None:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, source)
+
+        self.source: typing.Final[str] = source
+        self.names: typing.Final[tuple[str]] = tuple(names)
+
+        self._tokens = self._tokenize(source)
+        self._index = 0
+        self._function = self._parse_or()
+
+        if self._index != len(self._tokens):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, source)
+
+    def _tokenize(self, source: str) -> list[tuple[str, str]]:
+        """
+        Splits predicate sources into tokens.
+
+        Parameters:
+            source: Predicate source.
+
+        Returns:
+            Token kind and text of every token.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        tokens = []
+        position = 0
+        source = source.rstrip()
+
+        while position < len(source):
+            match = self._TOKENS.match(source, position)
+
+            if not match or match.end() == position:
+                raise errors.CliError(errors.CliCode.RUNTIME_DOER, source)
+
+            if match[1]:
+                tokens.append(('symbol', match[1]))
+            elif match[2]:
+                tokens.append(('number', match[2]))
+            else:
+                tokens.append(('name', match[3]))
+
+            position = match.end()
+
+        return tokens
+
+    def _peek(self) -> tuple[str, str]:
+        """
+        Looks at the next token.
+
+        Returns:
+            Token kind and text, or `None` pairs past the end.
+        """
+
+        return self._tokens[self._index] if self._index < len(self._tokens) else (None, None)
+
+    def _take(self, kind: str, text: str = None) -> str:
+        """
+        Consumes the next token.
+
+        Parameters:
+            kind: Expected token kind.
+            text: Expected token text.
+
+        Returns:
+            Token text.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        token_kind, token_text = self._peek()
+
+        if token_kind != kind or (text is not None and token_text != text):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, self.source)
+
+        self._index += 1
+
+        return token_text
+
+    def _parse_or(self) -> typing.Callable:
+        """
+        Parses `|` alternatives.
+
+        Returns:
+            Mask function.
+        """
+
+        terms = [self._parse_and()]
+
+        while self._peek() == ('symbol', '|'):
+            self._index += 1
+            terms.append(self._parse_and())
+
+        if len(terms) == 1:
+            return terms[0]
+
+        return lambda table: numpy.logical_or.reduce([term(table) for term in terms])
+
+    def _parse_and(self) -> typing.Callable:
+        """
+        Parses `&` conjunctions.
+
+        Returns:
+            Mask function.
+        """
+
+        factors = [self._parse_not()]
+
+        while self._peek() == ('symbol', '&'):
+            self._index += 1
+            factors.append(self._parse_not())
+
+        if len(factors) == 1:
+            return factors[0]
+
+        return lambda table: numpy.logical_and.reduce([factor(table) for factor in factors])
+
+    def _parse_not(self) -> typing.Callable:
+        """
+        Parses `~` negations and parentheses.
+
+        Returns:
+            Mask function.
+        """
+
+        if self._peek() == ('symbol', '~'):
+            self._index += 1
+            factor = self._parse_not()
+            return lambda table: ~factor(table)
+
+        if self._peek() == ('symbol', '('):
+            self._index += 1
+            expression = self._parse_or()
+            self._take('symbol', ')')
+            return expression
+
+        return self._parse_comparison()
+
+    def _parse_comparison(self) -> typing.Callable:
+        """
+        Parses column comparisons and membership tests.
+
+        Returns:
+            Mask function.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        name = self._take('name')
+
+        if name not in self.names:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, name)
+
+        kind, text = self._peek()
+
+        if kind == 'name' and text in {'in', 'not'}:
+            self._index += 1
+
+            if text == 'not':
+                self._take('name', 'in')
+
+            values = self._parse_set()
+
+            if text == 'not':
+                return lambda table: ~numpy.isin(table[name], values)
+
+            return lambda table: numpy.isin(table[name], values)
+
+        operator = self._take('symbol')
+
+        if operator not in self._COMPARISONS:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, self.source)
+
+        value = float(self._take('number'))
+        comparison = self._COMPARISONS[operator]
+
+        return lambda table: comparison(table[name], value)
+
+    def _parse_set(self) -> numpy.ndarray:
+        """
+        Parses `{...}` number sets.
+
+        Returns:
+            Set values.
+        """
+
+        self._take('symbol', '{')
+        values = [float(self._take('number'))]
+
+        while self._peek() == ('symbol', ','):
+            self._index += 1
+            values.append(float(self._take('number')))
+
+        self._take('symbol', '}')
+
+        return numpy.array(values)
+
+    def __call__(self, table: numpy.ndarray) -> numpy.ndarray:
+        """
+        Evaluates `Expression` on structured arrays.
+
+        Parameters:
+            table: Structured array with the predicate columns.
+
+        Returns:
+            Boolean mask with one entry per row.
+        """
+
+        return numpy.broadcast_to(self._function(table), table.shape).copy()
+
+    def __str__(self):
+        return self.source
+
+    def __reduce__(self):
+        return Expression, (self.source, self.names)
@@ -1,5 +1,14 @@
+import os
 import abc
+import bz2
+import gzip
+import lzma
+import types
+import typing
 import pathlib
+import contextlib
+
+import numpy
 
 from . import errors
 from . import _symbol
@@ -8,8 +17,119 @@ from . import _symbol
 class File(_symbol.Nonterminal, metaclass=abc.ABCMeta):
     """
     Represents generic MCNP files.
+
+    Files compressed with gzip, xz, or bzip2 are detected by their magic
+    bytes and decompressed incrementally while reading.
     """
 
+    # Compression modules by magic bytes and by file suffix.
+    _MAGIC: typing.Final[tuple[tuple[bytes, types.ModuleType]]] = ((b'\x1f\x8b', gzip), (b'\xfd7zXZ\x00', lzma), (b'BZh', bz2))
+    _SUFFIXES: typing.Final[dict[str, types.ModuleType]] = {'.gz': gzip, '.xz': lzma, '.bz2': bz2}
+    _COMPRESSIONS: typing.Final[dict[str, types.ModuleType]] = {'gz': gzip, 'xz': lzma, 'bz2': bz2}
+
+    @staticmethod
+    def _compression(filename: pathlib.Path) -> types.ModuleType:
+        """
+        Detects the compression of files from their magic bytes.
+
+        Parameters:
+            filename: File path.
+
+        Returns:
+            `gzip`, `lzma`, or `bz2`, or `None` if the file is not compressed.
+        """
+
+        with open(filename, 'rb') as file:
+            head = file.read(10)
+
+        for magic, module in File._MAGIC:
+            # Bzip2 streams follow their block size digit with the block magic.
+            if head.startswith(magic) and (module is not bz2 or head[3:4].isdigit() and head[4:10] == b'1AY&SY'):
+                return module
+
+        return None
+
+    @staticmethod
+    def _decompress(filename: pathlib.Path, mode: str = 'r') -> typing.IO:
+        """
+        Opens files for reading, decompressing them incrementally.
+
+        Parameters:
+            filename: File path.
+            mode: `r` for text or `rb` for bytes.
+
+        Returns:
+            File object.
+        """
+
+        module = File._compression(filename)
+
+        if module is None:
+            return open(filename, mode)
+
+        return module.open(filename, mode if 'b' in mode else 'rt')
+
+    @staticmethod
+    def _compress(filename: pathlib.Path, compression: str = None) -> typing.TextIO:
+        """
+        Opens files for writing text, compressing it incrementally.
+
+        Parameters:
+            filename: File path.
+            compression: `gz`, `xz`, or `bz2`, or `None` to follow the file suffix.
+
+        Returns:
+            File object.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        filename = pathlib.Path(filename)
+
+        if compression is not None and compression not in File._COMPRESSIONS:
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, compression)
+
+        module = File._COMPRESSIONS[compression] if compression is not None else File._SUFFIXES.get(filename.suffix.lower())
+
+        if module is None:
+            return open(filename, 'w')
+
+        return module.open(filename, 'wt')
+
+    @staticmethod
+    def _write_sidecar(sidecar: pathlib.Path, **arrays) -> bool:
+        """
+        Writes NumPy sidecars next to files when the directory allows it.
+
+        Sidecars are caches, so read-only or shared directories leave them
+        unwritten instead of failing the read they accompany. Arrays go to a
+        temporary file renamed into place, so readers never see partial
+        sidecars.
+
+        Parameters:
+            sidecar: Sidecar file path.
+            arrays: Arrays to save by name.
+
+        Returns:
+            `True` if the sidecar was written.
+        """
+
+        partial = sidecar.with_name(f'{sidecar.name}.{os.getpid()}.tmp')
+
+        try:
+            with open(partial, 'wb') as file:
+                numpy.savez(file, **arrays)
+
+            os.replace(partial, sidecar)
+        except OSError:
+            with contextlib.suppress(OSError):
+                partial.unlink(missing_ok=True)
+
+            return False
+
+        return True
+
     @classmethod
     def from_file(cls, filename: pathlib.Path | str):
         """
@@ -27,17 +147,22 @@ class File(_symbol.Nonterminal, metaclass=abc.ABCMeta):
         if not filename.is_file():
             raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
 
-        source = filename.read_text()
+        with File._decompress(filename) as file:
+            source = file.read()
 
         return cls.from_mcnp(source)
 
-    def to_file(self, filename: str | pathlib.Path):
+    def to_file(self, filename: str | pathlib.Path, compression: str = None):
         """
         Generates MCNP files from `McnpFile`.
 
         Parameters:
             filename: new MCNP file path.
+            compression: `gz`, `xz`, or `bz2`, or `None` to follow the file suffix.
+
+        Raises:
+            CliError: RUNTIME_DOER.
         """
 
-        filename = pathlib.Path(filename)
-        filename.write_text(self.to_mcnp())
+        with File._compress(filename, compression) as file:
+            file.write(self.to_mcnp())
@@ -2,6 +2,8 @@ from __future__ import annotations
 import re
 import typing
 
+import numpy
+
 from . import _block
 from .. import types
 from .. import errors
@@ -11,6 +13,9 @@ class Header(_block.Block):
     """
     Represents MESHTAL header blocks.
 
+    Rectangular meshes have x, y, and z bins, and cylindrical meshes have r,
+    z, and theta bins along with their origin and axis.
+
     Attributes:
         code: Simulation name.
         version: Simulation version.
@@ -25,11 +30,15 @@ class Header(_block.Block):
         bins_z: Mesh tally z-direction bins.
         bins_energy: Mesh tally energy bins.
         bins_time: Mesh tally time bins.
+        bins_r: Mesh tally radial bins.
+        bins_theta: Mesh tally azimuthal bins in revolutions.
+        origin: Cylindrical mesh origin.
+        axis: Cylindrical mesh axis.
         columns: Tallies heading.
     """
 
     _REGEX = re.compile(
-        r'\A(.{7})version (.{6})ld=(.{10})probid =(.{20})\n\s([^\n]+)\n\sNumber of histories used for normalizing tallies =(.{17})\n\n\sMesh Tally Number(.{10})\n\s(.{8}) mesh tally[.]\n\n Tally bin boundaries:\n((?:    .+\n)+)\n(.+)\n\Z',
+        r'\A(.{7})version (.{6})ld=(.{10})probid =(.{20})\n\s([^\n]+)\n\sNumber of histories used for normalizing tallies =(.{17})\n\n\sMesh Tally Number(.{10})\n\s(.{8}) mesh tally[.]\n\n Tally bin boundaries:\n((?:  .+\n)+)\n(.+)\n\Z',
         re.IGNORECASE,
     )
 
@@ -49,6 +58,10 @@ class Header(_block.Block):
         bins_z: types.String = None,
         bins_energy: types.String = None,
         bins_time: types.String = None,
+        bins_r: types.String = None,
+        bins_theta: types.String = None,
+        origin: types.String = None,
+        axis: types.String = None,
     ):
         """
         Initializes `Header`.
@@ -67,6 +80,10 @@ class Header(_block.Block):
             bins_z: Mesh tally z-direction bins.
             bins_energy: Mesh tally energy bins.
             bins_time: Mesh tally time bins.
+            bins_r: Mesh tally radial bins.
+            bins_theta: Mesh tally azimuthal bins in revolutions.
+            origin: Cylindrical mesh origin.
+            axis: Cylindrical mesh axis.
             columns: Tallies heading.
 
         Raises:
@@ -113,6 +130,10 @@ class Header(_block.Block):
         self.bins_z: typing.Final[types.String] = bins_z
         self.bins_energy: typing.Final[types.String] = bins_energy
         self.bins_time: typing.Final[types.String] = bins_time
+        self.bins_r: typing.Final[types.String] = bins_r
+        self.bins_theta: typing.Final[types.String] = bins_theta
+        self.origin: typing.Final[types.String] = origin
+        self.axis: typing.Final[types.String] = axis
         self.columns: typing.Final[types.String] = columns
 
     @staticmethod
@@ -149,6 +170,8 @@ class Header(_block.Block):
         bins_z = None
         bins_energy = None
         bins_time = None
+        bins_r = None
+        bins_theta = None
         for match in re.findall(r'\s+([^\n:]+):([^\n]+)(?:\n|\Z)', tokens[9]):
             if match[0] == 'X direction':
                 bins_x = match[1]
@@ -160,9 +183,18 @@ class Header(_block.Block):
                 bins_energy = match[1]
             elif match[0] == 'Time bin boundaries':
                 bins_time = match[1]
+            elif match[0] == 'R direction':
+                bins_r = match[1]
+            elif match[0].startswith('Theta direction'):
+                bins_theta = match[1]
             else:
                 raise errors.MeshtalError(errors.MeshtalCode.SYNTAX_BLOCK, source)
 
+        # Cylindrical meshes start their bins with a line without colons.
+        cylinder = re.search(r'origin at([^\n,]+), axis in([^\n]+) direction', tokens[9])
+        origin = cylinder[1] if cylinder else None
+        axis = cylinder[2] if cylinder else None
+
         columns = types.String.from_mcnp(tokens[10])
 
         return Header(
@@ -180,8 +212,29 @@ class Header(_block.Block):
             bins_z=bins_z,
             bins_energy=bins_energy,
             bins_time=bins_time,
+            bins_r=bins_r,
+            bins_theta=bins_theta,
+            origin=origin,
+            axis=axis,
         )
 
+    def to_edges(self) -> tuple[numpy.ndarray]:
+        """
+        Generates bin boundary arrays from `Header`.
+
+        Returns:
+            Energy, time, x, y, and z bin boundaries for rectangular meshes,
+            or energy, time, r, z, and theta bin boundaries for cylindrical
+            meshes, with `None` for missing bins.
+        """
+
+        if self.bins_r:
+            bins = (self.bins_energy, self.bins_time, self.bins_r, self.bins_z, self.bins_theta)
+        else:
+            bins = (self.bins_energy, self.bins_time, self.bins_x, self.bins_y, self.bins_z)
+
+        return tuple(numpy.array(str(values).split(), dtype=numpy.float64) if values else None for values in bins)
+
     def to_mcnp(self):
         """
         Generates MESTHAL from `Header`.
@@ -191,9 +244,12 @@ class Header(_block.Block):
         """
 
         bins = ''
+        bins += f'  Cylinder origin at{self.origin}, axis in{self.axis} direction\n' if self.origin else ''
+        bins += f'    R direction:{"".join(map(str, self.bins_r))}\n' if self.bins_r else ''
         bins += f'    X direction:{"".join(map(str, self.bins_x))}\n' if self.bins_x else ''
         bins += f'    Y direction:{"".join(map(str, self.bins_y))}\n' if self.bins_y else ''
         bins += f'    Z direction:{"".join(map(str, self.bins_z))}\n' if self.bins_z else ''
+        bins += f'    Theta direction (revolutions):{"".join(map(str, self.bins_theta))}\n' if self.bins_theta else ''
         bins += f'    Time bin boundaries:{"".join(map(str, self.bins_time))}\n' if self.bins_time else ''
         bins += f'    Energy bin boundaries:{"".join(map(str, self.bins_energy))}\n' if self.bins_energy else ''
 
@@ -0,0 +1,69 @@
+import re
+import typing
+
+from . import _block
+from .. import types
+from .. import errors
+
+
+class Raw(_block.Block):
+    """
+    Represents OUTP blocks without parsers.
+
+    Attributes:
+        text: Block text.
+    """
+
+    _REGEX = re.compile(r'\A(1[\s\S]*)\Z')
+
+    def __init__(
+        self,
+        text: types.String,
+    ):
+        """
+        Initializes `Raw`.
+
+        Parameters:
+            text: Block text.
+
+        Raises:
+            OutpError: SEMANTICS_TABLE.
+        """
+
+        if text is None:
+            raise errors.OutpError(errors.OutpCode.SEMANTICS_TABLE, text)
+
+        self.text: typing.Final[types.String] = text
+
+    @staticmethod
+    def from_mcnp(source: str):
+        """
+        Generates `Raw` from OUTP.
+
+        Parameters:
+            source: OUTP for `Raw`.
+
+        Returns:
+            `Raw`.
+        """
+
+        tokens = Raw._REGEX.match(source)
+
+        if not tokens:
+            raise errors.OutpError(errors.OutpCode.SYNTAX_TABLE, source)
+
+        text = types.String.from_mcnp(tokens[1])
+
+        return Raw(
+            text,
+        )
+
+    def to_mcnp(self):
+        """
+        Generates OUTP from `Raw`.
+
+        Returns:
+            OUTP for `Raw`.
+        """
+
+        return self.text.to_mcnp()
@@ -5,6 +5,7 @@ from .NeutronActivity import NeutronActivity
 from .PhotonActivity import PhotonActivity
 from .AnalysisTallyFluctuation import AnalysisTallyFluctuation
 from .ProblemSummary import ProblemSummary
+from .Raw import Raw
 from .StartingMcrun import StartingMcrun
 from . import tally
 from .Tally_1A import Tally_1A
@@ -23,6 +24,7 @@ __all__ = [
     'PhotonActivity',
     'AnalysisTallyFluctuation',
     'ProblemSummary',
+    'Raw',
     'StartingMcrun',
     'tally',
     'Tally_1A',
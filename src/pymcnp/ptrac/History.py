@@ -44,12 +44,13 @@ class History(_symbol.Nonterminal):
         self.events: typing.Final[types.Tuple(history.Event)] = events
 
     @staticmethod
-    def from_mcnp(source: str):
+    def from_mcnp(source: str, decoder=None):
         """
         Generates `History` from PTRAC.
 
         Parameters:
             source: PTRAC for `History`.
+            decoder: `Decoder` compiled from the PTRAC header.
 
         Returns:
             `History`.
@@ -58,6 +59,9 @@ class History(_symbol.Nonterminal):
             PtracError: SYNTAX_BLOCK.
         """
 
+        if decoder is not None:
+            return decoder.to_history(source)
+
         tokens = History._REGEX.match(source)
 
         if not tokens:
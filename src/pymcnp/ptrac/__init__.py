@@ -5,6 +5,9 @@ from . import header
 from .Header import Header
 from . import history
 from .History import History
+from ._decoder import Decoder
+from ._binary import Binary
+from ._spatial import Spatial
 
 __all__ = [
     'Block',
@@ -14,4 +17,7 @@ __all__ = [
     'Header',
     'history',
     'History',
+    'Decoder',
+    'Binary',
+    'Spatial',
 ]
@@ -0,0 +1,490 @@
+import mmap
+import struct
+import typing
+import pathlib
+
+import numpy
+
+from . import header
+from .Header import Header
+from .History import History
+from ._decoder import Decoder
+from .. import types
+from .. import errors
+from .. import _file
+
+
+class Binary:
+    """
+    Represents binary PTRAC files.
+
+    `Binary` reads PTRAC files written with `file=bin`, which MCNP writes as
+    unformatted sequential Fortran records framed by 4-byte length markers.
+    The file is memory-mapped and events are exposed as NumPy views over the
+    map, so records are only copied when they are gathered into tables.
+    Compressed files are decompressed into memory instead. `Binary` is a
+    context manager, which closes the map on exit.
+
+    The header records hold the `-1` marker, the code line, the title, the
+    v-line reals, the 20 n-line integers, and the l-line integers. Every
+    history then holds one I-line record of integers followed by one record
+    of reals per event holding its j-line and p-line variables. The size of
+    integers follows the `-1` marker record, and the size of reals follows
+    the n-line `n13` entry.
+
+    Attributes:
+        filename: PTRAC file path.
+        header: PTRAC header.
+        decoder: PTRAC decoder for the header layouts.
+        buffer: Memory map or decompressed bytes of the file.
+        order: NumPy byte order of the file.
+        integer: NumPy dtype of integer records.
+        real: NumPy dtype of real records.
+        offset: Byte offset of the first history record.
+    """
+
+    def __init__(self, filename: str | pathlib.Path):
+        """
+        Initializes `Binary`.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Raises:
+            CliError: RUNTIME_PATH.
+            PtracError: SYNTAX_FILE.
+        """
+
+        filename = pathlib.Path(filename)
+
+        if not filename.is_file():
+            raise errors.CliError(errors.CliCode.RUNTIME_PATH, filename)
+
+        order = Binary._byteorder(filename)
+
+        if order is None:
+            raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, filename)
+
+        if _file.File._compression(filename) is None:
+            with open(filename, 'rb') as file:
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            with _file.File._decompress(filename, 'rb') as file:
+                buffer = file.read()
+
+        self.filename: typing.Final[pathlib.Path] = filename
+        self.buffer: typing.Final[mmap.mmap | bytes] = buffer
+        self.order: typing.Final[str] = order
+
+        try:
+            self._read_header()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_header(self):
+        """
+        Reads the header records of binary PTRAC files.
+
+        Raises:
+            PtracError: SYNTAX_FILE.
+        """
+
+        filename = self.filename
+        order = self.order
+        buffer = self.buffer
+        records = self._records(0)
+
+        try:
+            marker = next(records)
+            code = next(records)
+            title = next(records)
+            v_record = next(records)
+            n_record = next(records)
+        except StopIteration:
+            raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, filename)
+
+        self.integer = numpy.dtype(f'{order}i{marker[1]}')
+        n_values = self.view(n_record, self.integer)
+
+        if len(n_values) != 20 or self.view(marker, self.integer)[0] != -1:
+            raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, filename)
+
+        self.real = numpy.dtype(f'{order}f{int(n_values[12]) or 8}')
+
+        # L-line identifiers may span several records.
+        count = int(n_values[:11].sum())
+        l_values = []
+        while len(l_values) < count:
+            try:
+                l_values.extend(self.view(next(records), self.integer).tolist())
+            except StopIteration:
+                raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, filename)
+
+        line = self.text(code).ljust(60)
+
+        self.header = Header(
+            types.String(line[:8]),
+            types.String(line[8:33]),
+            types.String(line[33:42]),
+            types.String(line[42:60]),
+            types.String(self.text(title).ljust(80)),
+            header.V(types.Tuple(types.Real)([types.Real.from_mcnp(f'{v:.4E}') for v in self.view(v_record, self.real)])),
+            header.N(*[types.Integer(int(n)) for n in n_values]),
+            header.L(types.Tuple(types.Integer)([types.Integer(int(identifier)) for identifier in l_values])),
+        )
+        self.decoder = Decoder(self.header)
+        self.offset = next(records, (len(buffer) + 4, 0))[0] - 4
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Closes the memory map of binary PTRAC files.
+        """
+
+        if isinstance(self.buffer, mmap.mmap) and not self.buffer.closed:
+            try:
+                self.buffer.close()
+            except BufferError:
+                # Views still referenced, for example by a traceback, keep the
+                # map open until they are collected.
+                pass
+
+    @staticmethod
+    def _byteorder(filename: pathlib.Path) -> str:
+        """
+        Detects the byte order of binary PTRAC files from the first marker.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            NumPy byte order character, or `None` if the file is not binary.
+        """
+
+        with _file.File._decompress(filename, 'rb') as file:
+            marker = file.read(4)
+
+        if len(marker) < 4:
+            return None
+
+        for order in '<>':
+            if struct.unpack(f'{order}i', marker)[0] in {4, 8}:
+                return order
+
+        return None
+
+    @staticmethod
+    def is_binary(filename: str | pathlib.Path) -> bool:
+        """
+        Checks whether PTRAC files are binary.
+
+        Parameters:
+            filename: PTRAC file path.
+
+        Returns:
+            `True` if the file starts with a Fortran record marker.
+        """
+
+        filename = pathlib.Path(filename)
+
+        return filename.is_file() and Binary._byteorder(filename) is not None
+
+    def _records(self, offset: int) -> typing.Generator[tuple[int, int], None, None]:
+        """
+        Walks Fortran record markers from a byte offset.
+
+        Parameters:
+            offset: Byte offset of a leading record marker.
+
+        Yields:
+            Byte offset and length of every record payload.
+
+        Raises:
+            PtracError: SYNTAX_FILE.
+        """
+
+        marker = struct.Struct(f'{self.order}i')
+        end = len(self.buffer)
+
+        while offset < end:
+            if offset + 4 > end:
+                raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, self.filename)
+
+            length = marker.unpack_from(self.buffer, offset)[0]
+            start = offset + 4
+            offset = start + length + 4
+
+            if length < 0 or offset > end:
+                raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, self.filename)
+
+            # Leading and trailing markers disagree when the record layout is not the one assumed.
+            if marker.unpack_from(self.buffer, offset - 4)[0] != length:
+                raise errors.PtracError(errors.PtracCode.SYNTAX_FILE, self.filename)
+
+            yield start, length
+
+    def view(self, record: tuple[int, int], dtype: numpy.dtype) -> numpy.ndarray:
+        """
+        Exposes a record payload as a NumPy view over the map.
+
+        Parameters:
+            record: Byte offset and length of the record payload.
+            dtype: NumPy dtype of the record values.
+
+        Returns:
+            Read-only array sharing memory with the map.
+        """
+
+        start, length = record
+
+        return numpy.frombuffer(self.buffer, dtype=dtype, count=length // dtype.itemsize, offset=start)
+
+    def text(self, record: tuple[int, int]) -> str:
+        """
+        Decodes a character record.
+
+        Parameters:
+            record: Byte offset and length of the record payload.
+
+        Returns:
+            Record characters.
+        """
+
+        start, length = record
+
+        return self.buffer[start : start + length].decode('latin-1')
+
+    def iter_events(self, offset: int = None) -> typing.Generator[tuple[int, int, tuple[int, int], tuple[int, int]], None, None]:
+        """
+        Walks the records of every event.
+
+        Parameters:
+            offset: Byte offset of the I-line record to start from.
+
+        Yields:
+            History index, event type, I-line record, and event record.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        j_next = {kind: j_layout.index(7) for kind, (j_layout, _) in self.decoder.layouts.items() if 7 in j_layout}
+        i_type = self.decoder.i_layout.index(2)
+        sizes = {kind: (len(j_layout) + len(p_layout)) * self.real.itemsize for kind, (j_layout, p_layout) in self.decoder.layouts.items()}
+        real = struct.Struct(f'{self.order}{"d" if self.real.itemsize == 8 else "f"}')
+
+        index = -1
+        i_record = None
+        kind = None
+
+        for record in self._records(self.offset if offset is None else offset):
+            if kind is None:
+                i_record = record
+                i_values = self.view(record, self.integer)
+
+                if len(i_values) != len(self.decoder.i_layout):
+                    raise errors.PtracError(errors.PtracCode.SYNTAX_BLOCK, i_values.tolist())
+
+                index += 1
+                kind = int(i_values[i_type])
+                continue
+
+            group = abs(kind) // 1000
+
+            if record[1] != sizes.get(group) or group not in j_next:
+                raise errors.PtracError(errors.PtracCode.SYNTAX_BLOCK, self.view(record, self.real).tolist())
+
+            yield index, kind, i_record, record
+
+            kind = int(real.unpack_from(self.buffer, record[0] + j_next[group] * self.real.itemsize)[0])
+
+            if kind == Decoder.FLAG:
+                kind = None
+
+        if kind is not None:
+            raise errors.PtracError(errors.PtracCode.SYNTAX_BLOCK, self.view(i_record, self.integer).tolist())
+
+    def _to_source(self, i_values: numpy.ndarray, events: list[tuple[int, numpy.ndarray]]) -> str:
+        """
+        Formats history records as PTRAC.
+
+        Parameters:
+            i_values: I-line values.
+            events: Event type and values of every event.
+
+        Returns:
+            PTRAC for `History`.
+        """
+
+        def integer(value, width):
+            return f'{int(value):>{width}}' if float(value).is_integer() else f'{float(value):>{width}.{width - 7}E}'
+
+        lines = [' ' + ''.join(integer(value, 13 if variable == 6 else 10) for variable, value in zip(self.decoder.i_layout, i_values))]
+
+        for kind, values in events:
+            j_layout, p_layout = self.decoder.layouts[abs(kind) // 1000]
+            lines.append(' ' + ''.join(integer(value, 10) for value in values[: len(j_layout)]))
+            lines.append(' ' + ''.join(f'{float(value):>13.5E}' for value in values[len(j_layout) :]))
+
+        return '\n'.join(lines) + '\n'
+
+    def iter_blocks(self, offset: int = None) -> typing.Generator[str, None, None]:
+        """
+        Generates PTRAC history blocks from binary PTRAC one at a time.
+
+        Parameters:
+            offset: Byte offset of the I-line record to start from.
+
+        Yields:
+            PTRAC for `History`.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        current = 0
+        i_values = None
+        events = []
+
+        for index, kind, i_record, record in self.iter_events(offset):
+            if index != current:
+                yield self._to_source(i_values, events)
+                current = index
+                events = []
+
+            i_values = self.view(i_record, self.integer)
+            events.append((kind, self.view(record, self.real)))
+
+        if events:
+            yield self._to_source(i_values, events)
+
+    def iter_histories(self, offset: int = None) -> typing.Generator[History, None, None]:
+        """
+        Generates `History` from binary PTRAC one at a time.
+
+        Parameters:
+            offset: Byte offset of the I-line record to start from.
+
+        Yields:
+            `History`.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        for block in self.iter_blocks(offset):
+            yield self.decoder.to_history(block)
+
+    def to_arrays(self, starts: list[int], histories: list[int], kinds: list[int], nps: list[int]) -> numpy.ndarray:
+        """
+        Gathers event records into NumPy structured arrays.
+
+        Parameters:
+            starts: Byte offset of every event record.
+            histories: History index of every event.
+            kinds: Event type of every event.
+            nps: NPS of every history.
+
+        Returns:
+            Structured array with one row per event and `Decoder.DTYPE` fields.
+        """
+
+        table = numpy.zeros(len(starts), dtype=Decoder.DTYPE)
+        for name in ('x', 'y', 'z', 'u', 'v', 'w', 'erg', 'wgt', 'tme'):
+            table[name] = numpy.nan
+
+        if not starts:
+            return table
+
+        starts = numpy.array(starts, dtype=numpy.int64)
+        types = numpy.array(kinds, dtype=numpy.int32)
+        groups = numpy.abs(types) // 1000
+        raw = numpy.frombuffer(self.buffer, dtype=numpy.uint8)
+
+        table['nps'] = numpy.array(nps, dtype=numpy.int64)[histories]
+        table['event_type'] = types
+
+        for kind, (j_layout, p_layout) in self.decoder.layouts.items():
+            mask = groups == kind
+
+            if not mask.any():
+                continue
+
+            layout = j_layout + p_layout
+            width = len(layout) * self.real.itemsize
+            rows = raw[starts[mask, None] + numpy.arange(width)].view(self.real)
+
+            for column, variable in enumerate(layout):
+                if variable in Decoder.FIELDS and variable not in {1, 2}:
+                    table[Decoder.FIELDS[variable]][mask] = rows[:, column]
+
+        return table
+
+    def iter_arrays(self, size: int = 100000) -> typing.Generator[numpy.ndarray, None, None]:
+        """
+        Generates NumPy structured arrays from binary PTRAC in chunks.
+
+        Chunks hold whole histories and at least `size` events, except the
+        last one.
+
+        Parameters:
+            size: Minimum number of events per chunk.
+
+        Yields:
+            Structured arrays with `Decoder.DTYPE` fields.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        nps_index = self.decoder.i_layout.index(1)
+        starts, histories, kinds, nps = [], [], [], []
+        current = None
+        base = 0
+
+        for index, kind, i_record, (start, _) in self.iter_events():
+            if index != current:
+                if len(starts) >= size:
+                    yield self.to_arrays(starts, histories, kinds, nps)
+                    starts, histories, kinds, nps = [], [], [], []
+                    base = index
+
+                current = index
+                nps.append(int(self.view(i_record, self.integer)[nps_index]))
+
+            starts.append(start)
+            histories.append(index - base)
+            kinds.append(kind)
+
+        if starts:
+            yield self.to_arrays(starts, histories, kinds, nps)
+
+    def to_index(self) -> numpy.ndarray:
+        """
+        Generates history indexes from binary PTRAC.
+
+        Returns:
+            Structured array with one row per history, holding its NPS, the
+            byte offset of its I-line record marker, its length in bytes, and
+            its first event type.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        nps_index = self.decoder.i_layout.index(1)
+        rows = []
+
+        for index, kind, i_record, (start, length) in self.iter_events():
+            if index == len(rows):
+                rows.append([int(self.view(i_record, self.integer)[nps_index]), i_record[0] - 4, 0, kind])
+
+            rows[-1][2] = start + length + 4 - rows[-1][1]
+
+        return numpy.array([tuple(row) for row in rows], dtype=Decoder.INDEX)
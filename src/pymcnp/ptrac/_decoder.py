@@ -0,0 +1,488 @@
+import typing
+import inspect
+
+import numpy
+
+from . import history
+from .History import History
+from .. import types
+from .. import errors
+
+
+class Decoder:
+    """
+    Represents PTRAC decoders compiled from header blocks.
+
+    `Decoder` maps every event kind to the variables the header n-line and
+    l-line declare for it. It decodes history blocks either into AST objects,
+    dispatching each event to its j-line and p-line form by event type, or
+    straight from their fixed-width columns into NumPy structured arrays.
+
+    Attributes:
+        header: PTRAC header.
+        i_layout: Variable identifiers on the I line.
+        layouts: Variable identifiers on the j-line and p-line by event kind.
+        variations: J-line and p-line forms by event kind.
+    """
+
+    DTYPE: typing.Final[numpy.dtype] = numpy.dtype(
+        [
+            ('nps', numpy.int64),
+            ('event_type', numpy.int32),
+            ('next_type', numpy.int32),
+            ('cell', numpy.int32),
+            ('material', numpy.int32),
+            ('surface', numpy.float64),
+            ('x', numpy.float64),
+            ('y', numpy.float64),
+            ('z', numpy.float64),
+            ('u', numpy.float64),
+            ('v', numpy.float64),
+            ('w', numpy.float64),
+            ('erg', numpy.float64),
+            ('wgt', numpy.float64),
+            ('tme', numpy.float64),
+        ]
+    )
+
+    # History index rows locate history blocks in PTRAC files.
+    INDEX: typing.Final[numpy.dtype] = numpy.dtype(
+        [
+            ('nps', numpy.int64),
+            ('offset', numpy.int64),
+            ('length', numpy.int64),
+            ('event_type', numpy.int32),
+        ]
+    )
+
+    # MCNP PTRAC variable identifiers mapped to `DTYPE` fields.
+    FIELDS: typing.Final[dict[int, str]] = {
+        1: 'nps',
+        2: 'event_type',
+        7: 'next_type',
+        12: 'surface',
+        17: 'cell',
+        18: 'material',
+        20: 'x',
+        21: 'y',
+        22: 'z',
+        23: 'u',
+        24: 'v',
+        25: 'w',
+        26: 'erg',
+        27: 'wgt',
+        28: 'tme',
+    }
+
+    # Event kinds are the thousands digit of event types.
+    SOURCE: typing.Final[int] = 1
+    BANK: typing.Final[int] = 2
+    SURFACE: typing.Final[int] = 3
+    COLLISION: typing.Final[int] = 4
+    TERMINAL: typing.Final[int] = 5
+    FLAG: typing.Final[int] = int(history.event.j.EventType.FLAG.value)
+
+    def __init__(self, header):
+        """
+        Initializes `Decoder`.
+
+        Parameters:
+            header: PTRAC header.
+
+        Raises:
+            PtracError: SEMANTICS_BLOCK.
+        """
+
+        if header is None:
+            raise errors.PtracError(errors.PtracCode.SEMANTICS_BLOCK, header)
+
+        n = header.n_line
+        counts = [n.n1, n.n2, n.n3, n.n4, n.n5, n.n6, n.n7, n.n8, n.n9, n.n10, n.n11]
+        counts = [count.value for count in counts]
+        ids = [variable.value for variable in header.l_line.variables]
+
+        if len(ids) != sum(counts):
+            raise errors.PtracError(errors.PtracCode.SEMANTICS_BLOCK, header)
+
+        start = counts[0]
+        layouts = {}
+        for kind in range(self.SOURCE, self.TERMINAL + 1):
+            j_count, p_count = counts[2 * kind - 1], counts[2 * kind]
+            layouts[kind] = (tuple(ids[start : start + j_count]), tuple(ids[start + j_count : start + j_count + p_count]))
+            start += j_count + p_count
+
+        variations = {}
+        for kind, (j_layout, p_layout) in layouts.items():
+            variations[kind] = (self._j_variation(kind, j_layout), self._p_variation(p_layout))
+
+        self.header: typing.Final = header
+        self.i_layout: typing.Final[tuple[int]] = tuple(ids[: counts[0]])
+        self.layouts: typing.Final[dict[int, tuple[tuple[int], tuple[int]]]] = layouts
+        self.variations: typing.Final[dict[int, tuple[type, type]]] = variations
+
+    @staticmethod
+    def _j_variation(kind: int, layout: tuple[int]) -> type:
+        """
+        Chooses the j-line form for an event kind layout.
+
+        Parameters:
+            kind: Event kind.
+            layout: Variable identifiers on the j-line.
+
+        Returns:
+            J-line form, or `None` if no form matches the layout.
+        """
+
+        # Forms alternate source/other and add IPT (16) and NCP (19).
+        variation = [
+            history.event.J_0,
+            history.event.J_1,
+            history.event.J_2,
+            history.event.J_3,
+            history.event.J_4,
+            history.event.J_5,
+            history.event.J_6,
+            history.event.J_7,
+        ][(kind != Decoder.SOURCE) + 2 * (16 in layout) + 4 * (19 in layout)]
+
+        if len(layout) != variation._REGEX.groups:
+            return None
+
+        return variation
+
+    @staticmethod
+    def _p_variation(layout: tuple[int]) -> type:
+        """
+        Chooses the p-line form for an event kind layout.
+
+        Parameters:
+            layout: Variable identifiers on the p-line.
+
+        Returns:
+            P-line form, or `None` if no form matches the layout.
+        """
+
+        for variation in [history.event.P_0, history.event.P_1]:
+            if len(layout) == variation._REGEX.groups:
+                return variation
+
+        return None
+
+    def to_event(self, kind: history.event.j.EventType, j_source: str, p_source: str) -> history.Event:
+        """
+        Generates `Event` from PTRAC using the layout of its event type.
+
+        Parameters:
+            kind: Event type.
+            j_source: PTRAC for the j-line.
+            p_source: PTRAC for the p-line.
+
+        Returns:
+            `Event`.
+
+        Raises:
+            PtracError: SYNTAX_LINE.
+        """
+
+        j_variation, p_variation = self.variations.get(abs(int(kind.value)) // 1000, (None, None))
+
+        if j_variation is None or p_variation is None:
+            return history.Event.from_mcnp(f'{j_source}\n{p_source}\n')
+
+        return history.Event(j_variation.from_mcnp(j_source), p_variation.from_mcnp(p_source))
+
+    def to_history(self, source: str) -> History:
+        """
+        Generates `History` from PTRAC using the header layouts.
+
+        Parameters:
+            source: PTRAC for `History`.
+
+        Returns:
+            `History`.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        lines = source.split('\n')
+
+        if lines[-1] == '':
+            lines.pop()
+
+        if len(lines) < 3 or len(lines) % 2 == 0:
+            raise errors.PtracError(errors.PtracCode.SYNTAX_BLOCK, source)
+
+        i_line = history.I.from_mcnp(lines[0])
+
+        def events():
+            kind = i_line.event_type
+
+            for j_source, p_source in zip(lines[1::2], lines[2::2]):
+                event = self.to_event(kind, j_source, p_source)
+                kind = event.j_line.next_type
+                yield event
+
+        return History(i_line, types.Generator(history.Event)(events()))
+
+    @staticmethod
+    def _columns(layout: tuple[int], widths: dict[int, int], default: int) -> dict[int, tuple[int, int]]:
+        """
+        Computes fixed-width column spans for a line layout.
+
+        Parameters:
+            layout: Variable identifiers on the line.
+            widths: Column widths by variable identifier.
+            default: Column width for other variables.
+
+        Returns:
+            Column span by variable identifier.
+        """
+
+        columns = {}
+        start = 1
+
+        for variable in layout:
+            width = widths.get(variable, default)
+            columns[variable] = (start, start + width)
+            start += width
+
+        return columns
+
+    @staticmethod
+    def _lines(raw: numpy.ndarray, starts: numpy.ndarray, ends: numpy.ndarray, width: int) -> numpy.ndarray:
+        """
+        Gathers lines into fixed-width byte tables with NumPy.
+
+        Parameters:
+            raw: PTRAC bytes, padded to hold `width` bytes after every line start.
+            starts: Line start offsets.
+            ends: Line end offsets.
+            width: Table width in bytes.
+
+        Returns:
+            Byte table with one row per line, padded with spaces.
+        """
+
+        table = numpy.lib.stride_tricks.sliding_window_view(raw, width)[starts]
+
+        short = numpy.flatnonzero(ends - starts < width)
+        table[short] = numpy.where(numpy.arange(width) < (ends - starts)[short, None], table[short], ord(' '))
+
+        return table
+
+    @staticmethod
+    def _parse(table: numpy.ndarray, columns: dict[int, tuple[int, int]], variables: typing.Iterable[int]) -> dict[int, numpy.ndarray]:
+        """
+        Parses fixed-width columns from byte tables with NumPy.
+
+        Parameters:
+            table: Byte table with one row per line.
+            columns: Column span by variable identifier.
+            variables: Variable identifiers to parse.
+
+        Returns:
+            Parsed column by variable identifier.
+
+        Raises:
+            PtracError: SYNTAX_LINE.
+        """
+
+        values = {}
+
+        try:
+            for variable in variables:
+                if variable not in columns:
+                    continue
+
+                start, stop = columns[variable]
+                field = numpy.ascontiguousarray(table[:, start:stop]).view(f'S{stop - start}')[:, 0]
+                values[variable] = field.astype(Decoder.DTYPE[Decoder.FIELDS[variable]])
+        except ValueError:
+            raise errors.PtracError(errors.PtracCode.SYNTAX_LINE, b'\n'.join(row.tobytes() for row in table[:4]).decode())
+
+        return values
+
+    def to_arrays(self, source: str | bytes) -> numpy.ndarray:
+        """
+        Generates NumPy structured arrays from PTRAC history blocks.
+
+        Finds lines, history boundaries, and event lines with NumPy over the
+        line start offsets, so only one Python step runs per history. J-lines
+        lead with the next event type, and histories end with the j-line
+        whose next event type is the end-of-history flag.
+
+        Parameters:
+            source: PTRAC for complete `History` blocks.
+
+        Returns:
+            Structured array with one row per event and `DTYPE` fields.
+
+        Raises:
+            PtracError: SYNTAX_BLOCK.
+        """
+
+        if isinstance(source, str):
+            source = source.encode()
+
+        table = numpy.zeros(0, dtype=self.DTYPE)
+        size = len(source)
+
+        # Padding lets every line gather its widest columns without bounds checks.
+        width = 1 + 13 * max(len(self.i_layout), *(len(j_layout) + len(p_layout) for j_layout, p_layout in self.layouts.values()))
+        raw = numpy.frombuffer(source + b' ' * width, dtype=numpy.uint8)
+
+        ends = numpy.flatnonzero(raw[:size] == ord('\n'))
+        if size and raw[size - 1] != ord('\n'):
+            ends = numpy.append(ends, size)
+        starts = numpy.concatenate(([0], ends[:-1] + 1)).astype(numpy.int64)
+
+        spans = {self._columns(j_layout, {}, 10)[7] for j_layout, _ in self.layouts.values() if 7 in j_layout}
+        i_columns = self._columns(self.i_layout, {6: 13}, 10)
+
+        if len(spans) != 1 or 1 not in i_columns or 2 not in i_columns:
+            raise errors.PtracError(errors.PtracCode.SYNTAX_BLOCK, source[:400].decode())
+
+        j_next = spans.pop()
+        heads = self._lines(raw, starts, ends, max(j_next[1], 11))
+
+        # Blank lines only separate histories, so only lines with blank heads need a full check.
+        lines = ~numpy.isin(heads, numpy.frombuffer(b' \t\r', dtype=numpy.uint8)).all(axis=1)
+        for line in numpy.flatnonzero(~lines):
+            lines[line] = bool(source[starts[line] : ends[line]].strip())
+
+        starts, ends, heads = starts[lines], ends[lines], heads[lines]
+
+        if not len(starts):
+            return table
+
+        def error(line):
+            return errors.PtracError(errors.PtracCode.SYNTAX_BLOCK, source[starts[line] : ends[min(line + 3, len(ends) - 1)]].decode())
+
+        fields = heads[:, j_next[0] : j_next[1]]
+        flags = numpy.flatnonzero((fields == numpy.frombuffer(f'{self.FLAG:>10}'.encode(), dtype=numpy.uint8)).all(axis=1))
+        # Histories start at the first line or two lines after a flag, and end
+        # at the first flag an odd number of lines after their I line.
+        heads = numpy.concatenate(([0], flags + 2))
+        heads = heads[heads < len(starts)]
+        tails = numpy.full(len(heads), -1)
+
+        for parity in (0, 1):
+            candidates = flags[flags % 2 == parity]
+            mask = (heads + 1) % 2 == parity
+            k = numpy.searchsorted(candidates, heads[mask] + 1)
+            tails[mask] = numpy.where(k < len(candidates), candidates[numpy.minimum(k, len(candidates) - 1)], -1) if len(candidates) else -1
+
+        tails = dict(zip(heads.tolist(), tails.tolist()))
+
+        count = len(starts)
+        i_lines = []
+        line = 0
+        while line < count:
+            last = tails[line]
+
+            if last < 0 or last + 1 >= count:
+                raise error(line)
+
+            i_lines.append(line)
+            line = last + 2
+
+        i_lines = numpy.array(i_lines)
+        counts = (numpy.append(i_lines[1:], line) - i_lines - 1) // 2
+        histories = numpy.repeat(numpy.arange(len(i_lines)), counts)
+        firsts = numpy.cumsum(counts) - counts
+        events = i_lines[histories] + 1 + 2 * (numpy.arange(counts.sum()) - firsts[histories])
+
+        i_width = max(i_columns[1][1], i_columns[2][1])
+        i_values = self._parse(self._lines(raw, starts[i_lines], ends[i_lines], i_width), i_columns, (1, 2))
+        nexts = self._parse(fields[events], {7: (0, 10)}, (7,))[7]
+
+        # Events have the type their predecessor announces as next.
+        types = numpy.concatenate(([0], nexts[:-1])).astype(numpy.int32)
+        types[firsts] = i_values[2]
+        kinds = numpy.abs(types) // 1000
+
+        unknown = numpy.flatnonzero(~numpy.isin(kinds, [kind for kind, (j_layout, _) in self.layouts.items() if 7 in j_layout]))
+
+        if len(unknown):
+            raise error(i_lines[histories[unknown[0]]])
+
+        table = numpy.zeros(len(events), dtype=self.DTYPE)
+        for name in ('x', 'y', 'z', 'u', 'v', 'w', 'erg', 'wgt', 'tme'):
+            table[name] = numpy.nan
+
+        table['nps'] = i_values[1][histories]
+        table['event_type'] = types
+        table['next_type'] = nexts
+
+        for kind, (j_layout, p_layout) in self.layouts.items():
+            mask = kinds == kind
+
+            if not mask.any():
+                continue
+
+            rows = events[mask]
+            j_columns = self._columns(j_layout, {}, 10)
+            p_columns = self._columns(p_layout, {}, 13)
+            j_width = max([j_columns[variable][1] for variable in (12, 17, 18) if variable in j_columns], default=0)
+            p_width = max([p_columns[variable][1] for variable in range(20, 29) if variable in p_columns], default=0)
+
+            j_values = self._parse(self._lines(raw, starts[rows], ends[rows], j_width), j_columns, (12, 17, 18))
+            p_values = self._parse(self._lines(raw, starts[rows + 1], ends[rows + 1], p_width), p_columns, range(20, 29))
+
+            for variable, values in (j_values | p_values).items():
+                table[self.FIELDS[variable]][mask] = values
+
+        return table
+
+    def from_histories(self, histories: typing.Iterable[History]) -> numpy.ndarray:
+        """
+        Generates NumPy structured arrays from `History`.
+
+        Reads the values of parsed j-lines and p-lines by their position in
+        the header layouts instead of formatting them back into PTRAC.
+
+        Parameters:
+            histories: PTRAC histories.
+
+        Returns:
+            Structured array with one row per event and `DTYPE` fields.
+        """
+
+        # Line forms take their values in layout order.
+        positions = {}
+        for kind, (j_layout, p_layout) in self.layouts.items():
+            j_variation, p_variation = self.variations[kind]
+
+            if j_variation is None or p_variation is None:
+                continue
+
+            j_names = list(inspect.signature(j_variation).parameters)
+            p_names = list(inspect.signature(p_variation).parameters)
+            fields = [('j_line', j_names[i], self.DTYPE.names.index(self.FIELDS[variable])) for i, variable in enumerate(j_layout) if variable in (12, 17, 18)]
+            fields += [('p_line', p_names[i], self.DTYPE.names.index(self.FIELDS[variable])) for i, variable in enumerate(p_layout) if variable in range(20, 29)]
+            positions[kind] = (j_variation, p_variation, fields)
+
+        empty = [0, 0, 0, 0, 0, 0.0] + [numpy.nan] * 9
+        rows = []
+
+        for block in histories:
+            nps = block.i_line.nps.value
+            kind = int(block.i_line.event_type.value)
+
+            for event in block.events:
+                row = empty.copy()
+                row[0] = nps
+                row[1] = kind
+                row[2] = int(event.j_line.next_type.value)
+
+                j_variation, p_variation, fields = positions.get(abs(kind) // 1000, (None, None, ()))
+
+                if type(event.j_line) is j_variation and type(event.p_line) is p_variation:
+                    for line, name, column in fields:
+                        row[column] = getattr(getattr(event, line), name).value
+
+                rows.append(tuple(row))
+                kind = row[2]
+
+        return numpy.array(rows, dtype=self.DTYPE)
@@ -0,0 +1,169 @@
+import typing
+
+import numpy
+import scipy.spatial
+
+from .. import errors
+
+
+class Spatial:
+    """
+    Represents spatial indexes over PTRAC event positions.
+
+    `Spatial` holds a `scipy.spatial.cKDTree` over the `x`, `y`, and `z`
+    positions of PTRAC events, together with the NPS of every event and its
+    index within its history, so region and neighbourhood queries return
+    events without parsing the file again. Events without positions are
+    left out.
+
+    Attributes:
+        nps: History NPS of every indexed event.
+        event: Index of every indexed event within its history.
+        tree: KD-tree over event positions.
+    """
+
+    # Query results identify events by history NPS and index within the history.
+    EVENT: typing.Final[numpy.dtype] = numpy.dtype(
+        [
+            ('nps', numpy.int64),
+            ('event', numpy.int64),
+        ]
+    )
+
+    def __init__(self, nps: numpy.ndarray, event: numpy.ndarray, points: numpy.ndarray):
+        """
+        Initializes `Spatial`.
+
+        Parameters:
+            nps: History NPS of every event.
+            event: Index of every event within its history.
+            points: Event positions with one row per event.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        points = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+
+        if len(nps) != len(points) or len(event) != len(points):
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, points)
+
+        self.nps: typing.Final[numpy.ndarray] = numpy.asarray(nps, dtype=numpy.int64)
+        self.event: typing.Final[numpy.ndarray] = numpy.asarray(event, dtype=numpy.int64)
+        self.tree: typing.Final[scipy.spatial.cKDTree] = scipy.spatial.cKDTree(points)
+
+    @staticmethod
+    def from_arrays(chunks: typing.Iterable[numpy.ndarray], where: typing.Callable = None):
+        """
+        Generates `Spatial` from NumPy structured arrays.
+
+        Parameters:
+            chunks: Structured arrays with `Decoder.DTYPE` fields holding whole histories.
+            where: Function returning boolean masks of the events to index.
+
+        Returns:
+            `Spatial`.
+        """
+
+        nps, event, points = [], [], []
+
+        for chunk in chunks:
+            # Events of one history are contiguous, so indexes restart at every NPS change.
+            starts = numpy.flatnonzero(numpy.r_[True, chunk['nps'][1:] != chunk['nps'][:-1]]) if len(chunk) else numpy.zeros(0, dtype=numpy.int64)
+            index = numpy.arange(len(chunk)) - numpy.repeat(starts, numpy.diff(numpy.r_[starts, len(chunk)]))
+            xyz = numpy.column_stack([chunk['x'], chunk['y'], chunk['z']])
+            mask = numpy.isfinite(xyz).all(axis=1)
+
+            if where is not None:
+                mask &= where(chunk)
+
+            nps.append(chunk['nps'][mask])
+            event.append(index[mask])
+            points.append(xyz[mask])
+
+        if not points:
+            return Spatial(numpy.zeros(0), numpy.zeros(0), numpy.zeros((0, 3)))
+
+        return Spatial(numpy.concatenate(nps), numpy.concatenate(event), numpy.concatenate(points))
+
+    def _events(self, rows: numpy.ndarray, order: bool = True) -> numpy.ndarray:
+        """
+        Generates query results from tree rows.
+
+        Parameters:
+            rows: Indexes into the tree data.
+            order: Sorts results by NPS and event index if true.
+
+        Returns:
+            Structured array with `EVENT` fields.
+        """
+
+        rows = numpy.asarray(rows, dtype=numpy.int64)
+        events = numpy.zeros(len(rows), dtype=self.EVENT)
+        events['nps'] = self.nps[rows]
+        events['event'] = self.event[rows]
+
+        return numpy.sort(events, order=['nps', 'event']) if order else events
+
+    def radius(self, point: typing.Iterable[float], r: float) -> numpy.ndarray:
+        """
+        Finds events within a distance of a point.
+
+        Parameters:
+            point: Query position.
+            r: Query radius.
+
+        Returns:
+            Structured array with `EVENT` fields.
+        """
+
+        return self._events(self.tree.query_ball_point(numpy.asarray(point, dtype=numpy.float64), r))
+
+    def box(self, lower: typing.Iterable[float], upper: typing.Iterable[float]) -> numpy.ndarray:
+        """
+        Finds events inside an axis-aligned box.
+
+        Parameters:
+            lower: Lower box corner.
+            upper: Upper box corner.
+
+        Returns:
+            Structured array with `EVENT` fields.
+
+        Raises:
+            CliError: RUNTIME_DOER.
+        """
+
+        lower = numpy.asarray(lower, dtype=numpy.float64)
+        upper = numpy.asarray(upper, dtype=numpy.float64)
+
+        if lower.shape != (3,) or upper.shape != (3,) or (upper < lower).any():
+            raise errors.CliError(errors.CliCode.RUNTIME_DOER, (lower, upper))
+
+        # Chebyshev balls are cubes, so the smallest cube around the box holds
+        # every candidate, and exact bounds trim the rest.
+        rows = numpy.asarray(self.tree.query_ball_point((lower + upper) / 2, (upper - lower).max() / 2, p=numpy.inf), dtype=numpy.int64)
+        points = self.tree.data[rows]
+
+        return self._events(rows[((points >= lower) & (points <= upper)).all(axis=1)])
+
+    def nearest(self, point: typing.Iterable[float], k: int = 1) -> numpy.ndarray:
+        """
+        Finds the events nearest to a point.
+
+        Parameters:
+            point: Query position.
+            k: Number of events.
+
+        Returns:
+            Structured array with `EVENT` fields, nearest first.
+        """
+
+        k = min(k, self.tree.n)
+
+        if k < 1:
+            return numpy.zeros(0, dtype=self.EVENT)
+
+        _, rows = self.tree.query(numpy.asarray(point, dtype=numpy.float64), k=[*range(1, k + 1)])
+
+        return self._events(rows, order=False)
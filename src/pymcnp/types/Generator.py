@@ -78,4 +78,27 @@ def Generator(element: typing.Type) -> object:
             self.value = value0
             return value1
 
+        def __reduce__(self):
+            return _rebuild, (element, tuple(self.__iter__()))
+
     return _Generator
+
+
+def _rebuild(element: typing.Type, value: tuple) -> object:
+    """
+    Rebuilds pickled generators.
+
+    Parameters:
+        element: Inner type.
+        value: Generator values.
+
+    Returns:
+        `_Generator` with inner type.
+    """
+
+    # Skips `__init__` since pickled values were validated when built.
+    cls = Generator(element)
+    rebuilt = cls.__new__(cls)
+    rebuilt.value = iter(value)
+
+    return rebuilt
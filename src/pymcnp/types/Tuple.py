@@ -81,4 +81,27 @@ def Tuple(element: typing.Type) -> object:
         def __contains__(self, item):
             return self.value.__contains__(item)
 
+        def __reduce__(self):
+            return _rebuild, (element, self.value)
+
     return _Tuple
+
+
+def _rebuild(element: typing.Type, value: tuple) -> object:
+    """
+    Rebuilds pickled tuples.
+
+    Parameters:
+        element: Inner type.
+        value: Tuple object.
+
+    Returns:
+        `_Tuple` with inner type.
+    """
+
+    # Skips `__init__` since pickled values were validated when built.
+    cls = Tuple(element)
+    rebuilt = cls.__new__(cls)
+    rebuilt.value = value
+
+    return rebuilt
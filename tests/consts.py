@@ -3,11 +3,18 @@ import pathlib
 import pymcnp
 
 
+class path:
+    INP = pathlib.Path(__file__).parent.parent / 'files' / 'inp' / 'valid_10.inp'
+    OUTP = pathlib.Path(__file__).parent.parent / 'files' / 'outp' / 'valid_38.outp'
+    PTRAC = pathlib.Path(__file__).parent.parent / 'files' / 'ptrac' / 'valid_27.ptrac'
+    MESHTAL = pathlib.Path(__file__).parent.parent / 'files' / 'meshtal' / 'valid_40.meshtal'
+
+
 class string:
-    INP = (pathlib.Path(__file__).parent.parent / 'files' / 'inp' / 'valid_10.inp').read_text()
-    OUTP = (pathlib.Path(__file__).parent.parent / 'files' / 'outp' / 'valid_38.outp').read_text()
-    PTRAC = (pathlib.Path(__file__).parent.parent / 'files' / 'ptrac' / 'valid_27.ptrac').read_text()
-    MESHTAL = (pathlib.Path(__file__).parent.parent / 'files' / 'meshtal' / 'valid_40.meshtal').read_text()
+    INP = path.INP.read_text()
+    OUTP = path.OUTP.read_text()
+    PTRAC = path.PTRAC.read_text()
+    MESHTAL = path.MESHTAL.read_text()
 
     class types:
         GEOMETRY = '1 (2:(+3 -4) #5)'
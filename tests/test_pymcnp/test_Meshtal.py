@@ -1,5 +1,11 @@
+import re
+import gzip
 import pathlib
 
+import numpy
+import pytest
+import pyvista
+
 import pymcnp
 from .. import consts
 from .. import classes
@@ -38,3 +44,356 @@ class Test_Meshtal:
         EXAMPLES_INVALID = [
             *(pathlib.Path(__file__).parent.parent.parent / 'files' / 'meshtal').glob('invalid*.meshtal'),
         ]
+
+    class Test_Arrays:
+        element = pymcnp.Meshtal
+        EXAMPLES_VALID = [
+            *(pathlib.Path(__file__).parent.parent.parent / 'files' / 'meshtal').glob('valid*.meshtal'),
+        ]
+
+        def test_valid(self):
+            """
+            Tests `EXAMPLES_VALID` on `to_arrays` against tally line coordinates.
+            """
+
+            for example in self.EXAMPLES_VALID:
+                a = self.element.from_file(example)
+                result, error = a.to_arrays()
+                edges = a.header.to_edges()
+                expected = numpy.full((2, *result.shape), numpy.nan)
+
+                for line in example.read_text().split('Rel Error\n')[1].splitlines():
+                    tokens = line.split()
+                    index = []
+
+                    for axis, value in enumerate(tokens[:-2][-5:] if len(tokens) == 7 else [None] * (7 - len(tokens)) + tokens[:-2]):
+                        if value is None:
+                            index.append(0)
+                        elif value == 'Total':
+                            index.append(result.shape[axis] - 1)
+                        elif axis < 2:
+                            index.append(int(numpy.argmin(numpy.abs(edges[axis][1:] - float(value)))))
+                        else:
+                            index.append(int(numpy.searchsorted(edges[axis], float(value))) - 1)
+
+                    expected[(slice(None), *index)] = float(tokens[-2]), float(tokens[-1])
+
+                assert numpy.array_equal(result, expected[0])
+                assert numpy.array_equal(error, expected[1])
+
+            a = self.element.from_file(consts.path.MESHTAL)
+            b = self.element(a.header, a.tallies)
+
+            for x, y in zip(a.to_arrays(), b.to_arrays()):
+                assert numpy.array_equal(x, y)
+
+        def test_invalid(self):
+            """
+            Tests missing tally lines on `to_arrays`.
+            """
+
+            source = consts.path.MESHTAL.read_text().rsplit('\n', 2)[0]
+
+            with pytest.raises(pymcnp.errors.MeshtalError):
+                self.element.from_mcnp(source).to_arrays()
+
+    class Test_Formats:
+        element = pymcnp.Meshtal
+        EXAMPLES_VALID = [
+            ('ij', 'X', 'Y', 'Z'),
+            ('ik', 'X', 'Z', 'Y'),
+            ('jk', 'Y', 'Z', 'X'),
+        ]
+
+        @staticmethod
+        def write_matrix(source: str, result: numpy.ndarray, error: numpy.ndarray, across: int, down: int) -> str:
+            """
+            Rewrites column-format MESHTAL as matrix-format MESHTAL.
+            """
+
+            names = 'XYZ'
+            fixed = 3 - across - down
+            header = source[: source.index('\n\n', source.index('Tally bin boundaries:')) + 2]
+            result = numpy.moveaxis(result, (2 + fixed, 2 + down, 2 + across), (2, 3, 4))
+            error = numpy.moveaxis(error, (2 + fixed, 2 + down, 2 + across), (2, 3, 4))
+            lines = []
+
+            for e in range(result.shape[0]):
+                for t in range(result.shape[1]):
+                    lines += [f' Energy Bin: {e}', f' Time Bin: {t}']
+
+                    for f in range(result.shape[2]):
+                        lines += ['', f' {names[fixed]} bin: {f}', f'   Tally Results:  {names[across]} (across) by {names[down]} (down)']
+
+                        for title, values in (('   Tally Results:', result), ('   Relative Errors', error)):
+                            if title == '   Relative Errors':
+                                lines.append(title)
+
+                            lines.append('        ' + ''.join(f'{a:>12.2f}' for a in range(values.shape[4])))
+                            lines += [f'{d:>8.2f} ' + ' '.join(f'{value:.5E}' for value in values[e, t, f, d]) for d in range(values.shape[3])]
+
+                    lines.append('')
+
+            return header + '\n'.join(lines) + '\n'
+
+        def test_matrix(self):
+            """
+            Tests `EXAMPLES_VALID` on `to_arrays` with matrix-format files.
+            """
+
+            source = consts.path.MESHTAL.read_text()
+            result, error = self.element.from_mcnp(source).to_arrays()
+
+            for _, across, down, _ in self.EXAMPLES_VALID:
+                matrix = self.write_matrix(source, result, error, 'XYZ'.index(across), 'XYZ'.index(down))
+                a, b = self.element.from_mcnp(matrix).to_arrays()
+
+                assert numpy.array_equal(a, result)
+                assert numpy.array_equal(b, error)
+
+            with pytest.raises(pymcnp.errors.MeshtalError):
+                self.element.from_mcnp(matrix.rsplit('   Relative Errors', 1)[0]).to_arrays()
+
+            with pytest.raises(pymcnp.errors.MeshtalError):
+                self.element.from_mcnp(matrix.replace('Z (down)', 'Q (down)')).to_arrays()
+
+        def test_cylinder(self):
+            """
+            Tests `to_arrays` and `to_mcnp` with cylindrical meshes.
+            """
+
+            source = consts.path.MESHTAL.read_text()
+            result, error = self.element.from_mcnp(source).to_arrays()
+            cylinder = (
+                source.replace('    X direction:', '  Cylinder origin at   0.00E+00  0.00E+00 -1.50E+02, axis in  0.00E+00  0.00E+00  1.00E+00 direction\n    R direction:')
+                .replace('    Y direction:   -100.00    -50.00      0.00     50.00    100.00\n', '')
+                .replace('    Energy bin', '    Theta direction (revolutions):     0.000     0.250     0.500     0.750     1.000\n    Energy bin')
+            )
+
+            a = self.element.from_mcnp(cylinder)
+            energy, time, r, z, theta = a.header.to_edges()
+
+            assert numpy.array_equal(r, [-100, -50, 0, 50, 100])
+            assert numpy.array_equal(z, [-150, -125, -100, -75, -50])
+            assert numpy.array_equal(theta, [0, 0.25, 0.5, 0.75, 1])
+            assert a.header.to_mcnp() == pymcnp.meshtal.Header.from_mcnp(a.header.to_mcnp()).to_mcnp()
+            assert 'Cylinder origin at' in a.header.to_mcnp()
+
+            b, c = a.to_arrays()
+            assert numpy.array_equal(b, result)
+            assert numpy.array_equal(c, error)
+
+            matrix = self.write_matrix(cylinder, result, error, 0, 1).replace('X (across) by Y (down)', 'R (across) by Z (down)')
+            b, c = self.element.from_mcnp(matrix).to_arrays()
+            assert numpy.array_equal(b, result)
+            assert numpy.array_equal(c, error)
+
+    class Test_Chunks:
+        def test_valid(self):
+            a = pymcnp.Meshtal.from_file(consts.path.MESHTAL)
+            result, error = a.to_arrays()
+            chunks = list(a.iter_arrays(100))
+            b = numpy.concatenate(chunks)
+
+            assert [len(chunk) for chunk in chunks] == [100] * 5 + [76]
+            assert numpy.array_equal(b['index'], numpy.arange(result.size))
+            assert numpy.array_equal(b['result'], result.ravel()) and numpy.array_equal(b['error'], error.ravel())
+
+            # Voxels match the coordinates of MESHTAL lines.
+            for voxel, tally in zip(b, a.tallies):
+                c = pymcnp.Meshtal._to_tally(voxel)
+
+                for name in ('energy', 'time', 'x', 'y', 'z', 'result', 'error'):
+                    assert getattr(c, name).value == getattr(tally, name).value.strip()
+
+        def test_invalid(self):
+            with pytest.raises(pymcnp.errors.CliError):
+                next(pymcnp.Meshtal.from_file(consts.path.MESHTAL).iter_arrays(0))
+
+    class Test_Pyvista:
+        element = pymcnp.Meshtal
+
+        def test_valid(self, tmp_path):
+            """
+            Tests `to_pyvista` and `to_vtk` with rectangular meshes.
+            """
+
+            a = self.element.from_file(consts.path.MESHTAL)
+            result, error = a.to_arrays()
+            grid = a.to_pyvista(energy=1, time=0)
+            _, _, x, y, z = a.header.to_edges()
+
+            assert isinstance(grid, pyvista.RectilinearGrid)
+            assert numpy.array_equal(grid.x, x) and numpy.array_equal(grid.y, y) and numpy.array_equal(grid.z, z)
+
+            # Cell centers locate every value in the dense arrays.
+            centers = grid.cell_centers().points
+            index = [numpy.searchsorted(edges, centers[:, axis]) - 1 for axis, edges in enumerate((x, y, z))]
+            assert numpy.array_equal(grid.cell_data['result'], result[1, 0][tuple(index)])
+            assert numpy.array_equal(grid.cell_data['error'], error[1, 0][tuple(index)])
+
+            a.to_vtk(tmp_path / 'mesh.vtr')
+            b = pyvista.read(tmp_path / 'mesh.vtr')
+            assert numpy.array_equal(b.cell_data['result'], a.to_pyvista().cell_data['result'])
+
+        def test_cylinder(self, tmp_path):
+            """
+            Tests `to_pyvista` and `to_vtk` with cylindrical meshes.
+            """
+
+            source = (
+                consts.path.MESHTAL.read_text()
+                .replace(
+                    '    X direction:   -100.00    -50.00      0.00     50.00    100.00',
+                    '  Cylinder origin at   1.00E+00  2.00E+00  3.00E+00, axis in  0.00E+00  1.00E+00  0.00E+00 direction\n    R direction:      0.00     50.00    100.00    150.00    200.00',
+                )
+                .replace('    Y direction:   -100.00    -50.00      0.00     50.00    100.00\n', '')
+                .replace('    Energy bin', '    Theta direction (revolutions):     0.000     0.250     0.500     0.750     1.000\n    Energy bin')
+            )
+            a = self.element.from_mcnp(source)
+            result, _ = a.to_arrays()
+            grid = a.to_pyvista(energy=0, time=0)
+
+            assert isinstance(grid, pyvista.StructuredGrid)
+            assert numpy.isclose(grid.volume, numpy.pi * 200**2 * 100, rtol=0.01)
+            assert numpy.array_equal(grid.cell_data['result'].reshape(4, 36, 4, order='F'), numpy.repeat(result[0, 0], 9, axis=2).transpose(0, 2, 1))
+
+            # The axis runs along y from the origin.
+            assert numpy.allclose(grid.bounds, (1 - 200, 1 + 200, 2 - 150, 2 - 50, 3 - 200, 3 + 200), atol=1e-6)
+
+            a.to_vtk(tmp_path / 'mesh.vts')
+            assert pyvista.read(tmp_path / 'mesh.vts').n_cells == grid.n_cells
+
+        def test_invalid(self, tmp_path):
+            """
+            Tests invalid bins and paths on `to_pyvista` and `to_vtk`.
+            """
+
+            a = self.element.from_file(consts.path.MESHTAL)
+
+            with pytest.raises(pymcnp.errors.CliError):
+                a.to_pyvista(energy=3)
+
+            with pytest.raises(pymcnp.errors.CliError):
+                a.to_vtk(tmp_path / 'mesh.vts')
+
+    class Test_Index:
+        element = pymcnp.Meshtal
+
+        @staticmethod
+        def write_tallies(filename: pathlib.Path) -> pathlib.Path:
+            """
+            Writes MESHTAL files with two tallies.
+            """
+
+            a = consts.path.MESHTAL.read_text()
+            b = (consts.path.MESHTAL.parent / 'valid_38.meshtal').read_text()
+            b = re.sub(r'Mesh Tally Number *\d+', f'Mesh Tally Number{14:>10}', b).replace(' neutron  mesh', '   photon mesh')
+            filename.write_text(a + '\n\n' + b[b.index(' Mesh Tally Number') :])
+
+            return filename
+
+        def test_valid(self, tmp_path):
+            """
+            Tests `tallies_index` and `get_tally` on files with two tallies.
+            """
+
+            filename = self.write_tallies(tmp_path / 'tallies.meshtal')
+            index = self.element.tallies_index(filename)
+
+            assert index.dtype == self.element.INDEX
+            assert index['number'].tolist() == [4, 14]
+            assert index['particle'].tolist() == ['neutron', 'photon']
+            assert index['shape'].tolist() == [[3, 3, 4, 4, 4], [1, 1, 10, 10, 100]]
+
+            for number, example in ((4, consts.path.MESHTAL), (14, consts.path.MESHTAL.parent / 'valid_38.meshtal')):
+                a = self.element.get_tally(filename, number).to_arrays()
+                b = self.element.from_file(example).to_arrays()
+
+                for x, y in zip(a, b):
+                    assert numpy.array_equal(x, y)
+
+            compressed = tmp_path / 'compressed.meshtal'
+            compressed.write_bytes(gzip.compress(filename.read_bytes()))
+
+            assert numpy.array_equal(self.element.tallies_index(compressed), index)
+            assert self.element.get_tally(compressed, 14).to_mcnp() == self.element.get_tally(filename, 14).to_mcnp()
+
+        def test_sidecar(self, tmp_path):
+            """
+            Tests sidecar reuse and invalidation.
+            """
+
+            filename = self.write_tallies(tmp_path / 'tallies.meshtal')
+            sidecar = tmp_path / 'tallies.meshtal.index.npz'
+
+            self.element.tallies_index(filename)
+            self.element.get_tally(filename, 14)
+            assert not sidecar.exists()
+
+            self.element.tallies_index(filename, cache=True)
+            mtime = sidecar.stat().st_mtime_ns
+
+            self.element.tallies_index(filename, cache=True)
+            assert sidecar.stat().st_mtime_ns == mtime
+
+            filename.write_bytes(consts.path.MESHTAL.read_bytes())
+            assert self.element.tallies_index(filename, cache=True)['number'].tolist() == [4]
+
+        def test_sidecar_unwritable(self, tmp_path):
+            """
+            Tests reads when sidecars cannot be written.
+            """
+
+            filename = self.write_tallies(tmp_path / 'tallies.meshtal')
+
+            # A directory in place of the sidecar fails writes even for root.
+            sidecar = tmp_path / 'tallies.meshtal.index.npz'
+            sidecar.mkdir()
+
+            assert self.element.tallies_index(filename, cache=True)['number'].tolist() == [4, 14]
+            a = self.element.get_tally(filename, 14).to_arrays()
+            b = self.element.from_file(consts.path.MESHTAL.parent / 'valid_38.meshtal').to_arrays()
+
+            for x, y in zip(a, b):
+                assert numpy.array_equal(x, y)
+
+            assert sidecar.is_dir()
+            assert sorted(path.name for path in tmp_path.iterdir()) == sorted([filename.name, sidecar.name])
+
+        def test_invalid(self, tmp_path):
+            """
+            Tests invalid paths, files, and tally numbers.
+            """
+
+            filename = self.write_tallies(tmp_path / 'tallies.meshtal')
+
+            with pytest.raises(pymcnp.errors.MeshtalError):
+                self.element.get_tally(filename, 5)
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.tallies_index('hello.meshtal')
+
+            for example in consts.path.MESHTAL.parent.glob('invalid*.meshtal'):
+                filename = tmp_path / example.name
+                filename.write_bytes(example.read_bytes())
+
+                with pytest.raises(pymcnp.errors.Error):
+                    self.element.tallies_index(filename)
+
+    class Test_Compressed:
+        element = pymcnp.Meshtal
+
+        def test_valid(self, tmp_path):
+            """
+            Tests compressed files on `from_file` and `to_file`.
+            """
+
+            filename = tmp_path / 'source.meshtal'
+            filename.write_bytes(gzip.compress(consts.path.MESHTAL.read_bytes()))
+
+            a = self.element.from_file(filename)
+            assert a == self.element.from_file(consts.path.MESHTAL)
+
+            a.to_file(tmp_path / 'target.meshtal.gz')
+            assert gzip.decompress((tmp_path / 'target.meshtal.gz').read_bytes()).decode() == a.to_mcnp()
@@ -0,0 +1,182 @@
+import numpy
+import pytest
+
+import pymcnp
+from .. import consts
+
+
+class Test_MeshtalArray:
+    class Test_Init:
+        def test_valid(self, tmp_path):
+            # Tally numbers index the file, which writes a sidecar next to it.
+            filename = tmp_path / consts.path.MESHTAL.name
+            filename.write_bytes(consts.path.MESHTAL.read_bytes())
+
+            a = pymcnp.MeshtalArray.from_file(consts.path.MESHTAL)
+            b = pymcnp.MeshtalArray.from_file(filename, number=4)
+            result, error = pymcnp.Meshtal.from_file(consts.path.MESHTAL).to_arrays()
+
+            assert a.histories == b.histories == 1000000
+            assert numpy.array_equal(a.result, result) and numpy.array_equal(a.error, error)
+            assert numpy.array_equal(b.result, result) and numpy.array_equal(b.error, error)
+
+        def test_invalid(self):
+            with pytest.raises(pymcnp.errors.CliError):
+                pymcnp.MeshtalArray(numpy.zeros(3), numpy.zeros(2))
+
+            with pytest.raises(pymcnp.errors.CliError):
+                pymcnp.MeshtalArray(numpy.zeros(3), numpy.zeros(3), histories=-1)
+
+    class Test_Arithmetic:
+        def test_valid(self):
+            a = pymcnp.MeshtalArray.from_file(consts.path.MESHTAL)
+            b = pymcnp.MeshtalArray(a.result * 2, a.error / 2, a.histories, a.edges)
+            response = numpy.linspace(1, 2, a.result.shape[-1])
+            mask = a.result != 0
+
+            c = a + b
+            assert numpy.allclose(c.result, 3 * a.result)
+            assert numpy.allclose(c.error[mask], numpy.hypot(a.error, a.error)[mask] / 3)
+
+            c = b - a
+            assert numpy.allclose(c.result, a.result)
+            assert numpy.allclose(c.error[mask], numpy.hypot(a.error, a.error)[mask])
+            assert numpy.allclose((1 - a).result, 1 - a.result)
+
+            c = a * b
+            assert numpy.allclose(c.result, 2 * a.result**2)
+            assert numpy.allclose(c.error, numpy.hypot(a.error, a.error / 2))
+
+            c = response * a
+            assert numpy.allclose(c.result, a.result * response)
+            assert numpy.array_equal(c.error, a.error)
+
+            c = b / a
+            assert numpy.allclose(c.result[mask], 2)
+            assert numpy.allclose(c.error, numpy.hypot(a.error, a.error / 2))
+            assert numpy.allclose((2 / b).result[mask], 1 / a.result[mask])
+
+            c = a + 1.0
+            assert numpy.allclose(c.error * c.result, a.error * a.result)
+            assert c.histories == a.histories
+
+        def test_invalid(self):
+            a = pymcnp.MeshtalArray.from_file(consts.path.MESHTAL)
+            b = pymcnp.MeshtalArray.from_file(consts.path.MESHTAL.parent / 'valid_38.meshtal')
+            c = pymcnp.MeshtalArray(a.result, a.error, a.histories, (*a.edges[:-1], a.edges[-1] + 1))
+
+            with pytest.raises(pymcnp.errors.MeshtalError):
+                a + b
+
+            with pytest.raises(pymcnp.errors.MeshtalError):
+                a * c
+
+    class Test_Merge:
+        def test_valid(self):
+            file = pymcnp.Meshtal.from_file(consts.path.MESHTAL)
+            a = pymcnp.MeshtalArray.from_meshtal(file)
+            b = pymcnp.MeshtalArray(a.result * 2, a.error / 2, 3 * a.histories, a.edges)
+            mask = a.result != 0
+
+            c = pymcnp.MeshtalArray.merge([a, b])
+            assert c.histories == 4 * a.histories
+            assert numpy.allclose(c.result, (a.result + 3 * b.result) / 4)
+            assert numpy.allclose(c.error * c.result, numpy.hypot(a.error * a.result, 3 * b.error * b.result) / 4)
+
+            c = pymcnp.MeshtalArray.merge(iter([a, b]), weights=[1, 1])
+            assert numpy.allclose(c.result, 1.5 * a.result)
+
+            # Identical replicas halve variances.
+            c = pymcnp.MeshtalArray.merge([file, file])
+            assert numpy.allclose(c.result, a.result)
+            assert numpy.allclose(c.error[mask], a.error[mask] / numpy.sqrt(2))
+
+        def test_invalid(self):
+            a = pymcnp.MeshtalArray.from_file(consts.path.MESHTAL)
+            b = pymcnp.MeshtalArray.from_file(consts.path.MESHTAL.parent / 'valid_38.meshtal')
+
+            with pytest.raises(pymcnp.errors.CliError):
+                pymcnp.MeshtalArray.merge([])
+
+            with pytest.raises(pymcnp.errors.CliError):
+                pymcnp.MeshtalArray.merge([a, a], weights=[1])
+
+            with pytest.raises(pymcnp.errors.CliError):
+                pymcnp.MeshtalArray.merge([a, a], weights=[1, 1, 1])
+
+            with pytest.raises(pymcnp.errors.CliError):
+                pymcnp.MeshtalArray.merge([a, a], weights=[1, -1])
+
+            with pytest.raises(pymcnp.errors.MeshtalError):
+                pymcnp.MeshtalArray.merge([a, b])
+
+    class Test_Rebin:
+        def test_valid(self, tmp_path):
+            a = pymcnp.MeshtalArray.from_file(consts.path.MESHTAL)
+
+            # Coarsening keeps integrals and averages errors in quadrature.
+            b = a.rebin(i=[-100, 0, 100], j=[-100, 100], k=[-150, -100, -50])
+            assert b.result.shape == (3, 3, 2, 1, 2)
+            assert numpy.allclose(b.integrate().result, a.integrate().result)
+            assert numpy.isclose(b.result[-1, -1, 0, 0, 0], a.result[-1, -1, :2, :, :2].mean())
+            assert numpy.isclose(b.error[-1, -1, 0, 0, 0] * b.result[-1, -1, 0, 0, 0], numpy.linalg.norm(a.error[-1, -1, :2, :, :2] * a.result[-1, -1, :2, :, :2]) / 16)
+
+            # Energy bins split by overlap fraction, and totals are dropped.
+            b = a.rebin(energy=[0, 1, 14])
+            assert b.result.shape == (2, 3, 4, 4, 4)
+            assert numpy.allclose(b.result[0], a.result[0] / 3)
+            assert numpy.allclose(b.result[1], a.result[0] * 2 / 3 + a.result[1])
+
+            b = a.collapse(energy=True, time=True)
+            assert b.result.shape == (1, 1, 4, 4, 4)
+            assert numpy.allclose(b.result[0, 0], a.result[:-1, :-1].sum(axis=(0, 1)))
+
+            # Memory-mapped arrays are read in slabs.
+            result = numpy.lib.format.open_memmap(tmp_path / 'result.npy', mode='w+', shape=a.result.shape)
+            error = numpy.lib.format.open_memmap(tmp_path / 'error.npy', mode='w+', shape=a.result.shape)
+            result[:], error[:] = a.result, a.error
+            result.flush(), error.flush()
+            c = pymcnp.MeshtalArray(numpy.load(tmp_path / 'result.npy', mmap_mode='r'), numpy.load(tmp_path / 'error.npy', mmap_mode='r'), a.histories, a.edges)
+            b, d = a.rebin(i=[-100, 0, 100], k=[-150, -50]), c.rebin(i=[-100, 0, 100], k=[-150, -50], size=50)
+            assert numpy.allclose(b.result, d.result) and numpy.allclose(b.error, d.error)
+
+        def test_cylinder(self):
+            result = numpy.arange(1.0, 1.0 + 4 * 2 * 2).reshape(1, 1, 4, 2, 2)
+            a = pymcnp.MeshtalArray(result, numpy.full(result.shape, 0.1), 1, (numpy.array([0.0, 1.0]), None, numpy.arange(5.0), numpy.arange(3.0), numpy.array([0.0, 0.5, 1.0])), True)
+            b = a.rebin(i=[0, 2, 4], k=[0, 1])
+
+            assert numpy.isclose(a.volumes.sum(), numpy.pi * 16 * 2)
+            assert numpy.allclose(b.integrate().result, a.integrate().result)
+            assert numpy.isclose(b.result[0, 0, 0, 0, 0], (result[0, 0, 0, 0].sum() * 1 + result[0, 0, 1, 0].sum() * 3) / 8)
+
+        def test_invalid(self):
+            a = pymcnp.MeshtalArray.from_file(consts.path.MESHTAL)
+
+            with pytest.raises(pymcnp.errors.CliError):
+                a.rebin(i=[0, -1])
+
+            with pytest.raises(pymcnp.errors.CliError):
+                a.rebin(i=[0, 1], size=0)
+
+            with pytest.raises(pymcnp.errors.CliError):
+                pymcnp.MeshtalArray(a.result, a.error).rebin(i=[0, 1])
+
+    class Test_Integrate:
+        def test_valid(self):
+            a = pymcnp.MeshtalArray.from_file(consts.path.MESHTAL)
+            mask = numpy.zeros(a.result.shape[2:], dtype=bool)
+            mask[:2] = True
+
+            b = a.integrate(mask, size=20)
+            assert b.result.shape == (3, 3)
+            assert numpy.allclose(b.result, (a.result * a.volumes * mask).sum(axis=(2, 3, 4)))
+            assert numpy.allclose(b.error * b.result, numpy.sqrt(((a.error * a.result * a.volumes * mask) ** 2).sum(axis=(2, 3, 4))))
+
+            b = a.integrate(mask, average=True)
+            assert numpy.allclose(b.result, a.result[:, :, :2].mean(axis=(2, 3, 4)))
+
+        def test_invalid(self):
+            a = pymcnp.MeshtalArray.from_file(consts.path.MESHTAL)
+
+            with pytest.raises(pymcnp.errors.CliError):
+                a.integrate(numpy.ones(3, dtype=bool))
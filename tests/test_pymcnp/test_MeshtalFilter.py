@@ -1,3 +1,5 @@
+import numpy
+
 import pymcnp
 from .. import consts
 
@@ -12,6 +14,16 @@ class Filter1(pymcnp.MeshtalFilter):
         return True
 
 
+class Filter2(pymcnp.MeshtalFilter):
+    def check(self, tally):
+        return tally.x.value.startswith('-')
+
+
+class FilterError(pymcnp.MeshtalFilter):
+    def check_batch(self, arrays):
+        return (arrays['error'] > 0) & (arrays['error'] < 0.05) & (arrays['x'] < 0)
+
+
 class Test_MeshtalFilter:
     class Test_Dunder:
         EXAMPLES = [
@@ -23,3 +35,23 @@ class Test_MeshtalFilter:
                 list(pymcnp.MeshtalFilter()(example))
                 list(Filter0()(example))
                 list(Filter1()(example))
+
+    class Test_Batch:
+        def test_filter_arrays(self):
+            file = pymcnp.Meshtal.from_file(consts.path.MESHTAL)
+            result, error = file.to_arrays()
+            voxels = numpy.concatenate(list(file.iter_arrays()))
+
+            a = numpy.concatenate(list(FilterError().filter_arrays(consts.path.MESHTAL, size=50)))
+            assert numpy.array_equal(a['index'], numpy.flatnonzero((error > 0) & (error < 0.05) & (voxels['x'] < 0).reshape(error.shape)))
+            assert numpy.array_equal(a['result'], result.ravel()[a['index']])
+
+            assert len(numpy.concatenate(list(pymcnp.MeshtalFilter().filter_arrays(file)))) == result.size
+
+        def test_adapter(self):
+            file = pymcnp.Meshtal.from_file(consts.path.MESHTAL)
+            voxels = numpy.concatenate(list(file.iter_arrays()))
+
+            assert not Filter0().check_batch(voxels).any()
+            assert Filter1().check_batch(voxels).all()
+            assert numpy.array_equal(Filter2().check_batch(voxels), voxels['x'] < 0)
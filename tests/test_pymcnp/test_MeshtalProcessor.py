@@ -1,7 +1,27 @@
+import numpy
+
 import pymcnp
 from .. import consts
 
 
+class ProcessorEnergy(pymcnp.MeshtalProcessor):
+    def prehook(self):
+        self.total = numpy.zeros(64)
+
+    def process_batch(self, arrays):
+        # Sums over energy bins, leaving out the totals.
+        arrays = arrays[~numpy.isnan(arrays['energy']) & numpy.isnan(arrays['time'])]
+        self.total += numpy.bincount(arrays['index'] % 64, weights=arrays['result'], minlength=64)
+
+
+class ProcessorCount(pymcnp.MeshtalProcessor):
+    def prehook(self):
+        self.count = 0
+
+    def process(self, tally):
+        self.count += tally.result.value != '0.00000E+00'
+
+
 class Test_MeshtalProcessor:
     class Test_Dunder:
         EXAMPLES = [
@@ -11,3 +31,22 @@ class Test_MeshtalProcessor:
         def test__call__(self):
             for example in self.EXAMPLES:
                 pymcnp.MeshtalProcessor()(example)
+
+    class Test_Batch:
+        def test_process_arrays(self):
+            file = pymcnp.Meshtal.from_file(consts.path.MESHTAL)
+            result, _ = file.to_arrays()
+
+            a = ProcessorEnergy()
+            a.process_arrays(consts.path.MESHTAL, size=50)
+            assert numpy.allclose(a.total, result[:-1, -1].sum(axis=0).ravel())
+
+            pymcnp.MeshtalProcessor().process_arrays(file)
+
+        def test_adapter(self):
+            file = pymcnp.Meshtal.from_file(consts.path.MESHTAL)
+            result, _ = file.to_arrays()
+
+            a = ProcessorCount()
+            a.process_arrays(file, size=50)
+            assert a.count == numpy.count_nonzero(result)
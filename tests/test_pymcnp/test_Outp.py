@@ -1,3 +1,4 @@
+import gzip
 import pathlib
 
 import pymcnp
@@ -39,6 +40,44 @@ class Test_Outp:
             *(pathlib.Path(__file__).parent.parent.parent / 'files' / 'outp').glob('invalid*.outp'),
         ]
 
+    class Test_Blocks:
+        element = pymcnp.Outp
+
+        def test_valid(self):
+            """
+            Tests block dispatch on `from_file`.
+            """
+
+            a = self.element.from_file(consts.path.OUTP)
+            kinds = [type(block) for block in a.blocks]
+
+            assert kinds.count(pymcnp.outp.Tally_1B) == 2
+            assert kinds.count(pymcnp.outp.NeutronActivity) == kinds.count(pymcnp.outp.PhotonActivity) == 1
+            assert all(block.to_mcnp() in consts.path.OUTP.read_text() for block in a.blocks if isinstance(block, pymcnp.outp.Raw))
+            assert len(kinds) == consts.path.OUTP.read_text().count('\n1')
+
+            # Blocks not matching their parser are kept as text.
+            text = consts.path.OUTP.read_text().replace('did not pass', 'passed')
+            kinds = [type(block) for block in self.element.from_mcnp(text).blocks]
+            assert pymcnp.outp.Tally_1B not in kinds and pymcnp.outp.Tally_1A not in kinds
+
+    class Test_Compressed:
+        element = pymcnp.Outp
+
+        def test_valid(self, tmp_path):
+            """
+            Tests compressed files on `from_file` and `to_file`.
+            """
+
+            filename = tmp_path / 'source.outp'
+            filename.write_bytes(gzip.compress(consts.path.OUTP.read_bytes()))
+
+            a = self.element.from_file(filename)
+            assert a == self.element.from_file(consts.path.OUTP)
+
+            a.to_file(tmp_path / 'target.outp.gz')
+            assert gzip.decompress((tmp_path / 'target.outp.gz').read_bytes()).decode() == a.to_mcnp()
+
     class Test_Dataframe(classes.Test_Dataframe):
         element = pymcnp.Outp
         EXAMPLES = [path.read_text() for path in (pathlib.Path(__file__).parent.parent.parent / 'files' / 'outp').glob('valid*.outp')]
@@ -1,5 +1,13 @@
+import os
+import bz2
+import gzip
+import lzma
 import pathlib
 
+import numpy
+import fastparquet
+import pytest
+
 import pymcnp
 from .. import consts
 from .. import classes
@@ -38,3 +46,386 @@ class Test_Ptrac:
         EXAMPLES_INVALID = [
             *(pathlib.Path(__file__).parent.parent.parent / 'files' / 'ptrac').glob('invalid*.ptrac'),
         ]
+
+    class Test_Open:
+        element = pymcnp.Ptrac
+        EXAMPLES_VALID = [
+            *(pathlib.Path(__file__).parent.parent.parent / 'files' / 'ptrac').glob('valid*.ptrac'),
+        ]
+        EXAMPLES_INVALID = [
+            *(pathlib.Path(__file__).parent.parent.parent / 'files' / 'ptrac').glob('invalid*.ptrac'),
+            pathlib.Path('hello.ptrac'),
+        ]
+
+        def test_valid(self):
+            """
+            Tests `EXAMPLES_VALID` on `open` and `iter_histories`.
+            """
+
+            for example in self.EXAMPLES_VALID:
+                a = self.element.open(example)
+
+                assert a.header == pymcnp.ptrac.Header.from_mcnp(a.header.to_mcnp())
+
+                for history in self.element.iter_histories(example):
+                    assert history == pymcnp.ptrac.History.from_mcnp(history.to_mcnp())
+
+        def test_invalid(self):
+            """
+            Tests `EXAMPLES_INVALID` on `open`.
+            """
+
+            for example in self.EXAMPLES_INVALID:
+                with pytest.raises((pymcnp.errors.Error)):
+                    self.element.open(example)
+
+    class Test_Arrays:
+        element = pymcnp.Ptrac
+        EXAMPLES_VALID = [
+            consts.path.PTRAC,
+            *(pathlib.Path(__file__).parent.parent.parent / 'files' / 'ptrac').glob('valid_0*.ptrac'),
+        ]
+
+        def test_valid(self):
+            """
+            Tests `EXAMPLES_VALID` on `iter_arrays` and `to_arrays`.
+            """
+
+            for example in self.EXAMPLES_VALID:
+                a = numpy.concatenate(list(self.element.iter_arrays(example, size=1000)))
+                b = self.element.from_file(example).to_arrays()
+
+                assert a.dtype == pymcnp.ptrac.Decoder.DTYPE
+                assert len(a) == len(b)
+
+                for name in ('nps', 'event_type', 'next_type', 'cell', 'material', 'x', 'y', 'z', 'erg'):
+                    assert numpy.array_equal(a[name], b[name], equal_nan=True)
+
+        def test_invalid(self):
+            """
+            Tests invalid paths on `iter_arrays`.
+            """
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.iter_arrays('hello.ptrac')
+
+    class Test_Index:
+        element = pymcnp.Ptrac
+        EXAMPLES_VALID = [
+            consts.path.PTRAC,
+            *(pathlib.Path(__file__).parent.parent.parent / 'files' / 'ptrac').glob('valid_3*.ptrac'),
+        ]
+
+        def test_valid(self, tmp_path):
+            """
+            Tests `EXAMPLES_VALID` on `build_index`, `get_history`, and `histories_between`.
+            """
+
+            for example in self.EXAMPLES_VALID:
+                filename = tmp_path / example.name
+                filename.write_bytes(example.read_bytes())
+
+                index = self.element.build_index(filename)
+                histories = list(self.element.iter_histories(filename))
+
+                assert index.dtype == pymcnp.ptrac.Decoder.INDEX
+                assert list(index['nps']) == [history.i_line.nps.value for history in histories]
+                assert self.element._scan(filename, size=1000).tolist() == index.tolist()
+
+                middle = len(histories) // 2
+                assert self.element.get_history(filename, int(index['nps'][middle])) == histories[middle]
+
+                between = self.element.histories_between(filename, int(index['nps'][1]), int(index['nps'][3]))
+                assert [history.to_mcnp() for history in between] == [history.to_mcnp() for history in histories[1:4]]
+
+        def test_sidecar(self, tmp_path):
+            """
+            Tests sidecar reuse and invalidation.
+            """
+
+            filename = tmp_path / consts.path.PTRAC.name
+            filename.write_bytes(consts.path.PTRAC.read_bytes())
+            sidecar = self.element._sidecar(filename)
+
+            self.element.get_history(filename, 1)
+            assert sidecar.is_file()
+
+            mtime = sidecar.stat().st_mtime_ns
+            self.element.get_history(filename, 2)
+            assert sidecar.stat().st_mtime_ns == mtime
+
+            filename.write_bytes(consts.path.PTRAC.read_bytes())
+            os.utime(filename, ns=(mtime + 10**9, mtime + 10**9))
+            self.element.get_history(filename, 2)
+            assert sidecar.stat().st_mtime_ns != mtime
+
+        def test_sidecar_unwritable(self, tmp_path):
+            """
+            Tests reads when sidecars cannot be written.
+            """
+
+            filename = tmp_path / consts.path.PTRAC.name
+            filename.write_bytes(consts.path.PTRAC.read_bytes())
+
+            # A directory in place of the sidecar fails writes even for root.
+            sidecar = self.element._sidecar(filename)
+            sidecar.mkdir()
+
+            index = self.element.build_index(filename)
+            history = self.element.get_history(filename, int(index['nps'][0]))
+
+            assert history.i_line.nps.value == index['nps'][0]
+            assert len(list(self.element.histories_between(filename, int(index['nps'][0]), int(index['nps'][2])))) == 3
+            assert sidecar.is_dir()
+            assert sorted(path.name for path in tmp_path.iterdir()) == sorted([filename.name, sidecar.name])
+
+        def test_invalid(self, tmp_path):
+            """
+            Tests invalid paths and NPS on `get_history`.
+            """
+
+            filename = tmp_path / consts.path.PTRAC.name
+            filename.write_bytes(consts.path.PTRAC.read_bytes())
+
+            with pytest.raises(pymcnp.errors.PtracError):
+                self.element.get_history(filename, -1)
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.build_index('hello.ptrac')
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.get_history('hello.ptrac', 1)
+
+    class Test_Workers:
+        element = pymcnp.Ptrac
+        EXAMPLES_VALID = [
+            consts.path.PTRAC,
+            pathlib.Path(__file__).parent.parent.parent / 'files' / 'ptrac' / 'valid_31.ptrac',
+        ]
+
+        def test_valid(self):
+            """
+            Tests `EXAMPLES_VALID` on `from_file`, `iter_histories`, and `iter_arrays` with workers.
+            """
+
+            for example in self.EXAMPLES_VALID:
+                a = [history.to_mcnp() for history in self.element.iter_histories(example)]
+                b = [history.to_mcnp() for history in self.element.iter_histories(example, workers=2)]
+
+                assert a == b
+
+                a = numpy.concatenate(list(self.element.iter_arrays(example, size=1000)))
+                b = numpy.concatenate(list(self.element.iter_arrays(example, size=1000, workers=2)))
+
+                for name in a.dtype.names:
+                    assert numpy.array_equal(a[name], b[name], equal_nan=True)
+
+            assert self.element.from_file(consts.path.PTRAC, workers=2).to_mcnp() == consts.ast.PTRAC.to_mcnp()
+
+        def test_invalid(self):
+            """
+            Tests invalid paths with workers.
+            """
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.iter_histories('hello.ptrac', workers=2)
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.from_file('hello.ptrac', workers=2)
+
+    class Test_Parquet:
+        element = pymcnp.Ptrac
+
+        def test_valid(self, tmp_path):
+            """
+            Tests `to_parquet` and `write_parquet`.
+            """
+
+            a = tmp_path / 'a.parquet'
+            b = tmp_path / 'b.parquet'
+
+            self.element.open(consts.path.PTRAC).to_parquet(a, row_group_size=1000)
+            self.element.write_parquet(self.element.iter_arrays(consts.path.PTRAC, size=1000), b)
+
+            arrays = list(self.element.iter_arrays(consts.path.PTRAC, size=1000))
+            table = numpy.concatenate(arrays)
+
+            for path in (a, b):
+                file = fastparquet.ParquetFile(path)
+                frame = file.to_pandas()
+
+                assert len(file.row_groups) == len(arrays)
+                assert list(frame.columns) == list(pymcnp.ptrac.Decoder.DTYPE.names)
+
+                for name in ('nps', 'event_type', 'cell', 'x', 'erg'):
+                    assert numpy.array_equal(frame[name].to_numpy(), table[name], equal_nan=True)
+
+        def test_empty(self, tmp_path):
+            """
+            Tests `write_parquet` without chunks.
+            """
+
+            path = tmp_path / 'empty.parquet'
+            self.element.write_parquet([], path)
+
+            assert len(fastparquet.ParquetFile(path).to_pandas()) == 0
+
+    class Test_Merge:
+        element = pymcnp.Ptrac
+
+        def test_valid(self, tmp_path):
+            """
+            Tests `merge` with and without NPS renumbering.
+            """
+
+            paths = [consts.path.PTRAC, consts.path.PTRAC.parent / 'valid_31.ptrac']
+            histories = [list(self.element.iter_histories(path)) for path in paths]
+            nps = [numpy.array([history.i_line.nps.value for history in file]) for file in histories]
+
+            out = tmp_path / 'merged.ptrac'
+            self.element.merge(paths, out)
+            merged = self.element.from_file(out)
+
+            assert merged.header.to_mcnp() == self.element.open(paths[0]).header.to_mcnp()
+            assert [history.to_mcnp() for history in merged.histories] == [history.to_mcnp() for file in histories for history in file]
+
+            self.element.merge(paths, out, renumber='offset')
+            index = self.element.build_index(out)
+
+            assert numpy.array_equal(index['nps'], numpy.concatenate([nps[0], nps[1] + nps[0].max()]))
+
+            self.element.merge(paths, out, renumber='sequential')
+            index = self.element.build_index(out)
+
+            assert numpy.array_equal(index['nps'], numpy.arange(1, sum(map(len, nps)) + 1))
+
+            self.element.merge(paths, tmp_path / 'merged.parquet', renumber='sequential', parquet=True, row_group_size=1000)
+            frame = fastparquet.ParquetFile(tmp_path / 'merged.parquet').to_pandas()
+            table = numpy.concatenate(list(self.element.iter_arrays(out)))
+
+            for name in ('nps', 'event_type', 'cell', 'x'):
+                assert numpy.array_equal(frame[name].to_numpy(), table[name])
+
+        def test_invalid(self, tmp_path):
+            """
+            Tests `merge` with missing files, incompatible headers, and invalid renumbering.
+            """
+
+            out = tmp_path / 'merged.ptrac'
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.merge([], out)
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.merge([consts.path.PTRAC, 'hello.ptrac'], out)
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.merge([consts.path.PTRAC], out, renumber='hello')
+
+            with pytest.raises(pymcnp.errors.PtracError):
+                self.element.merge([consts.path.PTRAC, consts.path.PTRAC.parent / 'valid_00.ptrac'], out)
+
+    class Test_Spatial:
+        element = pymcnp.Ptrac
+
+        def test_valid(self, tmp_path):
+            """
+            Tests `build_spatial_index` and `load_spatial_index` sidecars.
+            """
+
+            filename = tmp_path / 'spatial.ptrac'
+            filename.write_bytes(consts.path.PTRAC.read_bytes())
+
+            a = self.element.build_spatial_index(filename)
+            b = self.element.load_spatial_index(filename)
+            sidecar = filename.with_name(filename.name + '.spatial.npz')
+
+            assert sidecar.is_file()
+            assert numpy.array_equal(a.radius([0, 0, 0], 10.0), b.radius([0, 0, 0], 10.0))
+
+            c = self.element.load_spatial_index(filename, where='cell == 1')
+            assert c.tree.n < a.tree.n
+
+            os.utime(filename, ns=(0, 0))
+            assert self.element.load_spatial_index(filename).tree.n == a.tree.n
+
+            with numpy.load(sidecar) as file:
+                assert file['mtime'] == 0
+                assert file['points'].shape == (a.tree.n, 3)
+
+        def test_invalid(self, tmp_path):
+            """
+            Tests `build_spatial_index` with missing files and invalid predicates.
+            """
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.build_spatial_index('hello.ptrac')
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.load_spatial_index('hello.ptrac')
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.build_spatial_index(consts.path.PTRAC, where='hello > 1')
+
+    class Test_Compressed:
+        element = pymcnp.Ptrac
+        EXAMPLES_VALID = [
+            ('gz', gzip),
+            ('xz', lzma),
+            ('bz2', bz2),
+        ]
+
+        def test_valid(self, tmp_path):
+            """
+            Tests `EXAMPLES_VALID` on `from_file`, `to_file`, `iter_arrays`, and `get_history`.
+            """
+
+            a = numpy.concatenate(list(self.element.iter_arrays(consts.path.PTRAC, size=1000)))
+
+            for suffix, module in self.EXAMPLES_VALID:
+                # Magic bytes decide the compression, so suffixes are left off.
+                filename = tmp_path / f'{suffix}.ptrac'
+                filename.write_bytes(module.compress(consts.path.PTRAC.read_bytes()))
+
+                assert self.element.from_file(filename).to_mcnp() == consts.ast.PTRAC.to_mcnp()
+                assert self.element.from_file(filename, workers=2).to_mcnp() == consts.ast.PTRAC.to_mcnp()
+
+                b = numpy.concatenate(list(self.element.iter_arrays(filename, size=1000, workers=2)))
+                for name in a.dtype.names:
+                    assert numpy.array_equal(a[name], b[name], equal_nan=True)
+
+                index = self.element.build_index(filename)
+                histories = list(self.element.iter_histories(filename))
+                assert self.element.get_history(filename, int(index['nps'][-1])) == histories[-1]
+
+                between = self.element.histories_between(filename, int(index['nps'][1]), int(index['nps'][3]))
+                assert [history.to_mcnp() for history in between] == [history.to_mcnp() for history in histories[1:4]]
+
+                target = tmp_path / f'target.ptrac.{suffix}'
+                self.element.from_file(filename).to_file(target)
+                assert module.decompress(target.read_bytes()).decode() == consts.ast.PTRAC.to_mcnp()
+
+                target = tmp_path / 'target.ptrac'
+                self.element.from_file(filename).to_file(target, compression=suffix)
+                assert module.decompress(target.read_bytes()).decode() == consts.ast.PTRAC.to_mcnp()
+
+        def test_merge(self, tmp_path):
+            """
+            Tests `merge` with compressed inputs and outputs.
+            """
+
+            filename = tmp_path / 'source.ptrac'
+            filename.write_bytes(gzip.compress(consts.path.PTRAC.read_bytes()))
+
+            self.element.merge([filename, consts.path.PTRAC], tmp_path / 'merged.ptrac.xz', renumber='sequential')
+            self.element.merge([consts.path.PTRAC, consts.path.PTRAC], tmp_path / 'merged.ptrac', renumber='sequential')
+
+            assert lzma.decompress((tmp_path / 'merged.ptrac.xz').read_bytes()) == (tmp_path / 'merged.ptrac').read_bytes()
+
+        def test_invalid(self, tmp_path):
+            """
+            Tests invalid compressions on `to_file`.
+            """
+
+            with pytest.raises(pymcnp.errors.CliError):
+                consts.ast.PTRAC.to_file(tmp_path / 'target.ptrac', compression='zip')
@@ -0,0 +1,107 @@
+import numpy
+import pytest
+
+import pymcnp
+from .. import consts
+
+
+def make_events(count: int, seed: int = 0) -> numpy.ndarray:
+    """
+    Generates timed events sorted by history.
+    """
+
+    rng = numpy.random.default_rng(seed)
+    events = numpy.zeros(count, dtype=pymcnp.ptrac.Decoder.DTYPE)
+    events['nps'] = numpy.sort(rng.integers(1, count // 4, count))
+    events['cell'] = rng.integers(1, 5, count)
+    events['event_type'] = rng.choice([3000, 4000], count)
+    events['tme'] = rng.integers(0, 50, count) / 2
+    events['tme'][rng.random(count) < 0.05] = numpy.nan
+
+    return events
+
+
+def brute(events: numpy.ndarray, cells: list[int], gate: float, predelay: float, edges: numpy.ndarray):
+    """
+    Counts coincidences one event at a time.
+    """
+
+    multiplicity = {}
+    histories = {}
+    rossi = numpy.zeros(len(edges) - 1, dtype=numpy.int64)
+
+    for nps in numpy.unique(events['nps']):
+        rows = events[(events['nps'] == nps) & numpy.isin(events['cell'], cells) & ~numpy.isnan(events['tme'])]
+        times = numpy.sort(rows['tme'])
+        histories[len(times)] = histories.get(len(times), 0) + 1
+
+        for i, time in enumerate(times):
+            count = sum(1 for later in times[i + 1 :] if predelay <= later - time < predelay + gate)
+            multiplicity[count] = multiplicity.get(count, 0) + 1
+            rossi += numpy.histogram(times[i + 1 :] - time, bins=edges)[0]
+
+    def dense(counts):
+        return numpy.array([counts.get(i, 0) for i in range(max(counts) + 1)])
+
+    return dense(multiplicity), dense(histories), rossi
+
+
+class Test_PtracCoincidence:
+    class Test_Init:
+        EXAMPLES_INVALID = [
+            {'cells': [], 'gate': 1.0},
+            {'cells': [1], 'gate': 0.0},
+            {'cells': [1], 'gate': 1.0, 'predelay': -1.0},
+            {'cells': [1], 'gate': 1.0, 'edges': [1.0, 0.0]},
+            {'cells': [1], 'gate': 1.0, 'edges': [-1.0, 0.0]},
+            {'cells': [1], 'gate': 1.0, 'where': 'hello > 1'},
+        ]
+
+        def test_invalid(self):
+            for example in self.EXAMPLES_INVALID:
+                with pytest.raises(pymcnp.errors.CliError):
+                    pymcnp.PtracCoincidence(**example)
+
+    def test__call__(self):
+        events = make_events(4000)
+        split = numpy.searchsorted(events['nps'], events['nps'][2000])
+        edges = numpy.linspace(0, 10, 21)
+
+        for gate, predelay in ((2.0, 0.0), (4.0, 1.5)):
+            coincidence = pymcnp.PtracCoincidence([1, 3], gate, predelay, edges)([events[:split], events[split:]])
+            multiplicity, histories, rossi = brute(events, [1, 3], gate, predelay, edges)
+
+            assert numpy.array_equal(coincidence.multiplicity, multiplicity)
+            assert numpy.array_equal(coincidence.histories, histories)
+            assert numpy.array_equal(coincidence.rossi, rossi)
+
+        # Small pair blocks split rows across many histograms.
+        coincidence = pymcnp.PtracCoincidence([1, 3], 2.0, 0.0, edges)
+        coincidence.PAIRS = 7
+        coincidence([events])
+
+        assert numpy.array_equal(coincidence.rossi, brute(events, [1, 3], 2.0, 0.0, edges)[2])
+
+        coincidence = pymcnp.PtracCoincidence([1, 3], 2.0, where='event_type == 4000')([events])
+        multiplicity, _, _ = brute(events[events['event_type'] == 4000], [1, 3], 2.0, 0.0, edges)
+
+        assert numpy.array_equal(coincidence.multiplicity, multiplicity)
+
+    def test_merge(self):
+        events = make_events(4000, 1)
+        split = numpy.searchsorted(events['nps'], events['nps'][1000])
+        a = pymcnp.PtracCoincidence([2], 3.0, edges=[0, 1, 2, 4])([events])
+        b = pymcnp.PtracCoincidence([2], 3.0, edges=[0, 1, 2, 4])([events[:split]])
+        b.merge(pymcnp.PtracCoincidence([2], 3.0, edges=[0, 1, 2, 4])([events[split:]]))
+
+        assert numpy.array_equal(a.rossi, b.rossi)
+
+        with pytest.raises(pymcnp.errors.CliError):
+            a.merge(pymcnp.PtracCoincidence([2], 1.0))
+
+    def test_file(self):
+        a = pymcnp.PtracCoincidence([1, 2, 3], 1.0)(consts.path.PTRAC, size=1000)
+        b = pymcnp.PtracCoincidence([1, 2, 3], 1.0)(consts.path.PTRAC, size=1000, workers=2)
+
+        assert numpy.array_equal(a.histories, b.histories)
+        assert a.histories.sum() == len(numpy.unique(numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(consts.path.PTRAC)))['nps']))
@@ -1,3 +1,6 @@
+import numpy
+import pytest
+
 import pymcnp
 from .. import consts
 
@@ -40,6 +43,8 @@ class Test_PtracFilter:
     class Test_Dunder:
         EXAMPLES = [
             consts.ast.PTRAC,
+            pymcnp.Ptrac.open(consts.path.PTRAC),
+            pymcnp.Ptrac.iter_histories(consts.path.PTRAC),
         ]
 
         def test__call__(self):
@@ -47,3 +52,54 @@ class Test_PtracFilter:
                 list(pymcnp.PtracFilter()(example))
                 list(Filter0()(example))
                 list(Filter1()(example))
+
+
+class Filter2(pymcnp.PtracFilter):
+    @staticmethod
+    def check_collision_batch(events):
+        return events['x'] > 0.0
+
+    @staticmethod
+    def check_surface_batch(events):
+        return numpy.zeros(len(events), dtype=bool)
+
+
+class Test_PtracFilter_Batch:
+    EXAMPLES = [
+        consts.path.PTRAC,
+        consts.path.PTRAC.parent / 'valid_31.ptrac',
+    ]
+
+    def test_filter_arrays(self):
+        for example in self.EXAMPLES:
+            table = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(example)))
+            kinds = numpy.abs(table['event_type']) // 1000
+
+            a = numpy.concatenate(list(pymcnp.PtracFilter('x > 0.0 & cell in {1, 3}').filter_arrays(example, size=1000)))
+            assert 0 < len(a) < len(table)
+            assert a.tobytes() == table[(table['x'] > 0.0) & numpy.isin(table['cell'], [1, 3])].tobytes()
+
+            b = numpy.concatenate(list(Filter2().filter_arrays(example, size=1000)))
+            assert 0 < len(b) < len(table)
+            assert b.tobytes() == table[((kinds != 4) | (table['x'] > 0.0)) & (kinds != 3)].tobytes()
+
+            assert len(numpy.concatenate(list(Filter0().filter_arrays([table])))) == len(table)
+            assert len(numpy.concatenate(list(pymcnp.PtracFilter('~(nps > 0)').filter_arrays([table])))) == 0
+
+    def test_filter_histories(self):
+        for example in self.EXAMPLES:
+            table = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(example)))
+            histories = list(pymcnp.PtracFilter('x > 0.0 & cell == 1').filter_histories(example, size=1000))
+
+            assert 0 < len(histories)
+            assert [history.i_line.nps.value for history in histories] == list(numpy.unique(table['nps'][(table['x'] > 0.0) & (table['cell'] == 1)]))
+
+    def test_invalid(self):
+        with pytest.raises(pymcnp.errors.CliError):
+            pymcnp.PtracFilter('hello > 1.0')
+
+        with pytest.raises(pymcnp.errors.CliError):
+            pymcnp.PtracFilter('erg >')
+
+        with pytest.raises(pymcnp.errors.CliError):
+            pymcnp.PtracFilter().filter_histories('hello.ptrac')
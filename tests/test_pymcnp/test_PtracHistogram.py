@@ -0,0 +1,95 @@
+import numpy
+import pytest
+
+import pymcnp
+from .. import consts
+
+
+class Test_PtracHistogram:
+    EDGES = {
+        'x': numpy.linspace(-40, 40, 9),
+        'y': numpy.linspace(-40, 40, 5),
+    }
+    EXAMPLES = [
+        consts.path.PTRAC,
+        consts.path.PTRAC.parent / 'valid_31.ptrac',
+    ]
+
+    class Test_Init:
+        EXAMPLES_INVALID = [
+            {'edges': {}},
+            {'edges': {'hello': [0, 1]}},
+            {'edges': {'x': [0]}},
+            {'edges': {'x': [1, 0]}},
+            {'edges': {'x': [0, 1]}, 'keys': ['hello']},
+            {'edges': {'x': [0, 1]}, 'weight': 'hello'},
+            {'edges': {'x': [0, 1]}, 'where': 'hello > 1'},
+        ]
+
+        def test_invalid(self):
+            for example in self.EXAMPLES_INVALID:
+                with pytest.raises(pymcnp.errors.CliError):
+                    pymcnp.PtracHistogram(**example)
+
+    def test__call__(self):
+        for example in self.EXAMPLES:
+            table = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(example)))
+            histogram = pymcnp.PtracHistogram(self.EDGES, keys=['cell'], weight='z')(example, size=1000)
+
+            assert sorted(histogram.counts) == [(cell,) for cell in numpy.unique(table['cell']).tolist()]
+
+            for (cell,), counts in histogram.counts.items():
+                rows = table[table['cell'] == cell]
+                expected, _ = numpy.histogramdd((rows['x'], rows['y']), bins=list(self.EDGES.values()))
+                weights, _ = numpy.histogramdd((rows['x'], rows['y']), bins=list(self.EDGES.values()), weights=rows['z'])
+
+                assert numpy.array_equal(counts, expected)
+                assert numpy.allclose(histogram.weights[(cell,)], weights)
+
+    def test_weights(self):
+        table = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(consts.path.PTRAC.parent / 'valid_00.ptrac')))
+        assert numpy.isnan(table['wgt']).all()
+
+        histogram = pymcnp.PtracHistogram(self.EDGES)([table])
+        expected, _ = numpy.histogramdd((table['x'], table['y']), bins=list(self.EDGES.values()))
+
+        assert numpy.array_equal(histogram.counts[()], expected)
+        assert numpy.array_equal(histogram.weights[()], numpy.zeros(expected.shape))
+
+        table['wgt'][::2] = 0.5
+        histogram = pymcnp.PtracHistogram(self.EDGES)([table])
+        rows = table[::2]
+        weights, _ = numpy.histogramdd((rows['x'], rows['y']), bins=list(self.EDGES.values()), weights=rows['wgt'])
+
+        assert numpy.array_equal(histogram.counts[()], expected)
+        assert numpy.allclose(histogram.weights[()], weights)
+
+    def test_fill(self):
+        for example in self.EXAMPLES:
+            a = pymcnp.PtracHistogram(self.EDGES, weight='z')
+            b = pymcnp.PtracHistogram({'x': self.EDGES['x']}, keys=['event_type'], weight='z', where='cell == 2')
+            pymcnp.PtracHistogram.fill([a, b], example, size=1000)
+
+            c = pymcnp.PtracHistogram(self.EDGES, weight='z')(example, size=1000, workers=2)
+            d = pymcnp.PtracHistogram({'x': self.EDGES['x']}, keys=['event_type'], weight='z', where='cell == 2')(example, size=1000, workers=2)
+
+            for e, f in ((a, c), (b, d)):
+                assert e.counts.keys() == f.counts.keys()
+
+                for key in e.counts:
+                    assert numpy.array_equal(e.counts[key], f.counts[key])
+                    assert numpy.allclose(e.weights[key], f.weights[key])
+
+    def test_merge(self):
+        chunks = list(pymcnp.Ptrac.iter_arrays(consts.path.PTRAC, size=1000))
+        a = pymcnp.PtracHistogram(self.EDGES)(chunks)
+        b = pymcnp.PtracHistogram(self.EDGES)(chunks[:1])
+        b.merge(pymcnp.PtracHistogram(self.EDGES)(chunks[1:]))
+
+        assert numpy.array_equal(a.counts[()], b.counts[()])
+
+        with pytest.raises(pymcnp.errors.CliError):
+            a.merge(pymcnp.PtracHistogram({'x': [0, 1]}))
+
+        with pytest.raises(pymcnp.errors.CliError):
+            pymcnp.PtracHistogram(self.EDGES)('hello.ptrac')
@@ -0,0 +1,123 @@
+import numpy
+import pytest
+
+import pymcnp
+from .. import consts
+
+
+def traverse(edges, start, end):
+    """
+    Tallies track lengths of one segment by stepping between plane crossings.
+    """
+
+    tally = numpy.zeros([len(values) - 1 for values in edges])
+    delta = end - start
+    times = {0.0, 1.0}
+
+    for axis, values in enumerate(edges):
+        for value in values:
+            if delta[axis] != 0:
+                time = (value - start[axis]) / delta[axis]
+                if 0 < time < 1:
+                    times.add(time)
+
+    times = sorted(times)
+    for first, last in zip(times[:-1], times[1:]):
+        middle = start + (first + last) / 2 * delta
+        index = [numpy.searchsorted(values, middle[axis], side='right') - 1 for axis, values in enumerate(edges)]
+
+        if all(0 <= i < len(values) - 1 for i, values in zip(index, edges)):
+            tally[tuple(index)] += (last - first) * numpy.linalg.norm(delta)
+
+    return tally
+
+
+class Test_PtracMeshTally:
+    EDGES = (numpy.linspace(-20, 20, 5), numpy.array([-30, -5, 0, 5, 30]), numpy.linspace(-10, 30, 9))
+
+    class Test_Init:
+        EXAMPLES_INVALID = [
+            {'x': [0], 'y': [0, 1], 'z': [0, 1]},
+            {'x': [0, 1], 'y': [1, 0], 'z': [0, 1]},
+            {'x': [0, 1], 'y': [0, 1], 'z': [0, 1], 'energies': [2, 1]},
+            {'x': [0, 1], 'y': [0, 1], 'z': [0, 1], 'where': 'hello > 1'},
+        ]
+
+        def test_invalid(self):
+            for example in self.EXAMPLES_INVALID:
+                with pytest.raises(pymcnp.errors.CliError):
+                    pymcnp.PtracMeshTally(**example)
+
+    def test_to_segments(self):
+        events = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(consts.path.PTRAC)))
+        segments = pymcnp.PtracMeshTally.to_segments(events)
+
+        for segment in segments[:50]:
+            rows = numpy.flatnonzero((events['nps'] == segment['nps']) & (events['x'] == segment['start'][0]) & (events['y'] == segment['start'][1]))
+            assert any(numpy.array_equal([events['x'][row + 1], events['y'][row + 1], events['z'][row + 1]], segment['end']) for row in rows)
+
+        assert (numpy.abs(events['event_type'][:-1][events['nps'][:-1] == events['nps'][1:]]) // 1000 == 5).sum() + len(segments) == (events['nps'][:-1] == events['nps'][1:]).sum()
+
+    def test__call__(self):
+        events = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(consts.path.PTRAC)))
+        segments = pymcnp.PtracMeshTally.to_segments(events)
+        tally = pymcnp.PtracMeshTally(*self.EDGES, weighted=False)(consts.path.PTRAC, size=1000)
+
+        expected = sum(traverse(self.EDGES, segment['start'], segment['end']) for segment in segments)
+
+        assert tally.histories == len(numpy.unique(events['nps']))
+        assert numpy.allclose(tally.tally[0], expected)
+
+        flux, error = tally.result()
+        assert numpy.allclose(flux[0], expected / (tally.volumes * tally.histories))
+        assert ((error >= 0) & (error <= 1)).all()
+
+        big = pymcnp.PtracMeshTally([-100, 100], [-100, 100], [-100, 100], weighted=False)([events])
+        assert numpy.isclose(big.tally.sum(), numpy.linalg.norm(segments['end'] - segments['start'], axis=1).sum())
+
+    def test_energies(self):
+        rng = numpy.random.default_rng(0)
+        events = numpy.zeros(2000, dtype=pymcnp.ptrac.Decoder.DTYPE)
+        events['nps'] = numpy.repeat(numpy.arange(200), 10)
+        events['event_type'] = 4000
+        events['x'], events['y'], events['z'] = rng.uniform(-25, 35, (3, 2000))
+        events['erg'] = rng.uniform(0, 4, 2000)
+        events['wgt'] = rng.uniform(0.5, 1.5, 2000)
+
+        tally = pymcnp.PtracMeshTally(*self.EDGES, energies=[0, 1, 2, 3])([events[:1000], events[1000:]])
+        segments = pymcnp.PtracMeshTally.to_segments(events)
+
+        for energy in range(3):
+            rows = segments[(segments['erg'] >= energy) & (segments['erg'] < energy + 1)]
+            expected = sum(segment['wgt'] * traverse(self.EDGES, segment['start'], segment['end']) for segment in rows)
+
+            assert numpy.allclose(tally.tally[energy], expected)
+
+    def test_weights(self):
+        rng = numpy.random.default_rng(1)
+        events = numpy.zeros(1000, dtype=pymcnp.ptrac.Decoder.DTYPE)
+        events['nps'] = numpy.repeat(numpy.arange(100), 10)
+        events['event_type'] = 4000
+        events['x'], events['y'], events['z'] = rng.uniform(-25, 35, (3, 1000))
+        events['wgt'] = rng.uniform(0.5, 1.5, 1000)
+        events['wgt'][::7] = numpy.nan
+
+        tally = pymcnp.PtracMeshTally(*self.EDGES)([events])
+        segments = pymcnp.PtracMeshTally.to_segments(events)
+        segments = segments[~numpy.isnan(segments['wgt'])]
+        expected = sum(segment['wgt'] * traverse(self.EDGES, segment['start'], segment['end']) for segment in segments)
+
+        assert numpy.isfinite(tally.tally).all()
+        assert numpy.isfinite(tally.squares).all()
+        assert numpy.allclose(tally.tally[0], expected)
+
+    def test_merge(self):
+        a = pymcnp.PtracMeshTally(*self.EDGES, weighted=False)(consts.path.PTRAC, size=1000)
+        b = pymcnp.PtracMeshTally(*self.EDGES, weighted=False)(consts.path.PTRAC, size=1000, workers=2)
+
+        assert a.histories == b.histories
+        assert numpy.allclose(a.tally, b.tally)
+        assert numpy.allclose(a.squares, b.squares)
+
+        with pytest.raises(pymcnp.errors.CliError):
+            a.merge(pymcnp.PtracMeshTally([0, 1], [0, 1], [0, 1]))
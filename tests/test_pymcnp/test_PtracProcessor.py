@@ -1,3 +1,8 @@
+import collections
+
+import numpy
+import pytest
+
 import pymcnp
 from .. import consts
 
@@ -6,8 +11,75 @@ class Test_PtracProcessor:
     class Test_Dunder:
         EXAMPLES = [
             consts.ast.PTRAC,
+            pymcnp.Ptrac.open(consts.path.PTRAC),
+            pymcnp.Ptrac.iter_histories(consts.path.PTRAC),
         ]
 
         def test__call__(self):
             for example in self.EXAMPLES:
                 pymcnp.PtracProcessor()(example)
+
+
+class Processor0(pymcnp.PtracProcessor):
+    def prehook(self):
+        self.counts = collections.Counter()
+        self.cells = numpy.zeros(8, dtype=numpy.int64)
+
+    def process_source(self, event):
+        self.counts['source'] += 1
+
+    def process_bank(self, event):
+        self.counts['bank'] += 1
+
+    def process_surface(self, event):
+        self.counts['surface'] += 1
+
+    def process_collision(self, event):
+        self.counts['collision'] += 1
+
+    def process_terminal(self, event):
+        self.counts['terminal'] += 1
+
+    def process_source_batch(self, events):
+        self.counts['source'] += len(events)
+
+    def process_bank_batch(self, events):
+        self.counts['bank'] += len(events)
+
+    def process_surface_batch(self, events):
+        self.counts['surface'] += len(events)
+
+    def process_collision_batch(self, events):
+        assert (numpy.abs(events['event_type']) // 1000 == 4).all()
+        self.counts['collision'] += len(events)
+        self.cells += numpy.bincount(events['cell'], minlength=len(self.cells))
+
+    def process_terminal_batch(self, events):
+        self.counts['terminal'] += len(events)
+
+
+class Test_PtracProcessor_Batch:
+    EXAMPLES = [
+        consts.path.PTRAC,
+        consts.path.PTRAC.parent / 'valid_31.ptrac',
+    ]
+
+    def test_process_arrays(self):
+        for example in self.EXAMPLES:
+            table = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(example)))
+            collisions = table[numpy.abs(table['event_type']) // 1000 == 4]
+
+            a = Processor0()
+            a.process_arrays(example, size=1000)
+            b = Processor0()
+            b(pymcnp.Ptrac.open(example))
+
+            assert a.counts == b.counts
+            assert sum(a.counts.values()) == len(table)
+            assert a.cells.tolist() == numpy.bincount(collisions['cell'], minlength=8).tolist()
+
+            pymcnp.PtracProcessor().process_arrays([table])
+
+    def test_invalid(self):
+        with pytest.raises(pymcnp.errors.CliError):
+            pymcnp.PtracProcessor().process_arrays('hello.ptrac')
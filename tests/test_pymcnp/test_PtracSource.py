@@ -0,0 +1,97 @@
+import numpy
+import pytest
+
+import pymcnp
+from .. import consts
+
+
+def make_events(count: int, seed: int = 0) -> numpy.ndarray:
+    """
+    Generates surface crossings with directions and energies.
+    """
+
+    rng = numpy.random.default_rng(seed)
+    directions = rng.normal(size=(count, 3))
+    directions /= numpy.linalg.norm(directions, axis=1)[:, None]
+
+    events = numpy.zeros(count, dtype=pymcnp.ptrac.Decoder.DTYPE)
+    events['nps'] = numpy.arange(count) // 4
+    events['event_type'] = rng.choice([3000, 4000], count)
+    events['surface'] = rng.integers(1, 3, count)
+    events['x'], events['y'], events['z'] = rng.integers(0, 3, (3, count))
+    events['u'], events['v'], events['w'] = directions.T
+    events['erg'] = rng.uniform(0, 2, count)
+    events['wgt'] = rng.uniform(0.5, 1.5, count)
+
+    return events
+
+
+class Test_PtracSource:
+    class Test_Init:
+        EXAMPLES_INVALID = [
+            {'mesh': ([0, 1], [0, 1])},
+            {'mesh': ([0, 1], [0, 1], [1, 0])},
+            {'energies': [1]},
+            {'cosines': [-2, 0, 1]},
+            {'axis': [0, 0, 0]},
+            {'where': 'hello > 1'},
+        ]
+
+        def test_invalid(self):
+            for example in self.EXAMPLES_INVALID:
+                with pytest.raises(pymcnp.errors.CliError):
+                    pymcnp.PtracSource(**example)
+
+    def test_to_cards(self):
+        events = make_events(1000)
+        source = pymcnp.PtracSource(surfaces=[1], energies=[0, 1, 2], cosines=[-1, 0, 1])([events[:500], events[500:]])
+        crossings = events[(events['event_type'] == 3000) & (events['surface'] == 1)]
+
+        assert source.histories == 250
+        assert numpy.isclose(source.weights.sum(), crossings['wgt'].sum())
+        assert numpy.allclose(source.spectrum, numpy.histogram(crossings['erg'], bins=[0, 1, 2], weights=crossings['wgt'])[0])
+        assert numpy.allclose(source.angles, numpy.histogram(crossings['w'], bins=[-1, 0, 1], weights=crossings['wgt'])[0])
+        assert len(source.points) == len(numpy.unique(numpy.column_stack([crossings['x'], crossings['y'], crossings['z']]), axis=0))
+
+        sdef, si_1, sp_1, si_2, sp_2, si_3, sp_3 = source.to_cards(start=5, particle='n')
+
+        assert sdef.to_mcnp().startswith('sdef pos d5 erg d6 dir d7 vec')
+        assert sdef.to_mcnp().endswith('par n')
+        assert pymcnp.inp.Sdef.from_mcnp(sdef.to_mcnp()).to_mcnp() == sdef.to_mcnp()
+        assert len(list(si_1.information)) == 3 * len(source.points)
+        assert numpy.isclose(sum(float(p.value) for p in sp_1.probabilities), 1, rtol=1e-5)
+        assert [float(value.value) for value in si_2.information] == [0, 1, 2]
+        assert float(sp_3.probabilities[0].value) == 0
+
+        for card in (si_1, sp_1, si_2, sp_2, si_3, sp_3):
+            assert type(card).from_mcnp(card.to_mcnp()).to_mcnp() == card.to_mcnp()
+
+    def test_chunks(self):
+        events = make_events(1000, 2)
+        a = pymcnp.PtracSource()([events])
+        b = pymcnp.PtracSource()([events[i : i + 40] for i in range(0, 600, 40)]).merge(pymcnp.PtracSource()([events[600:]]))
+
+        assert numpy.array_equal(a.points, b.points)
+        assert numpy.allclose(a.weights, b.weights)
+
+        b.update(events[:40])
+        assert len(b.points) == len(a.points)
+
+    def test_mesh(self):
+        events = make_events(1000, 1)
+        a = pymcnp.PtracSource(mesh=([0, 1.5, 3], [0, 3], [0, 3]))([events])
+        b = pymcnp.PtracSource(mesh=([0, 1.5, 3], [0, 3], [0, 3]))([events[:300]]).merge(pymcnp.PtracSource(mesh=([0, 1.5, 3], [0, 3], [0, 3]))([events[300:]]))
+
+        assert numpy.array_equal(a.points, [[0.75, 1.5, 1.5], [2.25, 1.5, 1.5]])
+        assert numpy.allclose(a.weights, b.weights)
+
+        with pytest.raises(pymcnp.errors.CliError):
+            a.merge(pymcnp.PtracSource())
+
+    def test_file(self):
+        source = pymcnp.PtracSource(surfaces=[11, 21])(consts.path.PTRAC, size=1000)
+
+        assert source.to_mcnp().startswith('sdef pos d1 wgt')
+
+        with pytest.raises(pymcnp.errors.CliError):
+            pymcnp.PtracSource(surfaces=[999])(consts.path.PTRAC).to_cards()
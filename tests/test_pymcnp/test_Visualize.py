@@ -1,5 +1,7 @@
 import pathlib
 
+import numpy
+import pytest
 
 import pymcnp
 from .. import consts
@@ -65,3 +67,44 @@ class Test_Visualize:
             for example in self.EXAMPLES:
                 element = self.element(**example)
                 element.to_pdf_cell('1', path)
+
+        def test_to_tracks(self):
+            events = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(consts.path.PTRAC)))
+            links = self.element._links(events)
+            tracks = self.element.to_tracks(consts.path.PTRAC, max_segments=len(events))
+
+            assert tracks.n_points - tracks.n_lines == links.sum()
+            assert numpy.array_equal(numpy.unique(tracks.point_data['nps']), numpy.unique(events['nps']))
+
+            for max_segments in (1, 50, 500, 2000):
+                tracks = self.element.to_tracks(consts.path.PTRAC, max_segments=max_segments)
+                strata = {row['event_type'] for row in events[numpy.r_[events['nps'][1:] != events['nps'][:-1], True]]}
+
+                assert 0 < tracks.n_points - tracks.n_lines <= max_segments
+                assert max_segments < len(strata) or len(numpy.unique(tracks.point_data['nps'])) >= len(strata)
+
+            assert self.element.to_tracks([]).n_points == 0
+
+            with pytest.raises(pymcnp.errors.CliError):
+                self.element.to_tracks(consts.path.PTRAC, max_segments=0)
+
+        def test_add_tracks(self):
+            for example in self.EXAMPLES:
+                element = self.element(**example)
+                element.add_tracks(consts.path.PTRAC, max_segments=100, scalars='erg')
+
+                with pytest.raises(pymcnp.errors.CliError):
+                    element.add_tracks(consts.path.PTRAC, scalars='hello')
+
+        def test_add_meshtal(self, tmp_path):
+            # Tally numbers index the file, which writes a sidecar next to it.
+            filename = tmp_path / consts.path.MESHTAL.name
+            filename.write_bytes(consts.path.MESHTAL.read_bytes())
+
+            for example in self.EXAMPLES:
+                element = self.element(**example)
+                element.add_meshtal(consts.path.MESHTAL, scalars='error')
+                element.add_meshtal(filename, plot=element.to_show_surfaces(), number=4, energy=0, time=0)
+
+                with pytest.raises(pymcnp.errors.CliError):
+                    element.add_meshtal(consts.path.MESHTAL, scalars='hello')
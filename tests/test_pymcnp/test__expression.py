@@ -0,0 +1,51 @@
+import pickle
+
+import numpy
+import pytest
+
+import pymcnp
+from pymcnp import _expression
+
+
+class Test_Expression:
+    TABLE = numpy.array(
+        [(1, 0.5, 10), (2, 1.5, 11), (3, 2.5, 12), (4, 3.5, 10)],
+        dtype=[('nps', numpy.int64), ('erg', numpy.float64), ('cell', numpy.int32)],
+    )
+    EXAMPLES_VALID = [
+        ('erg > 1.0', [False, True, True, True]),
+        ('erg <= 1.5 | cell == 12', [True, True, True, False]),
+        ('erg > 1.0 & cell in {10, 11}', [False, True, False, True]),
+        ('cell not in {10}', [False, True, True, False]),
+        ('~(nps >= 2 & nps != 4)', [True, False, False, True]),
+        ('erg > -1e3', [True, True, True, True]),
+    ]
+    EXAMPLES_INVALID = [
+        None,
+        '',
+        'hello > 1',
+        'erg >',
+        'erg > 1 &',
+        'erg in {1',
+        '(erg > 1',
+        'erg ? 1',
+        'erg > 1 1',
+    ]
+
+    def test_valid(self):
+        for source, mask in self.EXAMPLES_VALID:
+            expression = _expression.Expression(source, self.TABLE.dtype.names)
+
+            assert expression(self.TABLE).tolist() == mask
+            assert str(expression) == source
+
+    def test_invalid(self):
+        for source in self.EXAMPLES_INVALID:
+            with pytest.raises(pymcnp.errors.CliError):
+                _expression.Expression(source, self.TABLE.dtype.names)
+
+    def test__reduce__(self):
+        for source, mask in self.EXAMPLES_VALID:
+            expression = pickle.loads(pickle.dumps(_expression.Expression(source, self.TABLE.dtype.names)))
+
+            assert expression(self.TABLE).tolist() == mask
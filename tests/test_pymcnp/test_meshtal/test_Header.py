@@ -1,3 +1,5 @@
+import numpy
+
 import pymcnp
 from ... import consts
 from ... import classes
@@ -259,3 +261,19 @@ class Test_Header:
         EXAMPLES_INVALID = [
             'hello',
         ]
+
+    class Test_Edges:
+        element = pymcnp.meshtal.Header
+
+        def test_valid(self):
+            """
+            Tests `to_edges`.
+            """
+
+            energy, time, x, y, z = self.element.from_mcnp(consts.string.meshtal.HEADER).to_edges()
+
+            assert time is None
+            assert numpy.array_equal(energy, [0, 1e36])
+            assert numpy.array_equal(x, numpy.linspace(-100, 100, 11))
+            assert numpy.array_equal(y, numpy.linspace(-100, 100, 11))
+            assert numpy.allclose(z, numpy.linspace(-150, -50, 101))
@@ -0,0 +1,28 @@
+import pymcnp
+from ... import consts
+from ... import classes
+
+
+class Test_Raw:
+    class Test_Init(classes.Test_Init):
+        element = pymcnp.outp.Raw
+        EXAMPLES_VALID = [
+            {
+                'text': consts.string.types.STRING,
+            },
+        ]
+        EXAMPLES_INVALID = [
+            {
+                'text': None,
+            },
+        ]
+
+    class Test_Mcnp(classes.Test_Mcnp):
+        element = pymcnp.outp.Raw
+        EXAMPLES_VALID = [
+            '1cells                                                                                                  print table 60\n\n',
+            consts.string.outp.NEUTRON_ACTIVITY,
+        ]
+        EXAMPLES_INVALID = [
+            'hello',
+        ]
@@ -0,0 +1,224 @@
+import gzip
+import struct
+import pathlib
+
+import numpy
+import pytest
+
+import pymcnp
+from ... import consts
+
+
+def write_binary(source: pathlib.Path, target: pathlib.Path, order: str = '<'):
+    """
+    Writes binary PTRAC files from ASCII PTRAC files.
+    """
+
+    with open(source) as file:
+        header = pymcnp.Ptrac._read_header(file)
+        blocks = list(pymcnp.Ptrac._read_blocks(file))
+
+    decoder = pymcnp.ptrac.Decoder(header)
+    real = 'f' if header.n_line.n13.value == 4 else 'd'
+    records = []
+
+    def record(payload: bytes):
+        records.append(struct.pack(f'{order}i', len(payload)) + payload + struct.pack(f'{order}i', len(payload)))
+
+    def values(line: str, fmt: str, widths: list[int]):
+        fields = []
+        start = 1
+        for width in widths:
+            fields.append(float(line[start : start + width]))
+            start += width
+        return struct.pack(f'{order}{len(fields)}{fmt}', *[int(field) if fmt == 'i' else field for field in fields])
+
+    record(struct.pack(f'{order}i', -1))
+    record(f'{header.code:<8}{header.version:<25}{header.code_date:<9}{header.run_datetime:<18}'.encode())
+    record(f'{header.title:<80}'.encode())
+    v_values = [float(v.value) for v in header.v_line.variables]
+    record(struct.pack(f'{order}{len(v_values)}{real}', *v_values))
+    record(struct.pack(f'{order}20i', *[int(n) for n in header.n_line.to_mcnp().split()]))
+    l_values = [variable.value for variable in header.l_line.variables]
+    record(struct.pack(f'{order}{len(l_values)}i', *l_values))
+
+    for block in blocks:
+        lines = block.splitlines()
+        record(values(lines[0], 'i', [13 if variable == 6 else 10 for variable in decoder.i_layout]))
+        kind = int(lines[0][11:21])
+
+        for j_line, p_line in zip(lines[1::2], lines[2::2]):
+            j_layout, p_layout = decoder.layouts[abs(kind) // 1000]
+            record(values(j_line, real, [10] * len(j_layout)) + values(p_line, real, [13] * len(p_layout)))
+            kind = int(j_line[1:11])
+
+    target.write_bytes(b''.join(records))
+
+    return target
+
+
+def write_records(target: pathlib.Path, corrupt: bool = False):
+    """
+    Writes binary PTRAC files from hand-packed Fortran records.
+
+    Every record is framed by explicit 4-byte markers, independent of
+    `write_binary`. The file holds one history with a source event and a
+    surface event, each with `(7, 17, 18)` j-lines and `(20, 21, 22)` p-lines.
+    """
+
+    payloads = [
+        struct.pack('<i', -1),
+        b'mcnp    6                        05/08/13 01/01/26 00:00:00',
+        b'hand-built'.ljust(80),
+        struct.pack('<2d', 1.0, 2.0),
+        struct.pack('<20i', 2, *[3] * 10, 0, 8, *[0] * 7),
+        struct.pack('<32i', 1, 2, *[7, 17, 18, 20, 21, 22] * 5),
+        struct.pack('<2i', 7, 1000),
+        struct.pack('<6d', 3000, 1, 10, 0.5, 1.5, 2.5),
+        struct.pack('<6d', 9000, 2, 20, 3.5, 4.5, 5.5),
+    ]
+
+    data = b''
+    for i, payload in enumerate(payloads):
+        trailing = len(payload) + 4 if corrupt and i == len(payloads) - 1 else len(payload)
+        data += struct.pack('<i', len(payload)) + payload + struct.pack('<i', trailing)
+
+    target.write_bytes(data)
+
+    return target
+
+
+class Test_Binary:
+    EXAMPLES_VALID = [
+        consts.path.PTRAC,
+        consts.path.PTRAC.parent / 'valid_00.ptrac',
+        consts.path.PTRAC.parent / 'valid_09.ptrac',
+    ]
+
+    @pytest.mark.parametrize('order', ['<', '>'])
+    def test_open_valid(self, tmp_path, order):
+        for example in self.EXAMPLES_VALID:
+            filename = write_binary(example, tmp_path / example.name, order)
+
+            assert pymcnp.ptrac.Binary.is_binary(filename)
+            assert not pymcnp.ptrac.Binary.is_binary(example)
+
+            a = pymcnp.Ptrac.open(filename)
+            b = pymcnp.Ptrac.open(example)
+
+            assert a.header.to_mcnp() == b.header.to_mcnp()
+
+            for history_a, history_b in zip(a.histories, b.histories, strict=True):
+                assert history_a.to_mcnp() == history_b.to_mcnp()
+
+    def test_open_invalid(self, tmp_path):
+        filename = write_binary(consts.path.PTRAC, tmp_path / 'truncated.ptrac')
+        filename.write_bytes(filename.read_bytes()[:-6])
+
+        with pytest.raises(pymcnp.errors.PtracError):
+            list(pymcnp.Ptrac.iter_histories(filename))
+
+        with pytest.raises(pymcnp.errors.PtracError):
+            pymcnp.ptrac.Binary(consts.path.PTRAC)
+
+        with pytest.raises(pymcnp.errors.CliError):
+            pymcnp.ptrac.Binary('hello.ptrac')
+
+    def test_iter_arrays(self, tmp_path):
+        for example in self.EXAMPLES_VALID:
+            filename = write_binary(example, tmp_path / example.name)
+            a = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(filename, size=1000)))
+            b = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(example, size=1000)))
+
+            for name in ('nps', 'event_type', 'next_type', 'cell', 'material', 'surface'):
+                assert numpy.array_equal(a[name], b[name])
+
+            for name in ('x', 'y', 'z', 'erg'):
+                assert numpy.allclose(a[name], b[name], rtol=1e-6, equal_nan=True)
+
+    def test_from_file(self, tmp_path):
+        filename = write_binary(consts.path.PTRAC, tmp_path / 'binary.ptrac')
+
+        assert pymcnp.Ptrac.from_file(filename).to_mcnp() == pymcnp.Ptrac.from_file(consts.path.PTRAC).to_mcnp()
+
+    def test_compressed(self, tmp_path):
+        filename = write_binary(consts.path.PTRAC, tmp_path / 'binary.ptrac')
+        compressed = tmp_path / 'compressed.ptrac'
+        compressed.write_bytes(gzip.compress(filename.read_bytes()))
+
+        assert pymcnp.ptrac.Binary.is_binary(compressed)
+        assert pymcnp.Ptrac.from_file(compressed).to_mcnp() == pymcnp.Ptrac.from_file(filename).to_mcnp()
+
+        a = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(compressed, size=1000)))
+        b = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(filename, size=1000)))
+
+        for name in a.dtype.names:
+            assert numpy.array_equal(a[name], b[name], equal_nan=True)
+
+    def test_filter(self, tmp_path):
+        filename = write_binary(consts.path.PTRAC, tmp_path / 'binary.ptrac')
+
+        a = list(pymcnp.PtracFilter()(pymcnp.Ptrac.open(filename)))
+        b = list(pymcnp.PtracFilter()(pymcnp.Ptrac.open(consts.path.PTRAC)))
+
+        assert [event.to_mcnp() for event in a] == [event.to_mcnp() for event in b]
+
+    def test_index(self, tmp_path):
+        binary = write_binary(consts.path.PTRAC, tmp_path / 'binary.ptrac')
+        text = tmp_path / 'ascii.ptrac'
+        text.write_bytes(consts.path.PTRAC.read_bytes())
+
+        a = pymcnp.Ptrac.build_index(binary)
+        b = pymcnp.Ptrac.build_index(text)
+
+        assert numpy.array_equal(a['nps'], b['nps'])
+        assert numpy.array_equal(a['event_type'], b['event_type'])
+        assert pymcnp.Ptrac.get_history(binary, 3).to_mcnp() == pymcnp.Ptrac.get_history(text, 3).to_mcnp()
+
+    def test_filter_histories(self, tmp_path):
+        filename = write_binary(consts.path.PTRAC, tmp_path / 'binary.ptrac')
+
+        a = pymcnp.PtracFilter('x > 0.0 & cell == 1').filter_histories(filename)
+        b = pymcnp.PtracFilter('x > 0.0 & cell == 1').filter_histories(consts.path.PTRAC)
+
+        assert [history.to_mcnp() for history in a] == [history.to_mcnp() for history in b]
+
+    def test_merge(self, tmp_path):
+        filename = write_binary(consts.path.PTRAC, tmp_path / 'binary.ptrac')
+
+        pymcnp.Ptrac.merge([filename, consts.path.PTRAC], tmp_path / 'a.ptrac', renumber='offset')
+        pymcnp.Ptrac.merge([consts.path.PTRAC, consts.path.PTRAC], tmp_path / 'b.ptrac', renumber='offset')
+
+        a = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(tmp_path / 'a.ptrac')))
+        b = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(tmp_path / 'b.ptrac')))
+
+        for name in ('nps', 'event_type', 'next_type', 'cell', 'material'):
+            assert numpy.array_equal(a[name], b[name])
+
+        assert numpy.allclose(a['x'], b['x'], rtol=1e-6, equal_nan=True)
+
+    def test_records(self, tmp_path):
+        filename = write_records(tmp_path / 'records.ptrac')
+
+        with pymcnp.ptrac.Binary(filename) as binary:
+            assert binary.integer == numpy.dtype('<i4')
+            assert binary.real == numpy.dtype('<f8')
+            assert binary.decoder.i_layout == (1, 2)
+
+        assert binary.buffer.closed
+
+        table = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(filename)))
+
+        assert table['nps'].tolist() == [7, 7]
+        assert table['event_type'].tolist() == [1000, 3000]
+        assert table['next_type'].tolist() == [3000, 9000]
+        assert table['cell'].tolist() == [1, 2]
+        assert table['material'].tolist() == [10, 20]
+        assert table['x'].tolist() == [0.5, 3.5]
+        assert table['z'].tolist() == [2.5, 5.5]
+
+    def test_records_invalid(self, tmp_path):
+        filename = write_records(tmp_path / 'records.ptrac', corrupt=True)
+
+        with pytest.raises(pymcnp.errors.PtracError):
+            list(pymcnp.Ptrac.iter_arrays(filename))
@@ -0,0 +1,78 @@
+import numpy
+import pytest
+
+import pymcnp
+from ... import consts
+from ... import classes
+
+
+class Test_Decoder:
+    class Test_Init(classes.Test_Init):
+        element = pymcnp.ptrac.Decoder
+        EXAMPLES_VALID = [
+            {'header': consts.ast.ptrac.HEADER},
+        ]
+        EXAMPLES_INVALID = [
+            {'header': None},
+        ]
+
+    class Test_Methods:
+        element = pymcnp.ptrac.Decoder
+        EXAMPLES_VALID = [
+            {'header': consts.ast.ptrac.HEADER, 'source': consts.string.ptrac.HISTORY},
+        ]
+        EXAMPLES_INVALID = [
+            {'header': consts.ast.ptrac.HEADER, 'source': consts.string.ptrac.HISTORY[:-50]},
+            {'header': consts.ast.ptrac.HEADER, 'source': 'hello\n'},
+        ]
+
+        def test_variations(self):
+            decoder = self.element(consts.ast.ptrac.HEADER)
+
+            assert decoder.variations[decoder.SOURCE] == (pymcnp.ptrac.history.event.J_4, pymcnp.ptrac.history.event.P_1)
+            assert decoder.variations[decoder.BANK] == (pymcnp.ptrac.history.event.J_5, pymcnp.ptrac.history.event.P_1)
+
+        def test_to_history_valid(self):
+            for example in self.EXAMPLES_VALID:
+                decoder = self.element(example['header'])
+                a = pymcnp.ptrac.History.from_mcnp(example['source'], decoder)
+                b = pymcnp.ptrac.History.from_mcnp(example['source'])
+
+                assert a == b
+                assert isinstance(next(iter(a.events)).j_line, pymcnp.ptrac.history.event.J_5)
+
+        def test_to_history_invalid(self):
+            for example in self.EXAMPLES_INVALID:
+                with pytest.raises(pymcnp.errors.Error):
+                    pymcnp.ptrac.History.from_mcnp(example['source'], self.element(example['header']))
+
+        def test_to_arrays_valid(self):
+            for example in self.EXAMPLES_VALID:
+                table = self.element(example['header']).to_arrays(example['source'])
+                history = pymcnp.ptrac.History.from_mcnp(example['source'])
+                event = next(iter(history.events))
+
+                assert len(table) == 1
+                assert table['nps'][0] == history.i_line.nps.value
+                assert table['event_type'][0] == int(history.i_line.event_type.value)
+                assert table['next_type'][0] == int(event.j_line.next_type.value)
+                assert numpy.isclose(table['erg'][0], float(event.p_line.erg.value))
+                assert numpy.isclose(table['tme'][0], float(event.p_line.tme.value))
+
+                table = self.element(example['header']).to_arrays(example['source'] + '\n' + example['source'])
+
+                assert len(table) == 2
+
+        def test_from_histories(self):
+            for example in self.EXAMPLES_VALID:
+                decoder = self.element(example['header'])
+                a = decoder.to_arrays(example['source'])
+                b = decoder.from_histories([pymcnp.ptrac.History.from_mcnp(example['source'], decoder)])
+
+                for name in ('nps', 'event_type', 'next_type', 'cell', 'material', 'x', 'y', 'z', 'u', 'v', 'w', 'erg', 'wgt', 'tme'):
+                    assert numpy.array_equal(a[name], b[name], equal_nan=True)
+
+        def test_to_arrays_invalid(self):
+            for example in self.EXAMPLES_INVALID:
+                with pytest.raises(pymcnp.errors.PtracError):
+                    self.element(example['header']).to_arrays(example['source'])
@@ -0,0 +1,70 @@
+import numpy
+import pytest
+
+import pymcnp
+from ... import consts
+
+
+class Test_Spatial:
+    EXAMPLES = [
+        consts.path.PTRAC,
+        consts.path.PTRAC.parent / 'valid_31.ptrac',
+    ]
+
+    def events(self, example):
+        """
+        Generates events with their indexes within histories.
+        """
+
+        table = numpy.concatenate(list(pymcnp.Ptrac.iter_arrays(example, size=1000)))
+        index = numpy.zeros(len(table), dtype=numpy.int64)
+
+        for i in range(1, len(table)):
+            index[i] = index[i - 1] + 1 if table['nps'][i] == table['nps'][i - 1] else 0
+
+        return table, index
+
+    def expected(self, table, index, mask):
+        events = numpy.zeros(mask.sum(), dtype=pymcnp.ptrac.Spatial.EVENT)
+        events['nps'] = table['nps'][mask]
+        events['event'] = index[mask]
+
+        return numpy.sort(events, order=['nps', 'event'])
+
+    def test_queries(self):
+        for example in self.EXAMPLES:
+            table, index = self.events(example)
+            spatial = pymcnp.ptrac.Spatial.from_arrays(pymcnp.Ptrac.iter_arrays(example, size=1000))
+            xyz = numpy.column_stack([table['x'], table['y'], table['z']])
+            center = numpy.nanmedian(xyz, axis=0)
+            scale = numpy.nanstd(xyz)
+
+            distance = numpy.linalg.norm(xyz - center, axis=1)
+            assert numpy.array_equal(spatial.radius(center, scale), self.expected(table, index, distance <= scale))
+
+            lower, upper = center - [scale, scale / 2, scale / 4], center + [scale / 4, scale, scale / 2]
+            inside = ((xyz >= lower) & (xyz <= upper)).all(axis=1)
+            assert numpy.array_equal(spatial.box(lower, upper), self.expected(table, index, inside))
+
+            nearest = spatial.nearest(center, k=5)
+            assert len(nearest) == 5
+            assert numpy.allclose(numpy.sort(distance)[:5], [distance[(table['nps'] == nps) & (index == event)][0] for nps, event in nearest])
+
+    def test_where(self):
+        where = pymcnp._expression.Expression('cell == 1', pymcnp.ptrac.Decoder.DTYPE.names)
+        spatial = pymcnp.ptrac.Spatial.from_arrays(pymcnp.Ptrac.iter_arrays(consts.path.PTRAC), where)
+        table, _ = self.events(consts.path.PTRAC)
+
+        assert spatial.tree.n == (table['cell'] == 1).sum()
+
+    def test_invalid(self):
+        spatial = pymcnp.ptrac.Spatial.from_arrays([])
+
+        assert len(spatial.nearest([0, 0, 0])) == 0
+        assert len(spatial.radius([0, 0, 0], 1.0)) == 0
+
+        with pytest.raises(pymcnp.errors.CliError):
+            spatial.box([1, 1, 1], [0, 0, 0])
+
+        with pytest.raises(pymcnp.errors.CliError):
+            pymcnp.ptrac.Spatial([1], [0, 1], [[0, 0, 0]])
@@ -1,3 +1,5 @@
+import pickle
+
 import pymcnp
 from ... import consts
 from ... import classes
@@ -29,3 +31,8 @@ class Test_Generator:
             for example in self.EXAMPLES:
                 element = pymcnp.types.Generator(pymcnp.types.Real)(**example)
                 iter(element)
+
+        def test__reduce__(self):
+            for example in self.EXAMPLES:
+                element = pymcnp.types.Generator(pymcnp.types.Real)(iter(example['value']))
+                assert pickle.loads(pickle.dumps(element)) == element
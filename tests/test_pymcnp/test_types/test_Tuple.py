@@ -1,3 +1,5 @@
+import pickle
+
 import pymcnp
 from ... import consts
 from ... import classes
@@ -40,3 +42,8 @@ class Test_Tuple:
             for example in self.EXAMPLES:
                 element = pymcnp.types.Tuple(pymcnp.types.Real)(**example)
                 'hello' in element
+
+        def test__reduce__(self):
+            for example in self.EXAMPLES:
+                element = pymcnp.types.Tuple(pymcnp.types.Real)(**example)
+                assert pickle.loads(pickle.dumps(element)) == element